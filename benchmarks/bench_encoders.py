@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare encoder speed and output size over the bundled themes.
+
+Boards are rendered once; only encoding is timed. Sizes and times are
+averaged over every bundled theme and a few positions. Palette presets
+encode boards rendered with ``palette=True``.
+"""
+
+import io
+import sys
+
+from common import MIDDLEGAME_FEN, SPARSE_FEN, START_FEN, measure, print_table
+
+from chessboard_image import generate_pil, list_themes
+from chessboard_image.generator import _encoder
+
+# (label, format, encoder options, palette)
+PRESETS = (
+    ("png (default, level 6)", "png", {}, False),
+    ("png level 1", "png", {'compress_level': 1}, False),
+    ("png level 9", "png", {'compress_level': 9}, False),
+    ("png optimize", "png", {'optimize': True}, False),
+    ("png palette", "png", {}, True),
+    ("png palette level 9", "png", {'compress_level': 9}, True),
+    ("webp lossless", "webp", {'lossless': True}, False),
+    ("webp lossless method 0", "webp", {'lossless': True, 'method': 0}, False),
+    ("webp quality 80", "webp", {'quality': 80}, False),
+    ("jpeg quality 85", "jpeg", {'quality': 85}, False),
+    ("jpeg quality 95", "jpeg", {'quality': 95}, False),
+)
+
+
+def encode(img, fmt, options):
+    pil_format, options = _encoder(fmt, options)
+    buffer = io.BytesIO()
+    img.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    boards = {
+        palette: [generate_pil(fen, size=size, theme_name=theme, palette=palette)
+                  for theme in list_themes()
+                  for fen in (START_FEN, MIDDLEGAME_FEN, SPARSE_FEN)]
+        for palette in (False, True)
+    }
+
+    rows = []
+    baseline = None
+    for label, fmt, options, palette in PRESETS:
+        images = boards[palette]
+        times = [measure(lambda: encode(img, fmt, options), repeat=10, warmup=1)['p50'] for img in images]
+        sizes = [len(encode(img, fmt, options)) for img in images]
+        ms = sum(times) / len(times)
+        kib = sum(sizes) / len(sizes) / 1024
+        if baseline is None:
+            baseline = (ms, kib)
+        rows.append((label, f"{ms:.2f}", f"{kib:.1f}", f"{kib / baseline[1]:.2f}x"))
+    print(f"{size}x{size} boards, {len(boards[False])} per preset (all bundled themes x 3 positions)\n")
+    print_table(("encoder", "encode ms", "size KiB", "size vs default"), rows)
+
+
+if __name__ == '__main__':
+    main()
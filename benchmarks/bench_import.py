@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Measure the cold import time of the package with ``python -X importtime``.
+
+Each statement runs in a fresh interpreter; the fastest of several runs is
+reported together with the slowest imported modules. With ``--budget`` the
+script exits with status 1 when ``import chessboard_image`` is over budget.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from common import print_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import time budget in milliseconds, also enforced by tests/test_import.py
+IMPORT_BUDGET_MS = 100
+
+STATEMENTS = (
+    "import chessboard_image",
+    "import chessboard_image.cli",
+    "import chessboard_image; chessboard_image.generate_many",
+    "import chessboard_image; chessboard_image.generate_bytes('8/8/8/8/8/8/8/K6k w - - 0 1', size=80)",
+)
+
+
+def importtime(statement):
+    """
+    Run a statement in a fresh interpreter with ``-X importtime``.
+
+    Returns:
+        dict: Module name to (self, cumulative, nesting depth) import time in
+        microseconds
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def best_of(statement, runs):
+    """Get the ``importtime`` output of the run with the fastest package import."""
+    return min((importtime(statement) for _ in range(runs)),
+               key=lambda modules: modules.get('chessboard_image', (0, 0, 0))[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=5, help='Runs per statement (default: 5)')
+    parser.add_argument('--budget', type=float, nargs='?', const=IMPORT_BUDGET_MS,
+                        help=f'Fail if importing the package takes longer (default: {IMPORT_BUDGET_MS} ms)')
+    args = parser.parse_args()
+
+    rows = []
+    for statement in STATEMENTS:
+        modules = best_of(statement, args.runs)
+        total = sum(cumulative for _, cumulative, depth in modules.values() if depth == 0)
+        rows.append((statement, f"{modules['chessboard_image'][1] / 1000:.1f}", f"{total / 1000:.1f}",
+                     'yes' if 'PIL' in modules else 'no'))
+    print_table(("statement", "package ms", "all imports ms", "imports PIL"), rows)
+
+    print()
+    modules = best_of(STATEMENTS[0], args.runs)
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    print_table(("module", "self ms", "cumulative ms"),
+                [(name, f"{s / 1000:.1f}", f"{c / 1000:.1f}") for name, (s, c, _) in slowest])
+
+    if args.budget is not None:
+        package_ms = modules['chessboard_image'][1] / 1000
+        if package_ms > args.budget:
+            print(f"\nimport chessboard_image took {package_ms:.1f} ms, over the {args.budget:.0f} ms budget")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
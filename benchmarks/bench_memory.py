@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Measure the memory footprint of renders and long batches.
+
+Per size, a fresh interpreter renders one cold board and then warm boards.
+It reports the render caches and the peak and steady RSS. ``tracemalloc``
+supplies the Python-level peak and the memory retained per warm render.
+Pillow's pixel buffers are allocated outside the Python allocator, so they
+only show up in RSS. The canvas column gives their size.
+
+The batch part streams ``--renders`` boards through ``iter_generate_many``:
+once at a single size and once over many sizes, which fills every cache up to
+its cap. RSS, traced memory and cache bytes are sampled along the way; all
+three level off once the caches are full. With ``--workers`` the mixed batch
+also runs in a process pool, and the peak RSS of its workers is reported.
+
+Linux only (RSS is read from ``/proc``). Requires Python 3.9+.
+
+Usage: python benchmarks/bench_memory.py [--sizes 100,400,2000] [--renders 10000] [--workers 2]
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from itertools import cycle, islice
+
+from common import MIDDLEGAME_FEN, SPARSE_FEN, START_FEN, print_table
+
+from chessboard_image import generator, iter_generate_many, generate_bytes
+
+MB = 1024 * 1024
+FENS = (START_FEN, MIDDLEGAME_FEN, SPARSE_FEN)
+
+# Sizes cycled through by the mixed batch; 88 distinct sizes overflow every cache
+MIXED_SIZES = tuple(range(104, 800, 8))
+
+CACHES = ('sprite_cache', 'background_cache', 'label_cache', 'tile_cache')
+
+
+def rss():
+    """Current resident set size in bytes."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def cache_bytes():
+    return sum(getattr(generator, name).stats()['bytes'] for name in CACHES)
+
+
+def measure_size(size, renders=20):
+    """
+    Measure one board size in this (fresh) process.
+
+    Returns:
+        dict: Memory figures in bytes
+    """
+    base = rss()
+    generate_bytes(MIDDLEGAME_FEN, size=size)
+    cold_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    tracemalloc.start()
+    generate_bytes(MIDDLEGAME_FEN, size=size)
+    peaks, retained = [], []
+    for index in range(renders):
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        generate_bytes(FENS[index % len(FENS)], size=size)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        gc.collect()
+        retained.append(tracemalloc.get_traced_memory()[0] - before)
+    tracemalloc.stop()
+
+    return {
+        'base': base,
+        'canvas': size * size * 3,
+        'caches': cache_bytes(),
+        'cold_peak': cold_peak,
+        'steady': rss(),
+        'peak': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'traced_peak': max(peaks),
+        'retained': sum(retained) / len(retained),
+    }
+
+
+def run_sizes(sizes):
+    rows = []
+    for size in sizes:
+        # A fresh interpreter per size, so peaks are not inherited from larger boards
+        output = subprocess.run([sys.executable, __file__, '--child-size', str(size)],
+                                capture_output=True, text=True, check=True).stdout
+        m = json.loads(output)
+        rows.append((size, f"{m['canvas'] / MB:.1f}", f"{m['caches'] / MB:.1f}",
+                     f"{m['cold_peak'] / MB:.0f}", f"{m['peak'] / MB:.0f}", f"{m['steady'] / MB:.0f}",
+                     f"{m['traced_peak'] / 1024:.0f}", f"{m['retained']:.0f}"))
+    print_table(("size", "canvas MB", "caches MB", "cold peak RSS MB", "peak RSS MB", "steady RSS MB",
+                 "traced peak/render KB", "retained/render B"), rows)
+
+
+def batch_items(renders, sizes):
+    items = zip(cycle(FENS), cycle(sizes))
+    return ((fen, None, {'size': size}) for fen, size in islice(items, renders))
+
+
+def run_batch(label, renders, sizes, samples=10):
+    """Stream a batch in this process, sampling memory every renders/samples boards."""
+    gc.collect()
+    tracemalloc.start()
+    every = max(1, renders // samples)
+    rows = []
+    start = time.perf_counter()
+    for count, result in enumerate(iter_generate_many(batch_items(renders, sizes), workers=0), 1):
+        if not result.ok:
+            raise result.error
+        if count % every == 0 or count == renders:
+            rows.append((count, f"{rss() / MB:.0f}", f"{tracemalloc.get_traced_memory()[0] / MB:.2f}",
+                         f"{cache_bytes() / MB:.1f}"))
+    tracemalloc.stop()
+    print(f"\n{label}: {renders} renders in {time.perf_counter() - start:.0f} s\n")
+    print_table(("renders", "RSS MB", "traced MB", "caches MB"), rows)
+
+
+def run_pool(renders, workers):
+    start = time.perf_counter()
+    for result in iter_generate_many(batch_items(renders, MIXED_SIZES), workers=workers):
+        if not result.ok:
+            raise result.error
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    print(f"\nMixed sizes, {workers} workers: {renders} renders in {time.perf_counter() - start:.0f} s, "
+          f"peak worker RSS {peak / MB:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='100,200,400,800,1200,2000',
+                        help='Board sizes to measure (default: %(default)s)')
+    parser.add_argument('--renders', type=int, default=10000,
+                        help='Boards per batch run, 0 to skip the batches (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=400,
+                        help='Board size of the single-size batch (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Also run the mixed batch with this many worker processes')
+    parser.add_argument('--child-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_size:
+        print(json.dumps(measure_size(args.child_size)))
+        return
+
+    run_sizes([int(size) for size in args.sizes.split(',')])
+    if args.renders:
+        run_batch(f"Batch at {args.batch_size} px", args.renders, (args.batch_size,))
+        run_batch(f"Batch over {len(MIXED_SIZES)} sizes from {MIXED_SIZES[0]} to {MIXED_SIZES[-1]} px",
+                  args.renders, MIXED_SIZES)
+        if args.workers:
+            run_pool(args.renders, args.workers)
+
+
+if __name__ == '__main__':
+    main()
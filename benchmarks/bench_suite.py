@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the rendering hot path, with a stored baseline.
+
+Every scenario is timed call by call and reported as latency percentiles.
+"Cold" scenarios empty the theme registry and all render caches before each
+call, as in a freshly started process. "Warm" scenarios run with every cache
+filled, which is the steady state of a long-running service. The result cache
+is never used, so every call does the real work.
+
+The p50 latency of each scenario is compared with the same scenario in a
+baseline JSON file (``benchmarks/baseline.json`` by default), and the script
+exits with status 1 when any scenario is slower than the baseline by more
+than the threshold. Baselines are machine-specific: record one with
+``--save`` on the machine that runs the comparison, with several ``--rounds``
+so that a lucky run does not become the reference.
+
+Usage::
+
+    python benchmarks/bench_suite.py                    # compare with benchmarks/baseline.json
+    python benchmarks/bench_suite.py --threshold 0.1    # fail on a >10% p50 regression
+    python benchmarks/bench_suite.py -k size --repeat-scale 2
+    python benchmarks/bench_suite.py --save --rounds 5  # record a new baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+
+from common import MIDDLEGAME_FEN, SPARSE_FEN, START_FEN, clear_caches, measure, print_table
+
+import PIL
+
+import chessboard_image
+from chessboard_image import Board, generate_bytes, generate_image, generate_many, list_themes, load_theme
+from chessboard_image.generator import parse_fen
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Fail when a scenario's p50 exceeds the baseline p50 by more than this fraction
+THRESHOLD = 0.25
+
+SIZES = (100, 200, 400, 800, 1200, 2000)
+POSITIONS = (("start", START_FEN), ("middlegame", MIDDLEGAME_FEN), ("sparse", SPARSE_FEN))
+
+# Positions rendered by the batch scenarios
+BATCH_FENS = [START_FEN, MIDDLEGAME_FEN, SPARSE_FEN] * 20
+
+
+def _repeat_for(size):
+    """Fewer calls for large boards, which take up to a hundred times longer."""
+    return 40 if size <= 400 else 15 if size <= 1200 else 8
+
+
+def scenarios(tmp_dir):
+    """
+    Build the benchmark scenarios.
+
+    Args:
+        tmp_dir (str): Directory for files written by the scenarios
+
+    Returns:
+        list: (name, func, repeat, setup, operations per call) tuples
+    """
+    items = []
+
+    def add(name, func, repeat=40, setup=None, operations=1):
+        items.append((name, func, repeat, setup, operations))
+
+    for label, fen in POSITIONS:
+        add(f"parse_fen {label}", lambda fen=fen: parse_fen(fen), repeat=2000)
+        add(f"Board.from_fen {label}", lambda fen=fen: Board.from_fen(fen), repeat=2000)
+
+    add("load_theme cold", load_theme, repeat=20, setup=chessboard_image.theme_registry.clear)
+    add("load_theme warm", load_theme, repeat=2000)
+
+    for theme in list_themes():
+        add(f"render cold theme={theme}", lambda theme=theme: generate_bytes(START_FEN, theme_name=theme),
+            repeat=10, setup=clear_caches)
+        add(f"render warm theme={theme}", lambda theme=theme: generate_bytes(START_FEN, theme_name=theme))
+
+    for size in SIZES:
+        add(f"render warm size={size}", lambda size=size: generate_bytes(MIDDLEGAME_FEN, size=size),
+            repeat=_repeat_for(size))
+    add("render cold size=2000", lambda: generate_bytes(MIDDLEGAME_FEN, size=2000), repeat=5, setup=clear_caches)
+
+    for coordinates in (False, True):
+        for pov in ("white", "black"):
+            add(f"render warm coords={'on' if coordinates else 'off'} pov={pov}",
+                lambda coordinates=coordinates, pov=pov: generate_bytes(
+                    MIDDLEGAME_FEN, show_coordinates=coordinates, player_pov=pov))
+    add("render cold coords=on", lambda: generate_bytes(MIDDLEGAME_FEN, show_coordinates=True),
+        repeat=10, setup=clear_caches)
+
+    for label, fen in POSITIONS:
+        add(f"render warm position={label}", lambda fen=fen: generate_bytes(fen))
+
+    path = os.path.join(tmp_dir, 'board.png')
+    add("generate_image to file", lambda: generate_image(MIDDLEGAME_FEN, path))
+
+    # Per-board latency of a whole batch; the pool start-up is part of the cost
+    for workers in (0, 2):
+        add(f"batch {len(BATCH_FENS)} boards workers={workers}",
+            lambda workers=workers: generate_many(BATCH_FENS, workers=workers),
+            repeat=3, operations=len(BATCH_FENS))
+    return items
+
+
+def run(selected, repeat_scale, rounds=1):
+    """
+    Time the selected scenarios.
+
+    Each round runs the whole selection and the round with the median p50 is
+    kept per scenario. Interleaving the rounds spreads slow phases of shared
+    or frequency-scaled machines over all scenarios instead of a few.
+
+    Returns:
+        dict: Scenario name to latency statistics in milliseconds per operation
+    """
+    runs = {name: [] for name, *_ in selected}
+    for _ in range(rounds):
+        for name, func, repeat, setup, operations in selected:
+            runs[name].append(measure(func, repeat=max(3, int(repeat * repeat_scale)),
+                                      warmup=1 if setup else 3, setup=setup))
+    results = {}
+    for name, func, repeat, setup, operations in selected:
+        stats = sorted(runs[name], key=lambda stats: stats['p50'])[rounds // 2]
+        if operations > 1:
+            stats = {key: value / operations for key, value in stats.items()}
+            stats['throughput'] = 1000 / stats['mean']
+        results[name] = stats
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a baseline.
+
+    Returns:
+        tuple: (table rows, names of the scenarios that regressed)
+    """
+    rows = []
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        change = ''
+        if reference:
+            ratio = stats['p50'] / reference['p50']
+            change = f"{ratio - 1:+.1%}"
+            if ratio > 1 + threshold:
+                change += ' REGRESSION'
+                regressions.append(name)
+        rows.append((name, f"{stats['p50']:.3f}", f"{stats['p90']:.3f}", f"{stats['p99']:.3f}",
+                     f"{stats['mean']:.3f}", f"{reference['p50']:.3f}" if reference else '-', change))
+    return rows, regressions
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'chessboard_image': chessboard_image.__version__,
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-k', '--filter', help='Only run scenarios whose name contains this text')
+    parser.add_argument('--baseline', default=BASELINE, help='Baseline JSON file (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='Allowed p50 slowdown as a fraction of the baseline (default: %(default)s)')
+    parser.add_argument('--repeat-scale', type=float, default=1.0,
+                        help='Multiply the number of timed calls per scenario (default: %(default)s)')
+    parser.add_argument('--rounds', type=int, default=3,
+                        help='Time every scenario this many times and keep the median round (default: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('-o', '--output', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='chessboard-bench-') as tmp_dir:
+        selected = [item for item in scenarios(tmp_dir) if not args.filter or args.filter in item[0]]
+        if not selected:
+            parser.error(f"no scenario matches '{args.filter}'")
+        results = run(selected, args.repeat_scale, args.rounds)
+    report = {'environment': environment(), 'results': results}
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        baseline = stored['results']
+        if stored['environment'] != report['environment']:
+            print(f"Note: baseline recorded on {stored['environment']}\n")
+
+    rows, regressions = compare(results, baseline, args.threshold)
+    print_table(("scenario", "p50 ms", "p90 ms", "p99 ms", "mean ms", "baseline p50", "change"), rows)
+    for name, stats in results.items():
+        if 'throughput' in stats:
+            print(f"{name}: {stats['throughput']:.0f} boards/s")
+
+    for path in filter(None, (args.output, args.baseline if args.save else None)):
+        if path == args.baseline and args.filter and os.path.exists(path):
+            # Only replace the scenarios that were run
+            with open(path) as f:
+                stored = json.load(f)
+            report = {'environment': report['environment'], 'results': dict(stored['results'], **results)}
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Wrote {path}")
+
+    if regressions:
+        print(f"\n{len(regressions)} scenario(s) slower than the baseline by more than {args.threshold:.0%}:")
+        for name in regressions:
+            print(f"  {name}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
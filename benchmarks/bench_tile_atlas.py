@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compare board compositing with the tile atlas against alpha-blended sprites.
+
+The sprite path pastes each cached RGBA piece sprite with its alpha mask onto
+a copy of the cached background (the renderer before the tile atlas). The
+atlas path pastes pre-composited opaque tiles. Both paths start warm: themes,
+sprites, backgrounds and atlases are cached before timing.
+"""
+
+from common import MIDDLEGAME_FEN, START_FEN, measure, print_table
+
+from chessboard_image.generator import (
+    PIECE_MAP,
+    get_board_background,
+    get_piece_sprite,
+    get_tile_atlas,
+    load_theme,
+    parse_fen,
+)
+
+
+def compose_sprites(theme, board, size):
+    square_size = size // 8
+    img = get_board_background(theme, size).copy()
+    for row in range(8):
+        for col in range(8):
+            piece = board[row][col]
+            if piece:
+                sprite = get_piece_sprite(theme, PIECE_MAP[piece], square_size)
+                img.paste(sprite, (col * square_size, row * square_size), sprite)
+    return img
+
+
+def compose_tiles(theme, board, size):
+    square_size = size // 8
+    img = get_board_background(theme, size).copy()
+    atlas = get_tile_atlas(theme, square_size)
+    for row in range(8):
+        for col in range(8):
+            piece = board[row][col]
+            if piece:
+                img.paste(atlas[((row + col) % 2, piece)], (col * square_size, row * square_size))
+    return img
+
+
+def main():
+    theme = load_theme()
+    rows = []
+    for name, fen in (("start", START_FEN), ("middlegame", MIDDLEGAME_FEN)):
+        board = parse_fen(fen)
+        for size in (200, 400, 800):
+            assert compose_sprites(theme, board, size).tobytes() == compose_tiles(theme, board, size).tobytes()
+            sprites = measure(lambda: compose_sprites(theme, board, size), repeat=200)
+            tiles = measure(lambda: compose_tiles(theme, board, size), repeat=200)
+            rows.append((
+                name, size,
+                f"{sprites['p50']:.3f}", f"{tiles['p50']:.3f}",
+                f"{sprites['p50'] / tiles['p50']:.2f}x",
+            ))
+    print_table(("position", "size", "sprites p50 ms", "atlas p50 ms", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
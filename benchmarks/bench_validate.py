@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare bulk FEN validation with calling parse_fen in a loop.
+
+The input is a synthetic dump of positions from random walks: pieces hop to
+random empty squares, so nearly every board is unique while ranks repeat the
+way they do in real game collections. The lookup tables of the validator are
+cleared before every timed run.
+
+Usage: python benchmarks/bench_validate.py [lines] [workers]
+"""
+
+import io
+import random
+import sys
+import time
+
+from common import print_table
+
+from chessboard_image import validate
+from chessboard_image.generator import parse_fen
+from chessboard_image.validate import iter_validate, validate_fen
+
+START = [
+    list("rnbqkbnr"), list("pppppppp"), [''] * 8, [''] * 8,
+    [''] * 8, [''] * 8, list("PPPPPPPP"), list("RNBQKBNR"),
+]
+
+
+def board_field(board):
+    ranks = []
+    for row in board:
+        rank, empty = '', 0
+        for piece in row:
+            if piece:
+                rank += (str(empty) if empty else '') + piece
+                empty = 0
+            else:
+                empty += 1
+        ranks.append(rank + (str(empty) if empty else ''))
+    return '/'.join(ranks)
+
+
+def synthetic_fens(count, seed=1):
+    """Generate ``count`` FENs from random walks of 80 plies each."""
+    rng = random.Random(seed)
+    fens = []
+    while len(fens) < count:
+        board = [row[:] for row in START]
+        for ply in range(80):
+            occupied = [(r, c) for r in range(8) for c in range(8) if board[r][c]]
+            r, c = rng.choice(occupied)
+            piece = board[r][c]
+            rows = range(1, 7) if piece in 'Pp' else range(8)
+            targets = [(tr, tc) for tr in rows for tc in range(8) if not board[tr][tc]]
+            tr, tc = rng.choice(targets)
+            board[tr][tc], board[r][c] = piece, ''
+            side = 'b' if ply % 2 == 0 else 'w'
+            fens.append(f"{board_field(board)} {side} - - {ply % 50} {ply // 2 + 1}")
+    return fens[:count]
+
+
+def clear_tables():
+    validate._materials.clear()
+    validate._boards.clear()
+
+
+def timed(func):
+    clear_tables()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    fens = synthetic_fens(count)
+    text = '\n'.join(fens) + '\n'
+
+    runs = (
+        ("parse_fen loop (board field only)", lambda: [parse_fen(fen) for fen in fens]),
+        ("validate_fen loop", lambda: [validate_fen(fen) for fen in fens]),
+        ("iter_validate, in process", lambda: sum(1 for _ in iter_validate(io.StringIO(text)))),
+        (f"iter_validate, {workers} workers",
+         lambda: sum(1 for _ in iter_validate(io.StringIO(text), workers=workers))),
+    )
+    rows = []
+    baseline = None
+    for label, func in runs:
+        seconds = min(timed(func) for _ in range(3))
+        baseline = baseline or seconds
+        rows.append((label, f"{seconds / count * 1e6:.2f}", f"{count / seconds:,.0f}",
+                     f"{baseline / seconds:.1f}x"))
+    unique = len({fen.split()[0] for fen in fens})
+    print(f"{count} FENs, {unique} distinct boards\n")
+    print_table(("method", "us/FEN", "FENs/s", "vs parse_fen"), rows)
+
+
+if __name__ == '__main__':
+    main()
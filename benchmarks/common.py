@@ -0,0 +1,73 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the repository root, e.g. ``python benchmarks/bench_tile_atlas.py``.
+"""
+
+import os
+import sys
+import time
+
+# Make the in-tree package importable without installing it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+MIDDLEGAME_FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+SPARSE_FEN = "8/8/8/8/8/3QK3/8/7k w - - 0 1"
+
+
+def percentile(samples, fraction):
+    """Get a percentile of a list of samples using nearest-rank."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def clear_caches():
+    """Empty every render cache of the package, as in a freshly started process."""
+    from chessboard_image import generator
+
+    generator.theme_registry.clear()
+    for cache in (generator.sprite_cache, generator.background_cache, generator.label_cache,
+                  generator.tile_cache):
+        cache.clear()
+    with generator._fonts_lock:
+        generator._fonts.clear()
+
+
+def measure(func, repeat=50, warmup=3, setup=None):
+    """
+    Time repeated calls of a function.
+
+    ``setup`` is called before every call, outside the timed region.
+
+    Returns:
+        dict: Latency statistics in milliseconds (mean, p50, p90, p99, min)
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'mean': sum(samples) / len(samples),
+        'p50': percentile(samples, 0.50),
+        'p90': percentile(samples, 0.90),
+        'p99': percentile(samples, 0.99),
+        'min': min(samples),
+    }
+
+
+def print_table(headers, rows):
+    """Print rows as a Markdown table."""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('| ' + ' | '.join(str(h).ljust(w) for h, w in zip(headers, widths)) + ' |')
+    print('|' + '|'.join('-' * (w + 2) for w in widths) + '|')
+    for row in rows:
+        print('| ' + ' | '.join(str(c).ljust(w) for c, w in zip(row, widths)) + ' |')
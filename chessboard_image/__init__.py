@@ -17,6 +17,19 @@ from .generator import (
     list_themes,
     get_theme_info,
     load_theme,
+    Theme,
+    ThemeRegistry,
+    theme_registry,
+    get_piece_sprite,
+    sprite_cache,
+    get_board_background,
+    background_cache,
+    label_cache,
+    get_tile_atlas,
+    get_theme_palette,
+    tile_cache,
+    result_cache,
+    release_memory,
     ChessImageGeneratorError,
     ThemeNotFoundError,
     InvalidFENError,
@@ -24,14 +37,94 @@ from .generator import (
     __author__,
     __email__
 )
+from .board import Board, as_board
+from .cache import DiskCache, LRUCache, ResultCache
+from .themepack import ThemePack, convert_theme_file
+from .timing import RenderStages, add_stage_hook, record_stages, remove_stage_hook
+
+# Features with heavier dependencies (process pools, asyncio, Pillow at import
+# time) are imported on first attribute access to keep ``import chessboard_image``
+# fast. Pillow itself is only imported when the first board is rendered.
+_LAZY_ATTRIBUTES = {
+    'generate_many': 'batch',
+    'iter_generate_many': 'batch',
+    'BatchResult': 'batch',
+    'RenderedBoard': 'incremental',
+    'DirtyRect': 'incremental',
+    'diff_boards': 'incremental',
+    'render_update': 'incremental',
+    'generate_animation': 'animation',
+    'generate_sheet': 'sheet',
+    'agenerate_bytes': 'aio',
+    'agenerate_pil': 'aio',
+    'agenerate_many': 'aio',
+    'AsyncRenderer': 'aio',
+    'validate_fen': 'validate',
+    'iter_validate': 'validate',
+    'FENResult': 'validate',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 __all__ = [
     'generate_image',
     'generate_bytes', 
     'generate_pil',
+    'generate_many',
+    'iter_generate_many',
+    'BatchResult',
+    'RenderedBoard',
+    'DirtyRect',
+    'diff_boards',
+    'render_update',
+    'generate_animation',
+    'generate_sheet',
+    'agenerate_bytes',
+    'agenerate_pil',
+    'agenerate_many',
+    'AsyncRenderer',
+    'validate_fen',
+    'iter_validate',
+    'FENResult',
+    'Board',
+    'as_board',
     'list_themes',
     'get_theme_info',
     'load_theme',
+    'Theme',
+    'ThemeRegistry',
+    'theme_registry',
+    'ThemePack',
+    'convert_theme_file',
+    'get_piece_sprite',
+    'sprite_cache',
+    'get_board_background',
+    'background_cache',
+    'label_cache',
+    'get_tile_atlas',
+    'get_theme_palette',
+    'tile_cache',
+    'result_cache',
+    'release_memory',
+    'LRUCache',
+    'ResultCache',
+    'DiskCache',
+    'record_stages',
+    'add_stage_hook',
+    'remove_stage_hook',
+    'RenderStages',
     'ChessImageGeneratorError',
     'ThemeNotFoundError', 
     'InvalidFENError',
@@ -0,0 +1,266 @@
+"""
+Asyncio API for rendering chess boards without blocking the event loop.
+
+Rendering is CPU bound, so every call is offloaded to a thread pool managed by
+an :class:`AsyncRenderer`. Pillow releases the GIL while resizing, compositing
+and encoding, so a few threads keep an async server responsive while boards
+render. Concurrency is bounded by a semaphore and every call supports
+cancellation and timeouts.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .batch import BatchResult, _normalize_item
+from .generator import generate_bytes, generate_pil
+
+
+class AsyncRenderer:
+    """
+    Managed executor for rendering boards from asyncio code.
+
+    Args:
+        max_workers (int, optional): Number of render threads. Defaults to the
+            CPU count.
+        max_concurrency (int, optional): Maximum number of renders submitted to
+            the executor at once; further calls wait in a queue. Defaults to
+            ``max_workers``.
+        executor (concurrent.futures.Executor, optional): Executor to use
+            instead of creating a thread pool. It is not shut down by
+            :meth:`close`.
+    """
+
+    def __init__(self, max_workers=None, max_concurrency=None, executor=None):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chessboard-image')
+        self._executor = executor
+        self.max_concurrency = max_concurrency or max_workers
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._closed = False
+
+    @property
+    def queue_depth(self):
+        """int: Number of calls waiting for a free render slot."""
+        return self._waiting
+
+    @property
+    def in_flight(self):
+        """int: Number of renders currently submitted to the executor."""
+        return self._running
+
+    def stats(self):
+        """
+        Get renderer statistics.
+
+        Returns:
+            dict: queue_depth, in_flight, completed, failed and max_concurrency
+        """
+        return {
+            'queue_depth': self._waiting,
+            'in_flight': self._running,
+            'completed': self._completed,
+            'failed': self._failed,
+            'max_concurrency': self.max_concurrency,
+        }
+
+    def _get_semaphore(self):
+        # Semaphores are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run(self, func, *args, **kwargs):
+        if self._closed:
+            raise RuntimeError("AsyncRenderer is closed")
+        semaphore = self._get_semaphore()
+        self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        loop = asyncio.get_running_loop()
+
+        def release():
+            self._running -= 1
+            semaphore.release()
+
+        def task_done(task):
+            # Runs in the executor thread; the slot is handed back on the loop
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                # The loop is closed, so nothing is waiting for its semaphore
+                self._running -= 1
+
+        try:
+            task = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            release()
+            raise
+        # A timed out or cancelled render keeps its slot until the thread is
+        # done with it, so abandoned renders cannot pile up in the executor
+        task.add_done_callback(task_done)
+        try:
+            result = await asyncio.wrap_future(task)
+        except Exception:
+            self._failed += 1
+            raise
+        self._completed += 1
+        return result
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        """
+        Run a blocking function in the render executor.
+
+        Cancelling the awaiting task (or hitting the timeout) drops a call
+        that is still queued. A render that already started in a thread runs
+        to completion in the background and keeps its slot until then; its
+        result is discarded.
+
+        Args:
+            func (callable): Blocking function to call
+            *args: Positional arguments for ``func``
+            timeout (float, optional): Seconds to wait, including queueing time
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Return value of ``func``
+
+        Raises:
+            asyncio.TimeoutError: If the timeout expires
+        """
+        return await asyncio.wait_for(self._run(func, *args, **kwargs), timeout)
+
+    async def generate_bytes(self, fen, *args, timeout=None, **kwargs):
+        """Async :func:`~chessboard_image.generate_bytes`, see :meth:`run` for ``timeout``."""
+        return await self.run(generate_bytes, fen, *args, timeout=timeout, **kwargs)
+
+    async def generate_pil(self, fen, *args, timeout=None, **kwargs):
+        """Async :func:`~chessboard_image.generate_pil`, see :meth:`run` for ``timeout``."""
+        return await self.run(generate_pil, fen, *args, timeout=timeout, **kwargs)
+
+    async def generate_many(self, fens, timeout=None, **kwargs):
+        """
+        Render many positions concurrently.
+
+        Args:
+            fens (iterable): FEN strings, or ``(fen, name, options)`` tuples as
+                accepted by :func:`~chessboard_image.generate_many` (``name`` is
+                ignored)
+            timeout (float, optional): Per-item timeout in seconds
+            **kwargs: Render options passed to :func:`~chessboard_image.generate_bytes`
+
+        Returns:
+            list: :class:`~chessboard_image.BatchResult` per item, in input order.
+            Failed or timed out items carry the exception in ``error``.
+        """
+        async def render_one(index, item):
+            try:
+                index, fen, _, options = _normalize_item(index, item)
+            except Exception as e:
+                # Malformed items fail on their own, as in generate_many
+                return BatchResult(index, item, None, e)
+            render_options = dict(kwargs, **options) if options else kwargs
+            try:
+                output = await self.generate_bytes(fen, timeout=timeout, **render_options)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return BatchResult(index, fen, None, e)
+            return BatchResult(index, fen, output, None)
+
+        return list(await asyncio.gather(*(render_one(index, item) for index, item in enumerate(fens))))
+
+    def close(self, wait=True):
+        """
+        Stop accepting renders and shut down the owned executor.
+
+        Args:
+            wait (bool): Wait for running renders to finish (default: True)
+        """
+        self._closed = True
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close(wait=False)
+
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+
+def get_default_renderer():
+    """
+    Get the shared renderer used by the module-level async functions.
+
+    Returns:
+        AsyncRenderer: Process-wide renderer, created on first use
+    """
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is None or _default_renderer._closed:
+            _default_renderer = AsyncRenderer()
+        return _default_renderer
+
+
+async def agenerate_bytes(fen, *args, timeout=None, **kwargs):
+    """
+    Generate chess board image as bytes without blocking the event loop.
+
+    Takes the same arguments as :func:`~chessboard_image.generate_bytes`.
+
+    Args:
+        timeout (float, optional): Seconds to wait, including queueing time
+
+    Returns:
+        bytes: PNG image data
+
+    Raises:
+        asyncio.TimeoutError: If the timeout expires
+    """
+    return await get_default_renderer().generate_bytes(fen, *args, timeout=timeout, **kwargs)
+
+
+async def agenerate_pil(fen, *args, timeout=None, **kwargs):
+    """
+    Generate chess board as PIL Image object without blocking the event loop.
+
+    Takes the same arguments as :func:`~chessboard_image.generate_pil`.
+
+    Args:
+        timeout (float, optional): Seconds to wait, including queueing time
+
+    Returns:
+        PIL.Image: Image object
+    """
+    return await get_default_renderer().generate_pil(fen, *args, timeout=timeout, **kwargs)
+
+
+async def agenerate_many(fens, timeout=None, **kwargs):
+    """
+    Render many positions concurrently without blocking the event loop.
+
+    See :meth:`AsyncRenderer.generate_many`.
+
+    Returns:
+        list: :class:`~chessboard_image.BatchResult` per item, in input order
+    """
+    return await get_default_renderer().generate_many(fens, timeout=timeout, **kwargs)
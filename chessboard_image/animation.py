@@ -0,0 +1,137 @@
+"""
+Animated exports (GIF, APNG, animated WebP) of a sequence of positions.
+
+Frames are rendered incrementally through the shared background and sprite
+caches, repainting only the squares a move changed, and GIF frames are mapped
+onto the theme's palette (see :func:`~chessboard_image.get_theme_palette`),
+which holds the exact square colors. With a fixed palette Pillow only stores
+the region that changed between frames, so a game replay is a single call
+with small output.
+"""
+
+from .generator import ChessImageGeneratorError, _to_palette, get_theme_palette, load_theme
+from .incremental import RenderedBoard
+
+# Output format names accepted by generate_animation, mapped to PIL formats
+ANIMATION_FORMATS = {
+    'gif': 'GIF',
+    'png': 'PNG',
+    'apng': 'PNG',
+    'webp': 'WEBP',
+}
+
+
+def game_positions(game):
+    """
+    Get the FEN of every position in a game's main line.
+
+    Args:
+        game: ``chess.pgn.Game`` (or any object with ``board()`` and
+            ``mainline_moves()`` following the python-chess API)
+
+    Yields:
+        str: FEN of the starting position and of the position after each move
+    """
+    board = game.board()
+    yield board.fen()
+    for move in game.mainline_moves():
+        board.push(move)
+        yield board.fen()
+
+
+def _format_from_path(output_path):
+    name = getattr(output_path, 'name', output_path)
+    if isinstance(name, str) and '.' in name:
+        extension = name.rsplit('.', 1)[1].lower()
+        if extension in ANIMATION_FORMATS:
+            return extension
+    return 'gif'
+
+
+def generate_animation(positions, output_path, format=None, duration=500, last_frame_duration=None,
+                       loop=0, size=400, theme_file=None, theme_name="wikipedia",
+                       player_pov="white", show_coordinates=False, font_path=None):
+    """
+    Generate an animated image from a sequence of positions.
+
+    Pillow needs every frame before it writes the file, so all frames are
+    held in memory: one byte per pixel for GIF (``size * size`` bytes per
+    position) and three for APNG and WebP. A 200-position game at 400 px
+    takes about 32 MB as GIF and 96 MB as APNG or WebP.
+
+    Args:
+        positions (iterable): FEN strings (or :class:`~chessboard_image.Board`
+            objects), or a ``chess.pgn.Game`` whose main line is animated
+        output_path (str or file object): Output file path or writable binary
+            file object
+        format (str, optional): "gif", "png"/"apng" or "webp". If None, inferred
+            from the output file extension (default: gif).
+        duration (int): Frame duration in milliseconds (default: 500)
+        last_frame_duration (int, optional): Duration of the final frame. If
+            None, uses ``duration``.
+        loop (int): Number of loops, 0 for infinite (default: 0)
+        size (int): Board size in pixels (default: 400)
+        theme_file (str, optional): Path to theme JSON file
+        theme_name (str): Theme name to use (default: "wikipedia")
+        player_pov (str): Player perspective - "white" or "black" (default: "white")
+        show_coordinates (bool): Show file/rank labels (default: False)
+        font_path (str, optional): TrueType font for the coordinate labels
+
+    Returns:
+        str or file object: The ``output_path`` that was written to
+
+    Raises:
+        InvalidFENError: If any FEN notation is invalid
+        ThemeNotFoundError: If theme not found
+        ChessImageGeneratorError: If the animation cannot be written
+    """
+    if hasattr(positions, 'mainline_moves'):
+        positions = game_positions(positions)
+    if format is None:
+        format = _format_from_path(output_path)
+    format = format.lower()
+    if format not in ANIMATION_FORMATS:
+        raise ChessImageGeneratorError(
+            f"Unsupported animation format '{format}'. Supported formats: {sorted(ANIMATION_FORMATS)}"
+        )
+
+    palette = None
+    if format == 'gif':
+        palette = get_theme_palette(load_theme(theme_file, theme_name))
+
+    # Each frame repaints only the squares that changed since the previous one
+    board = None
+    frames = []
+    for fen in positions:
+        if board is None:
+            board = RenderedBoard(fen, size, theme_file, theme_name, player_pov, show_coordinates, font_path)
+        else:
+            board.update(fen)
+        if palette is not None:
+            frame = _to_palette(board.image, palette)
+        else:
+            frame = board.image.copy()
+        frames.append(frame)
+    if not frames:
+        raise ChessImageGeneratorError("Cannot create an animation without positions")
+
+    durations = [duration] * len(frames)
+    if last_frame_duration is not None:
+        durations[-1] = last_frame_duration
+
+    save_options = {
+        'save_all': True,
+        'append_images': frames[1:],
+        'duration': durations if len(frames) > 1 else durations[0],
+        'loop': loop,
+    }
+    if format == 'gif':
+        save_options['optimize'] = False
+    elif format == 'webp':
+        save_options.update(lossless=True, minimize_size=True)
+
+    try:
+        frames[0].save(output_path, ANIMATION_FORMATS[format], **save_options)
+        return output_path
+    except Exception as e:
+        raise ChessImageGeneratorError(f"Failed to write animation: {e}")
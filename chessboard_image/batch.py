@@ -0,0 +1,304 @@
+"""
+Parallel batch rendering of many chess positions.
+
+Work is spread over a ``ProcessPoolExecutor``. Each worker loads the theme and
+warms its tile and background caches once in the pool initializer, then
+renders chunks of positions. A bad FEN only fails its own item. With a cache
+directory all workers share one on-disk :class:`~chessboard_image.ResultCache`
+tier, so positions repeated within or across batches are only rendered once.
+"""
+
+import os
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .board import Board, as_board
+from .cache import ResultCache
+from .generator import (
+    generate_bytes,
+    generate_image,
+    get_board_background,
+    get_tile_atlas,
+    load_theme,
+    release_memory,
+)
+
+# Render options that may be set for the whole batch or overridden per item
+RENDER_OPTIONS = ('size', 'theme_file', 'theme_name', 'player_pov', 'show_coordinates', 'font_path',
+                  'format', 'encoder_options', 'palette')
+
+
+# Disk cache size used when a batch is given a cache directory
+CACHE_DIR_MAX_BYTES = 1024 * 1024 * 1024
+
+# Result caches of this process keyed by cache directory
+_result_caches = {}
+
+
+def _result_cache(cache_dir):
+    cache = _result_caches.get(cache_dir)
+    if cache is None:
+        cache = _result_caches[cache_dir] = ResultCache(directory=cache_dir,
+                                                        disk_max_bytes=CACHE_DIR_MAX_BYTES)
+    return cache
+
+
+class BatchResult(namedtuple('BatchResult', ['index', 'fen', 'output', 'error'])):
+    """
+    Outcome of rendering one item of a batch.
+
+    Attributes:
+        index (int): Position of the item in the input
+        fen (str or Board): Position that was rendered
+        output (bytes or str): Encoded image data, or the output path when
+            writing to a directory. None if rendering failed.
+        error (Exception): Error raised while rendering, or None on success
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """bool: True if the item was rendered successfully."""
+        return self.error is None
+
+
+def _is_position(item):
+    """True for FEN strings, boards and python-chess boards."""
+    return isinstance(item, (str, Board)) or hasattr(item, 'piece_map')
+
+
+def _split_item(index, item, allowed_options):
+    """
+    Split an input item into a (position, label, options) tuple.
+
+    Only tuples of two or three fields starting with a FEN or board are
+    items with a label (output name or caption) and options; any other item
+    is a position, so square sequences and 8x8 lists are converted with
+    :func:`as_board`.
+
+    Raises:
+        ValueError: If the options hold names not in ``allowed_options``
+        InvalidFENError: If the item is not a valid position
+    """
+    if not (isinstance(item, tuple) and len(item) in (2, 3) and _is_position(item[0])):
+        return (item if _is_position(item) else as_board(item), None, None)
+    position, label, options = (item + (None,))[:3]
+    if options:
+        unknown = set(options) - set(allowed_options)
+        if unknown:
+            raise ValueError(f"Unknown render options for item {index}: {sorted(unknown)} "
+                             f"(allowed: {list(allowed_options)})")
+    return (position, label, options)
+
+
+def _normalize_item(index, item):
+    """Turn an input item into an (index, fen, name, options) tuple."""
+    return (index,) + _split_item(index, item, RENDER_OPTIONS)
+
+
+def _check_name(name):
+    """Reject item names that would write outside the output directory."""
+    name = str(name)
+    separators = {'/', os.sep, os.altsep} - {None}
+    if name in ('', '.', '..') or os.path.isabs(name) or any(sep in name for sep in separators):
+        raise ValueError(f"Invalid output name {name!r}: names must not be empty, "
+                         f"'.', '..' or contain path separators")
+    return name
+
+
+def _chunks(items, chunksize):
+    chunk = []
+    for index, item in enumerate(items):
+        try:
+            chunk.append(_normalize_item(index, item))
+        except Exception as e:
+            # Malformed items fail on their own; the worker passes the result through
+            chunk.append(BatchResult(index, item, None, e))
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _init_worker(options):
+    """Pool initializer: load the batch theme and warm the render caches."""
+    try:
+        theme = load_theme(options['theme_file'], options['theme_name'])
+        get_board_background(theme, options['size'], options['show_coordinates'], options['player_pov'],
+                             options['font_path'], options['palette'])
+        get_tile_atlas(theme, options['size'] // 8, options['palette'])
+    except Exception:
+        # Errors are reported per item when the theme is actually used
+        pass
+
+
+def _render_chunk(chunk, options, output_dir, filename_template, cache_dir=None):
+    """
+    Render a chunk of normalized items, capturing errors per item.
+
+    Freed canvas memory is returned to the operating system after each chunk,
+    so the RSS of long batches stays at the size of the render caches.
+    """
+    cache = _result_cache(cache_dir) if cache_dir is not None else None
+    results = []
+    for item in chunk:
+        if isinstance(item, BatchResult):
+            results.append(item)
+            continue
+        index, fen, name, item_options = item
+        render_options = dict(options, **item_options) if item_options else options
+        try:
+            if output_dir is None:
+                output = generate_bytes(fen, cache=cache, **render_options)
+            else:
+                name = f"board_{index:06d}" if name is None else _check_name(name)
+                output = os.path.join(output_dir, filename_template.format(index=index, name=name))
+                if cache is None:
+                    generate_image(fen, output, **render_options)
+                else:
+                    data = generate_bytes(fen, cache=cache, **render_options)
+                    with open(output, 'wb') as f:
+                        f.write(data)
+            results.append(BatchResult(index, fen, output, None))
+        except Exception as e:
+            results.append(BatchResult(index, fen, None, e))
+    release_memory()
+    return results
+
+
+def iter_generate_many(fens, output_dir=None, filename_template="{name}.png", workers=None,
+                       chunksize=16, ordered=True, size=400, theme_file=None,
+                       theme_name="wikipedia", player_pov="white", show_coordinates=False,
+                       font_path=None, format="png", encoder_options=None, palette=False,
+                       cache_dir=None):
+    """
+    Render many chess positions in parallel, yielding results as they finish.
+
+    The input is consumed lazily and only a bounded number of chunks is in
+    flight at any time, so arbitrarily long iterables can be streamed.
+
+    Args:
+        fens (iterable): Positions (FEN strings, :class:`~chessboard_image.Board`,
+            python-chess boards or 64-square sequences), or ``(fen, name)`` /
+            ``(fen, name, options)``
+            tuples where ``name`` is used in ``filename_template`` (items whose
+            name is absolute, ``..`` or holds a path separator fail) and
+            ``options`` is a dict overriding the render options for that item
+        output_dir (str, optional): Directory to write images to. If None,
+            results carry encoded bytes instead of paths.
+        filename_template (str): Output file name, formatted with ``index`` and
+            ``name`` (default name: ``board_{index:06d}``)
+        workers (int, optional): Number of worker processes. Defaults to the
+            CPU count; 0 renders in the current process.
+        chunksize (int): Number of positions sent to a worker per task (default: 16)
+        ordered (bool): Yield results in input order (default: True). If False,
+            results are yielded as soon as their chunk finishes.
+        size (int): Board size in pixels (default: 400)
+        theme_file (str, optional): Path to theme JSON file
+        theme_name (str): Theme name to use (default: "wikipedia")
+        player_pov (str): Player perspective - "white" or "black" (default: "white")
+        show_coordinates (bool): Show file/rank labels (default: False)
+        font_path (str, optional): TrueType font for the coordinate labels
+        format (str): Output format - "png", "webp" or "jpeg" (default: "png")
+        encoder_options (dict, optional): Encoder options, see
+            :func:`~chessboard_image.generate_image`
+        palette (bool): Render in indexed-color mode (default: False)
+        cache_dir (str, optional): Directory of an on-disk result cache shared
+            by all workers (and later batches). Cached boards are reused
+            instead of rendered again.
+
+    Yields:
+        BatchResult: One result per input item
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+    options = {
+        'size': size,
+        'theme_file': theme_file,
+        'theme_name': theme_name,
+        'player_pov': player_pov,
+        'show_coordinates': show_coordinates,
+        'font_path': font_path,
+        'format': format,
+        'encoder_options': encoder_options,
+        'palette': palette,
+    }
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    chunks = _chunks(fens, chunksize)
+
+    if workers == 0:
+        for chunk in chunks:
+            yield from _render_chunk(chunk, options, output_dir, filename_template, cache_dir)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    max_pending = workers * 4
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,))
+    pending = deque() if ordered else set()
+    try:
+        for chunk in chunks:
+            future = executor.submit(_render_chunk, chunk, options, output_dir, filename_template,
+                                     cache_dir)
+            if ordered:
+                pending.append(future)
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            else:
+                pending.add(future)
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+
+        while pending:
+            if ordered:
+                yield from pending.popleft().result()
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def generate_many(fens, output_dir=None, filename_template="{name}.png", workers=None,
+                  chunksize=16, ordered=True, size=400, theme_file=None,
+                  theme_name="wikipedia", player_pov="white", show_coordinates=False,
+                  font_path=None, format="png", encoder_options=None, palette=False,
+                  cache_dir=None):
+    """
+    Render many chess positions in parallel.
+
+    Takes the same arguments as :func:`iter_generate_many` and collects all
+    results into a list. Failed items are reported in their result instead of
+    aborting the batch.
+
+    Returns:
+        list: :class:`BatchResult` for every input item
+    """
+    return list(iter_generate_many(
+        fens,
+        output_dir=output_dir,
+        filename_template=filename_template,
+        workers=workers,
+        chunksize=chunksize,
+        ordered=ordered,
+        size=size,
+        theme_file=theme_file,
+        theme_name=theme_name,
+        player_pov=player_pov,
+        show_coordinates=show_coordinates,
+        font_path=font_path,
+        format=format,
+        encoder_options=encoder_options,
+        palette=palette,
+        cache_dir=cache_dir,
+    ))
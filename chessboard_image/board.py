@@ -0,0 +1,258 @@
+"""
+Compact chess board representation.
+
+A :class:`Board` stores the 64 squares of a position as a ``bytes`` object
+holding one ASCII piece letter (``PNBRQKpnbrqk``) or ``.`` per square, rank 8
+first and file a first within a rank, the order squares appear in a FEN.
+Square access is a single index operation, flipping the board for Black's
+point of view reverses the bytes, and boards are immutable and hashable.
+
+Boards can be built from FEN, from 64-element sequences (or the 8x8 lists
+returned by :func:`~chessboard_image.generator.parse_fen`) and from python-chess
+boards, and are accepted anywhere the ``generate_*`` functions take a FEN, so
+callers that already hold a position need not serialize it to FEN first.
+"""
+
+import re
+
+PIECES = 'PNBRQKpnbrqk'
+
+# Byte of an empty square
+EMPTY = '.'
+
+# Replacements expanding every digit of a FEN board field into that many empty squares
+_EXPANSIONS = tuple((str(n), EMPTY * n) for n in range(8, 0, -1))
+_EXPANDED = re.compile(r'(?:[pnbrqkPNBRQK.]{8}/){7}[pnbrqkPNBRQK.]{8}')
+_OCCUPIED = re.compile(rb'[^.]')
+_EMPTY_RUN = re.compile(r'\.+')
+
+# Piece symbol of every byte value, '' for empty squares and None for invalid bytes
+_SYMBOLS = [None] * 256
+_SYMBOLS[ord(EMPTY)] = ''
+for _piece in PIECES:
+    _SYMBOLS[ord(_piece)] = _piece
+del _piece
+
+# Sequence items accepted for empty squares
+_EMPTY_ITEMS = ('', '.', ' ', None, 0)
+
+
+def _invalid(message):
+    from .generator import InvalidFENError
+
+    return InvalidFENError(message)
+
+
+class Board:
+    """
+    Immutable chess board backed by 64 bytes.
+
+    Squares are indexed 0-63 from a8 to h1 (the FEN order), or by
+    ``(row, col)`` with row 0 being rank 8 and col 0 being file a. Pieces are
+    returned as FEN letters and empty squares as ``''``, like
+    :func:`~chessboard_image.generator.parse_fen`.
+
+    Args:
+        squares (bytes): 64 bytes, one piece letter or ``.`` per square
+
+    Raises:
+        InvalidFENError: If ``squares`` is not a valid board
+    """
+
+    __slots__ = ('squares',)
+
+    def __init__(self, squares):
+        squares = bytes(squares)
+        if len(squares) != 64 or None in map(_SYMBOLS.__getitem__, squares):
+            raise _invalid(f"Board needs 64 squares of {PIECES} or '{EMPTY}', got {squares!r}")
+        object.__setattr__(self, 'squares', squares)
+
+    @classmethod
+    def _trusted(cls, squares):
+        board = object.__new__(cls)
+        object.__setattr__(board, 'squares', squares)
+        return board
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Build a board from FEN notation.
+
+        Only the board field is used; the remaining fields are ignored, as in
+        :func:`~chessboard_image.generator.parse_fen`.
+
+        Args:
+            fen (str): FEN notation string or board field
+
+        Returns:
+            Board: The position's board
+
+        Raises:
+            InvalidFENError: If the board field is invalid
+        """
+        fields = fen.split(None, 1)
+        placement = fields[0] if fields else ''
+        expanded = placement
+        for digit, empty in _EXPANSIONS:
+            expanded = expanded.replace(digit, empty)
+        if EMPTY in placement or not _EXPANDED.fullmatch(expanded):
+            # Let parse_fen explain what is wrong
+            from .generator import parse_fen
+
+            parse_fen(fen)
+            raise _invalid(f"Invalid board field: '{placement}'")
+        return cls._trusted(expanded.replace('/', '').encode('ascii'))
+
+    @classmethod
+    def from_sequence(cls, squares):
+        """
+        Build a board from 64 squares, or 8 rows of 8 squares.
+
+        Args:
+            squares (sequence): Squares from a8 to h1. Items are piece letters;
+                ``''``, ``'.'``, ``' '``, None and 0 are empty squares. A
+                ``bytes`` object or other buffer of 64 ASCII codes is used
+                directly. Nested rows as returned by
+                :func:`~chessboard_image.generator.parse_fen` are accepted too.
+
+        Returns:
+            Board: Board with the given squares
+
+        Raises:
+            InvalidFENError: If the squares are not a valid board
+        """
+        if isinstance(squares, (bytes, bytearray, memoryview)):
+            return cls(bytes(squares).replace(b' ', b'.').replace(b'\0', b'.'))
+        squares = list(squares)
+        if len(squares) == 8 and all(not isinstance(row, str) and len(row) == 8 for row in squares):
+            squares = [item for row in squares for item in row]
+        if len(squares) != 64:
+            raise _invalid(f"Board needs 64 squares, got {len(squares)}")
+        symbols = []
+        for item in squares:
+            if item in _EMPTY_ITEMS:
+                symbols.append(EMPTY)
+            elif isinstance(item, str) and len(item) == 1 and item in PIECES:
+                symbols.append(item)
+            else:
+                raise _invalid(f"Invalid square: {item!r}")
+        return cls._trusted(''.join(symbols).encode('ascii'))
+
+    @classmethod
+    def from_chess(cls, board):
+        """
+        Build a board from a python-chess board.
+
+        Any object with a ``piece_map()`` method returning ``{square: piece}``
+        (python-chess square numbering, a1 = 0, and pieces with ``symbol()``)
+        is accepted; python-chess itself is not imported.
+
+        Args:
+            board: ``chess.Board`` or compatible object
+
+        Returns:
+            Board: Board with the same pieces
+        """
+        symbols = [EMPTY] * 64
+        for square, piece in board.piece_map().items():
+            # python-chess counts from a1; boards are stored from a8
+            symbols[square ^ 56] = piece.symbol()
+        return cls.from_sequence(symbols)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            row, col = key
+            if not (0 <= row < 8 and 0 <= col < 8):
+                raise IndexError(f"Square {key} is off the board")
+            key = row * 8 + col
+        return _SYMBOLS[self.squares[key]]
+
+    def __iter__(self):
+        return map(_SYMBOLS.__getitem__, self.squares)
+
+    def __len__(self):
+        return 64
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return self.squares == other.squares
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.squares)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Board is immutable")
+
+    def __reduce__(self):
+        return (type(self), (self.squares,))
+
+    def __repr__(self):
+        return f"Board('{self.fen()}')"
+
+    def fen(self):
+        """
+        Get the board field of the FEN for this board.
+
+        Returns:
+            str: FEN board field, e.g. ``"8/8/8/8/8/8/8/K6k"``
+        """
+        text = self.squares.decode('ascii')
+        ranks = '/'.join(text[i:i + 8] for i in range(0, 64, 8))
+        return _EMPTY_RUN.sub(lambda match: str(len(match.group())), ranks)
+
+    def flipped(self):
+        """
+        Get the board rotated by 180 degrees, as seen from Black's side.
+
+        Returns:
+            Board: Board whose square 0 is h1
+        """
+        return self._trusted(self.squares[::-1])
+
+    def occupied(self):
+        """
+        Iterate over the occupied squares.
+
+        Yields:
+            tuple: (index, piece) for every non-empty square, in index order
+        """
+        for match in _OCCUPIED.finditer(self.squares):
+            yield match.start(), chr(match.group()[0])
+
+    def rows(self):
+        """
+        Get the board as 8x8 nested lists.
+
+        Returns:
+            list: 8x8 board array as returned by
+            :func:`~chessboard_image.generator.parse_fen`
+        """
+        symbols = list(self)
+        return [symbols[i:i + 8] for i in range(0, 64, 8)]
+
+
+def as_board(position):
+    """
+    Get a :class:`Board` for any supported position input.
+
+    Args:
+        position: FEN string, :class:`Board`, python-chess board (anything
+            with ``piece_map()``), 64-element sequence or 8x8 nested list
+
+    Returns:
+        Board: The position's board
+
+    Raises:
+        InvalidFENError: If the position is not a valid board
+    """
+    if isinstance(position, str):
+        return Board.from_fen(position)
+    if isinstance(position, Board):
+        return position
+    if hasattr(position, 'piece_map'):
+        return Board.from_chess(position)
+    try:
+        return Board.from_sequence(position)
+    except TypeError:
+        raise _invalid(f"Cannot use {type(position).__name__} as a board")
@@ -0,0 +1,464 @@
+"""
+Caching primitives shared by the chessboard image renderer.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by total size in bytes.
+
+    Every entry is stored together with its size as reported by the caller.
+    When the total exceeds ``max_bytes`` (or the number of entries exceeds
+    ``max_entries``) the least recently used entries are evicted. Values larger
+    than the whole budget are returned to the caller but never stored.
+
+    Args:
+        max_bytes (int): Maximum total size of all cached values
+        max_entries (int, optional): Maximum number of cached values
+    """
+
+    def __init__(self, max_bytes, max_entries=None):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._bytes = 0
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Get a cached value and mark it as most recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is not cached
+
+        Returns:
+            Cached value or ``default``
+        """
+        with self._lock:
+            try:
+                value, _ = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size):
+        """
+        Store a value, evicting least recently used entries as needed.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            size (int): Size of the value in bytes
+        """
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, size)
+            self._bytes += size
+            self._evict()
+
+    def get_or_create(self, key, factory, sizeof):
+        """
+        Get a cached value, creating and storing it on a miss.
+
+        The factory runs outside the cache lock, so concurrent misses for the
+        same key may both build the value; the last one stored wins.
+
+        Args:
+            key: Cache key
+            factory (callable): Called without arguments to build the value
+            sizeof (callable): Called with the value to get its size in bytes
+
+        Returns:
+            Cached or newly created value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.put(key, value, sizeof(value))
+        return value
+
+    def resize(self, max_bytes=None, max_entries=None):
+        """
+        Change the cache limits, evicting entries that no longer fit.
+
+        Args:
+            max_bytes (int, optional): New byte budget. If None, unchanged.
+            max_entries (int, optional): New entry limit. If None, unchanged.
+        """
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_entries is not None:
+                self.max_entries = max_entries
+            self._evict()
+
+    def _set_bytes(self, entries):
+        self._bytes = sum(size for _, size, _ in entries)
+        self._scanned_at = time.monotonic()
+        self._writes_since_scan = 0
+
+    def _evict(self):
+        while self._data and (
+            self._bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._data) > self.max_entries)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and reset the statistics counters."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: hits, misses, evictions, entries, bytes, max_bytes and max_entries
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+
+class DiskCache:
+    """
+    Size-capped on-disk store of byte strings, safe to share between processes.
+
+    Each value is stored in its own file named after the SHA-256 digest of its
+    key, so the same key always maps to the same file in every process. Files
+    are written to a temporary name and atomically renamed into place, so
+    readers never see partial data. Reads refresh a file's modification time,
+    and when the store grows past ``max_bytes`` the least recently used files
+    are deleted until it is back under 90% of the cap.
+
+    Processes do not coordinate eviction; a value deleted by another process
+    between lookup and read is simply reported as a miss. Each instance
+    tracks the store size from its own writes and re-reads it from the
+    directory every :attr:`RESCAN_WRITES` writes or :attr:`RESCAN_INTERVAL`
+    seconds, so with several writers the store can briefly exceed
+    ``max_bytes`` by what they wrote since their last scan.
+
+    Args:
+        directory (str): Directory holding the cache files, created if missing
+        max_bytes (int): Maximum total size of the stored values
+    """
+
+    # Fraction of max_bytes the store is trimmed to once it overflows
+    LOW_WATERMARK = 0.9
+
+    # Age in seconds after which leftover temporary files are removed
+    STALE_TEMP_AGE = 3600
+
+    # Writes and seconds after which the store size is read from the directory
+    # again, picking up the writes of other processes
+    RESCAN_WRITES = 100
+    RESCAN_INTERVAL = 10.0
+
+    def __init__(self, directory, max_bytes):
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes = None
+        self._scanned_at = 0.0
+        self._writes_since_scan = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(key):
+        """
+        Get the content address of a key.
+
+        Args:
+            key: Cache key with a deterministic ``repr`` (tuples of strings,
+                numbers, booleans and None)
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        import hashlib
+
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, key, default=None):
+        """
+        Read a stored value and mark it as recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is not stored
+
+        Returns:
+            bytes: Stored value or ``default``
+        """
+        path = self._path(self.digest(key))
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return default
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Store a value, evicting least recently used files as needed.
+
+        Write errors (such as a full disk) are ignored: the store is only a
+        cache.
+
+        Args:
+            key: Cache key
+            data (bytes): Value to store
+        """
+        import tempfile
+
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(self.digest(key))
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        with self._lock:
+            self.writes += 1
+            if (self._bytes is None or self._writes_since_scan >= self.RESCAN_WRITES
+                    or time.monotonic() - self._scanned_at >= self.RESCAN_INTERVAL):
+                self._set_bytes(self._scan())
+            else:
+                self._bytes += len(data) - replaced
+                self._writes_since_scan += 1
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """List (mtime, size, path) of every stored file, removing stale temporary files."""
+        entries = []
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_dir():
+                    for item in os.scandir(entry.path):
+                        st = item.stat()
+                        entries.append((st.st_mtime, st.st_size, item.path))
+                elif entry.name.startswith('.tmp-') and now - entry.stat().st_mtime > self.STALE_TEMP_AGE:
+                    os.unlink(entry.path)
+            except OSError:
+                # Removed by another process while scanning
+                continue
+        return entries
+
+    def _set_bytes(self, entries):
+        self._bytes = sum(size for _, size, _ in entries)
+        self._scanned_at = time.monotonic()
+        self._writes_since_scan = 0
+
+    def _evict(self):
+        entries = sorted(self._scan())
+        self._set_bytes(entries)
+        total = self._bytes
+        target = self.max_bytes * self.LOW_WATERMARK
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def clear(self):
+        """Delete all stored values and reset the statistics counters."""
+        with self._lock:
+            for _, _, path in self._scan():
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            self._bytes = 0
+            self.hits = self.misses = self.writes = self.evictions = 0
+
+    def stats(self):
+        """
+        Get store statistics.
+
+        Entry count and size are read from the directory, so they include
+        values written by other processes.
+
+        Returns:
+            dict: hits, misses, writes, evictions, entries, bytes and max_bytes
+        """
+        with self._lock:
+            entries = self._scan()
+            self._set_bytes(entries)
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class ResultCache:
+    """
+    Two-tier cache of encoded results: memory LRU in front of a disk store.
+
+    Lookups try the in-memory :class:`LRUCache` first, then the optional
+    :class:`DiskCache`; values found on disk are promoted to memory.
+
+    Args:
+        max_bytes (int): Byte budget of the in-memory tier (default: 64 MB)
+        directory (str, optional): Directory of the on-disk tier. If None,
+            only the memory tier is used.
+        disk_max_bytes (int): Byte budget of the on-disk tier (default: 1 GB)
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, directory=None, disk_max_bytes=1024 * 1024 * 1024):
+        self.memory = LRUCache(max_bytes)
+        self.disk = DiskCache(directory, disk_max_bytes) if directory is not None else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Get a cached value from memory or disk.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is not cached
+
+        Returns:
+            bytes: Cached value or ``default``
+        """
+        missing = object()
+        value = self.memory.get(key, missing)
+        if value is missing and self.disk is not None:
+            value = self.disk.get(key, missing)
+            if value is not missing:
+                self.memory.put(key, value, len(value))
+        with self._lock:
+            if value is missing:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return default if value is missing else value
+
+    def put(self, key, value):
+        """
+        Store a value in both tiers.
+
+        Args:
+            key: Cache key
+            value (bytes): Value to store
+        """
+        self.memory.put(key, value, len(value))
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def get_or_create(self, key, factory):
+        """
+        Get a cached value, creating and storing it on a miss.
+
+        Args:
+            key: Cache key
+            factory (callable): Called without arguments to build the value
+
+        Returns:
+            bytes: Cached or newly created value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop all entries from both tiers and reset the statistics counters."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Overall hits and misses, plus the ``memory`` and ``disk``
+            tier statistics (``disk`` is None without a disk tier)
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'memory': self.memory.stats(),
+            'disk': self.disk.stats() if self.disk is not None else None,
+        }
@@ -4,8 +4,12 @@ Command line interface for chessboard image generator.
 """
 
 import argparse
+import heapq
+import os
 import sys
+import time
 from . import (
+    convert_theme_file,
     generate_image, 
     list_themes, 
     get_theme_info,
@@ -14,6 +18,8 @@ from . import (
     ThemeNotFoundError,
     ChessImageGeneratorError
 )
+from .generator import OUTPUT_FORMATS
+from .timing import record_stages
 
 
 def main():
@@ -38,6 +44,124 @@ def main():
                           help='Player perspective (default: white)')
     gen_parser.add_argument('-c', '--coordinates', action='store_true', 
                           help='Show file/rank coordinates (a-h, 1-8)')
+    gen_parser.add_argument('--font', help='TrueType font file for coordinate labels')
+    gen_parser.add_argument('--timings', action='store_true',
+                          help='Print the time spent in each render stage')
+    add_encoder_arguments(gen_parser, 'default: from output extension, else png')
+    
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Render many FENs from a file or stdin')
+    batch_parser.add_argument('input', nargs='?', default='-',
+                            help='Input file with one FEN per line, optionally followed by '
+                                 'tab-separated output name and key=value options (default: stdin)')
+    batch_parser.add_argument('-o', '--output-dir', default='.', help='Output directory')
+    batch_parser.add_argument('--template',
+                            help='Output file name template with {name} and {index} '
+                                 '(default: {name}.<format>)')
+    batch_parser.add_argument('-j', '--workers', type=int, default=None,
+                            help='Number of worker processes (default: CPU count)')
+    batch_parser.add_argument('--chunksize', type=int, default=16, help='FENs per worker task')
+    batch_parser.add_argument('-s', '--size', type=int, default=400, help='Board size in pixels')
+    batch_parser.add_argument('-t', '--theme', default='wikipedia', help='Theme name')
+    batch_parser.add_argument('--theme-file', help='Custom theme file path')
+    batch_parser.add_argument('-p', '--player-pov', choices=['white', 'black'], default='white',
+                            help='Player perspective (default: white)')
+    batch_parser.add_argument('-c', '--coordinates', action='store_true',
+                            help='Show file/rank coordinates (a-h, 1-8)')
+    batch_parser.add_argument('--font', help='TrueType font file for coordinate labels')
+    add_encoder_arguments(batch_parser, 'default: png')
+    batch_parser.add_argument('--cache-dir',
+                            help='Directory of an on-disk cache of rendered boards shared between '
+                                 'workers and runs')
+    batch_parser.add_argument('-q', '--quiet', action='store_true', help='Do not show progress')
+    
+    # Animate command
+    anim_parser = subparsers.add_parser('animate', help='Create an animated GIF/APNG/WebP of a game')
+    anim_parser.add_argument('input', nargs='?', default='-',
+                           help='Input file with one FEN per line (default: stdin)')
+    anim_parser.add_argument('--pgn', help='Animate the main line of a PGN file (requires python-chess)')
+    anim_parser.add_argument('-o', '--output', default='game.gif', help='Output file path')
+    anim_parser.add_argument('-f', '--format', choices=['gif', 'png', 'apng', 'webp'],
+                           help='Animation format (default: from output extension)')
+    anim_parser.add_argument('-d', '--duration', type=int, default=500, help='Frame duration in ms')
+    anim_parser.add_argument('--last-frame-duration', type=int, help='Duration of the last frame in ms')
+    anim_parser.add_argument('--loop', type=int, default=0, help='Number of loops, 0 = forever')
+    anim_parser.add_argument('-s', '--size', type=int, default=400, help='Board size in pixels')
+    anim_parser.add_argument('-t', '--theme', default='wikipedia', help='Theme name')
+    anim_parser.add_argument('--theme-file', help='Custom theme file path')
+    anim_parser.add_argument('-p', '--player-pov', choices=['white', 'black'], default='white',
+                           help='Player perspective (default: white)')
+    anim_parser.add_argument('-c', '--coordinates', action='store_true',
+                           help='Show file/rank coordinates (a-h, 1-8)')
+    anim_parser.add_argument('--font', help='TrueType font file for coordinate labels')
+    
+    # Sheet command
+    sheet_parser = subparsers.add_parser('sheet', help='Lay out many FENs in a grid on one PNG')
+    sheet_parser.add_argument('input', nargs='?', default='-',
+                            help='Input file with one FEN per line, optionally followed by a '
+                                 'tab-separated caption and key=value options (default: stdin)')
+    sheet_parser.add_argument('-o', '--output', default='sheet.png', help='Output PNG file')
+    sheet_parser.add_argument('--cols', type=int, default=4, help='Boards per row (default: 4)')
+    sheet_parser.add_argument('--rows', type=int, help='Rows of the grid (default: as many as needed)')
+    sheet_parser.add_argument('-s', '--size', type=int, default=200, help='Board size in pixels (default: 200)')
+    sheet_parser.add_argument('--spacing', type=int, default=16, help='Space between boards in pixels')
+    sheet_parser.add_argument('--margin', type=int, help='Space around the grid (default: spacing)')
+    sheet_parser.add_argument('--background', default='white', help='Sheet color (default: white)')
+    sheet_parser.add_argument('-t', '--theme', default='wikipedia', help='Theme name')
+    sheet_parser.add_argument('--theme-file', help='Custom theme file path')
+    sheet_parser.add_argument('-p', '--player-pov', choices=['white', 'black'], default='white',
+                            help='Player perspective (default: white)')
+    sheet_parser.add_argument('-c', '--coordinates', action='store_true',
+                            help='Show file/rank coordinates (a-h, 1-8)')
+    sheet_parser.add_argument('--font', help='TrueType font file for coordinates and captions')
+    sheet_parser.add_argument('--compress-level', type=int, default=6, choices=range(10), metavar='0-9',
+                            help='zlib compression level (default: 6)')
+    sheet_parser.add_argument('--palette', action='store_true',
+                            help='Render boards with a 256-color theme palette')
+    
+    # Pack command
+    pack_parser = subparsers.add_parser('pack', help='Convert a JSON theme file into a binary theme pack')
+    pack_parser.add_argument('-o', '--output', default='themes.cbtpack', help='Output theme pack path')
+    pack_parser.add_argument('--theme-file', help='JSON theme file to convert (default: bundled themes)')
+    pack_parser.add_argument('-t', '--theme', action='append', dest='themes',
+                           help='Theme to include, may be repeated (default: all themes)')
+    pack_parser.add_argument('--codec', choices=['raw', 'zlib'], default='raw',
+                           help='Piece storage: raw RGBA (fastest) or zlib (smaller) (default: raw)')
+    
+    # Validate command
+    validate_parser = subparsers.add_parser('validate', help='Validate and normalize FENs from a file or stdin')
+    validate_parser.add_argument('input', nargs='?', default='-',
+                               help='Input file with one FEN per line (default: stdin)')
+    validate_parser.add_argument('-o', '--output', default='-',
+                               help='Output file for the canonical FENs of valid lines (default: stdout)')
+    validate_parser.add_argument('--strict', action='store_true',
+                               help='Require all six FEN fields instead of defaulting missing ones')
+    validate_parser.add_argument('-j', '--workers', type=int, default=0,
+                               help='Number of worker processes (default: 0, validate in-process)')
+    validate_parser.add_argument('--chunksize', type=int, default=4096, help='Lines per worker task')
+    validate_parser.add_argument('-q', '--quiet', action='store_true', help='Do not print the summary')
+    
+    # Serve command
+    serve_parser = subparsers.add_parser('serve', help='Serve rendered boards over HTTP')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    serve_parser.add_argument('-j', '--workers', type=int, default=None,
+                            help='Number of render processes, 0 renders in the request threads '
+                                 '(default: CPU count)')
+    serve_parser.add_argument('--theme-file', help='Custom theme file or theme pack path')
+    serve_parser.add_argument('-t', '--theme', default='wikipedia', help='Default theme name')
+    serve_parser.add_argument('--cache-size', type=int, default=64,
+                            help='Memory cache of rendered boards in MB (default: 64)')
+    serve_parser.add_argument('--cache-dir', help='Directory of an on-disk cache of rendered boards')
+    serve_parser.add_argument('--cache-dir-size', type=int, default=1024,
+                            help='On-disk cache size in MB (default: 1024)')
+    serve_parser.add_argument('--max-age', type=int, default=86400,
+                            help='Cache-Control max-age in seconds (default: 86400)')
+    serve_parser.add_argument('--max-size', type=int, default=2048,
+                            help='Largest board size accepted in pixels (default: 2048)')
+    serve_parser.add_argument('--max-pending', type=int, default=64,
+                            help='Renders allowed to queue before answering 503 (default: 64)')
+    serve_parser.add_argument('-q', '--quiet', action='store_true', help='Do not log requests')
     
     # List themes command
     list_parser = subparsers.add_parser('themes', help='List available themes')
@@ -59,21 +183,82 @@ def main():
     
     try:
         if args.command == 'generate':
-            result_path = generate_image(
-                args.fen,
-                args.output,
-                size=args.size,
-                theme_name=args.theme,
-                theme_file=args.theme_file,
-                player_pov=args.player_pov,
-                show_coordinates=args.coordinates
-            )
+            output_format = args.format or format_from_path(args.output)
+            with record_stages() as renders:
+                result_path = generate_image(
+                    args.fen,
+                    args.output,
+                    size=args.size,
+                    theme_name=args.theme,
+                    theme_file=args.theme_file,
+                    player_pov=args.player_pov,
+                    show_coordinates=args.coordinates,
+                    font_path=args.font,
+                    format=output_format,
+                    encoder_options=encoder_options(args),
+                    palette=args.palette
+                )
             print(f"✓ Chess board image saved: {result_path}")
             print(f"  Theme: {args.theme}")
             print(f"  Size: {args.size}x{args.size}")
             print(f"  Perspective: {args.player_pov.title()}'s view")
             if args.coordinates:
                 print(f"  Coordinates: Shown")
+            if args.timings:
+                print_stage_timings(renders[0])
+            
+        elif args.command == 'batch':
+            return run_batch(args)
+            
+        elif args.command == 'animate':
+            from .animation import generate_animation
+            positions = read_animation_positions(args)
+            generate_animation(
+                positions,
+                args.output,
+                format=args.format,
+                duration=args.duration,
+                last_frame_duration=args.last_frame_duration,
+                loop=args.loop,
+                size=args.size,
+                theme_name=args.theme,
+                theme_file=args.theme_file,
+                player_pov=args.player_pov,
+                show_coordinates=args.coordinates,
+                font_path=args.font
+            )
+            print(f"✓ Animation saved: {args.output}")
+            print(f"  Frames: {len(positions)}")
+            
+        elif args.command == 'sheet':
+            return run_sheet(args)
+            
+        elif args.command == 'pack':
+            convert_theme_file(args.theme_file, args.output, codec=args.codec, theme_names=args.themes)
+            print(f"✓ Theme pack saved: {args.output}")
+            print(f"  Themes: {', '.join(args.themes or list_themes(args.output))}")
+            print(f"  Size: {os.path.getsize(args.output)} bytes")
+            
+        elif args.command == 'validate':
+            return run_validate(args)
+            
+        elif args.command == 'serve':
+            from .cache import ResultCache
+            from .server import serve
+            cache = ResultCache(max_bytes=args.cache_size * 1024 * 1024, directory=args.cache_dir,
+                                disk_max_bytes=args.cache_dir_size * 1024 * 1024)
+            serve(
+                args.host,
+                args.port,
+                workers=args.workers,
+                theme_file=args.theme_file,
+                theme_name=args.theme,
+                cache=cache,
+                max_age=args.max_age,
+                max_size=args.max_size,
+                max_pending=args.max_pending,
+                quiet=args.quiet
+            )
             
         elif args.command == 'themes':
             themes = list_themes(args.theme_file)
@@ -110,6 +295,301 @@ def main():
         return 1
 
 
+def print_stage_timings(stages):
+    """Print the stage timings of one render, slowest first."""
+    print(f"  Render time: {stages.total * 1000:.2f} ms")
+    for name, seconds in sorted(stages.items(), key=lambda item: -item[1]):
+        print(f"    {name:<12}{seconds * 1000:8.2f} ms  {seconds / stages.total:6.1%}")
+
+
+def add_encoder_arguments(parser, format_default):
+    """Add output format and encoder options to a subcommand parser."""
+    parser.add_argument('-f', '--format', choices=['png', 'webp', 'jpeg'],
+                        help=f'Output image format ({format_default})')
+    parser.add_argument('--compress-level', type=int, choices=range(10), metavar='0-9',
+                        help='PNG zlib compression level (Pillow default: 6)')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Extra PNG/JPEG optimization pass (slower, smaller)')
+    parser.add_argument('--quality', type=int, help='WebP/JPEG quality, 0-100')
+    parser.add_argument('--lossless', action='store_true', help='Lossless WebP')
+    parser.add_argument('--palette', action='store_true',
+                        help='Render with a 256-color theme palette (smaller, faster PNGs)')
+
+
+def encoder_options(args):
+    """Collect the encoder options given on the command line."""
+    options = {}
+    if args.compress_level is not None:
+        options['compress_level'] = args.compress_level
+    if args.optimize:
+        options['optimize'] = True
+    if args.quality is not None:
+        options['quality'] = args.quality
+    if args.lossless:
+        options['lossless'] = True
+    return options or None
+
+
+def format_from_path(path):
+    """Get the output format from a file extension, defaulting to PNG."""
+    extension = os.path.splitext(path)[1][1:].lower()
+    return extension if extension in OUTPUT_FORMATS else 'png'
+
+
+# Per-line option names accepted by the batch command
+BATCH_LINE_OPTIONS = {
+    'size': ('size', int),
+    'theme': ('theme_name', str),
+    'pov': ('player_pov', str),
+    'coordinates': ('show_coordinates', lambda value: value.lower() in ('1', 'true', 'yes', 'on')),
+}
+
+
+# Failed lines listed at the end of a batch run
+FAILURES_SHOWN = 20
+
+
+class FailureLog:
+    """
+    Count failed lines, keeping only the ``limit`` lowest line numbers.
+    
+    Entries are ``(line_number, fen, error)`` tuples, added with
+    :meth:`append` in any order.
+    """
+    
+    def __init__(self, limit=FAILURES_SHOWN):
+        self.limit = limit
+        self.count = 0
+        # Max-heap on line number of the kept entries
+        self._heap = []
+    
+    def append(self, failure):
+        self.count += 1
+        entry = (-failure[0], self.count, failure)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+    
+    def first(self):
+        """Get the kept entries ordered by line number."""
+        return [failure for _, _, failure in sorted(self._heap, reverse=True)]
+    
+    def __len__(self):
+        return self.count
+
+
+class BatchInput:
+    """
+    Lazily parse batch input lines into items for iter_generate_many.
+    
+    Lines have the form ``FEN[<TAB>name[<TAB>key=value ...]]``. Blank lines and
+    lines starting with ``#`` are skipped; lines with bad options are recorded
+    in ``errors`` (a list, or any object with ``append``) instead of being
+    rendered. ``line_options`` maps the accepted option names to
+    ``(keyword, converter)`` (default: :data:`BATCH_LINE_OPTIONS`).
+    """
+    
+    def __init__(self, stream, line_options=None, errors=None):
+        self.stream = stream
+        self.line_options = BATCH_LINE_OPTIONS if line_options is None else line_options
+        self.line_numbers = {}
+        self.errors = [] if errors is None else errors
+    
+    def __iter__(self):
+        index = 0
+        for line_number, line in enumerate(self.stream, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            fen = fields[0].strip()
+            name = fields[1].strip() if len(fields) > 1 and fields[1].strip() else None
+            options = {}
+            try:
+                for option in ' '.join(fields[2:]).split():
+                    key, _, value = option.partition('=')
+                    if key not in self.line_options:
+                        raise ValueError(f"unknown option '{key}'")
+                    option_name, convert = self.line_options[key]
+                    options[option_name] = convert(value)
+            except ValueError as e:
+                self.errors.append((line_number, fen, e))
+                continue
+            self.line_numbers[index] = line_number
+            index += 1
+            yield (fen, name, options)
+
+
+def run_batch(args):
+    """Run the batch command, returning the process exit code."""
+    from .batch import iter_generate_many
+    
+    stream = sys.stdin if args.input == '-' else open(args.input, 'r')
+    failures = FailureLog()
+    batch_input = BatchInput(stream, errors=failures)
+    done = 0
+    start = last_report = time.monotonic()
+    
+    def report(final=False):
+        elapsed = max(time.monotonic() - start, 1e-9)
+        failed = len(failures)
+        print(f"\r  {done} rendered, {failed} failed, {done / elapsed:.1f} boards/s",
+              end='\n' if final else '', file=sys.stderr, flush=True)
+    
+    try:
+        output_format = args.format or 'png'
+        results = iter_generate_many(
+            batch_input,
+            output_dir=args.output_dir,
+            filename_template=args.template or f'{{name}}.{output_format}',
+            workers=args.workers,
+            chunksize=args.chunksize,
+            ordered=False,
+            size=args.size,
+            theme_file=args.theme_file,
+            theme_name=args.theme,
+            player_pov=args.player_pov,
+            show_coordinates=args.coordinates,
+            font_path=args.font,
+            format=output_format,
+            encoder_options=encoder_options(args),
+            palette=args.palette,
+            cache_dir=args.cache_dir
+        )
+        for result in results:
+            line_number = batch_input.line_numbers.pop(result.index)
+            if result.ok:
+                done += 1
+            else:
+                failures.append((line_number, result.fen, result.error))
+            now = time.monotonic()
+            if not args.quiet and now - last_report >= 0.5:
+                report()
+                last_report = now
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    
+    if not args.quiet:
+        report(final=True)
+    
+    elapsed = time.monotonic() - start
+    print(f"✓ Rendered {done} boards into {os.path.abspath(args.output_dir)} in {elapsed:.2f}s")
+    if failures:
+        print(f"✗ {len(failures)} failed:", file=sys.stderr)
+        shown = failures.first()
+        for line_number, fen, error in shown:
+            print(f"  line {line_number}: {error} ({fen})", file=sys.stderr)
+        if len(failures) > len(shown):
+            print(f"  ... and {len(failures) - len(shown)} more", file=sys.stderr)
+        return 1
+    return 0
+
+
+# Per-line option names accepted by the sheet command
+SHEET_LINE_OPTIONS = {
+    'theme': ('theme_name', str),
+    'pov': ('player_pov', str),
+}
+
+
+def run_sheet(args):
+    """Run the sheet command, returning the process exit code."""
+    from .sheet import generate_sheet
+    
+    stream = sys.stdin if args.input == '-' else open(args.input, 'r')
+    sheet_input = BatchInput(stream, SHEET_LINE_OPTIONS)
+    try:
+        items = list(sheet_input)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if sheet_input.errors:
+        print(f"✗ {len(sheet_input.errors)} invalid lines:", file=sys.stderr)
+        for line_number, fen, error in sheet_input.errors[:20]:
+            print(f"  line {line_number}: {error} ({fen})", file=sys.stderr)
+        return 1
+    
+    start = time.monotonic()
+    try:
+        generate_sheet(
+            items,
+            args.output,
+            cols=args.cols,
+            rows=args.rows,
+            size=args.size,
+            spacing=args.spacing,
+            margin=args.margin,
+            background=args.background,
+            theme_file=args.theme_file,
+            theme_name=args.theme,
+            player_pov=args.player_pov,
+            show_coordinates=args.coordinates,
+            font_path=args.font,
+            palette=args.palette,
+            compress_level=args.compress_level
+        )
+    except ValueError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    print(f"✓ Contact sheet saved: {args.output}")
+    print(f"  Boards: {len(items)} in {time.monotonic() - start:.2f}s")
+    return 0
+
+
+def run_validate(args):
+    """Run the validate command, returning the process exit code."""
+    from .validate import iter_validate
+    
+    stream = sys.stdin if args.input == '-' else open(args.input, 'r')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    valid = invalid = 0
+    start = time.monotonic()
+    try:
+        for result in iter_validate(stream, strict=args.strict, workers=args.workers,
+                                    chunksize=args.chunksize):
+            if result.ok:
+                valid += 1
+                output.write(result.canonical + '\n')
+            else:
+                invalid += 1
+                print(f"  line {result.line}: {result.error} ({result.fen})", file=sys.stderr)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if output is not sys.stdout:
+            output.close()
+    
+    if not args.quiet:
+        elapsed = max(time.monotonic() - start, 1e-9)
+        print(f"{'✗' if invalid else '✓'} {valid} valid, {invalid} invalid FENs in {elapsed:.2f}s "
+              f"({(valid + invalid) / elapsed:,.0f} lines/s)", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def read_animation_positions(args):
+    """Read the FENs to animate from a PGN file or a FEN-per-line input."""
+    if args.pgn:
+        try:
+            import chess.pgn
+        except ImportError:
+            raise ChessImageGeneratorError("Reading PGN files requires python-chess: pip install chess")
+        from .animation import game_positions
+        with open(args.pgn, 'r') as f:
+            game = chess.pgn.read_game(f)
+        if game is None:
+            raise ChessImageGeneratorError(f"No game found in {args.pgn}")
+        return list(game_positions(game))
+    
+    stream = sys.stdin if args.input == '-' else open(args.input, 'r')
+    try:
+        return [line.strip() for line in stream if line.strip() and not line.startswith('#')]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
 def show_examples():
     """Show usage examples."""
     examples = [
@@ -129,7 +609,14 @@ def show_examples():
     print("\nOther commands:")
     print("  chessboard-image themes")
     print("  chessboard-image info wikipedia")
+    print("  chessboard-image batch fens.txt -o boards/ -j 8  # One FEN per line")
+    print("  chessboard-image animate --pgn game.pgn -o game.gif -d 800")
+    print("  chessboard-image pack -o themes.cbtpack  # Fast-loading binary themes")
+    print("  chessboard-image validate fens.txt -o clean.txt  # Canonical FENs, errors on stderr")
+    print("  chessboard-image serve --port 8000  # GET /board.png?fen=...")
+    print("  chessboard-image sheet puzzles.txt -o sheet.png --cols 6  # FEN<TAB>caption per line")
     print("  chessboard-image generate 'FEN' -s 600 -t alpha")
+    print("  chessboard-image generate 'FEN' -o board.webp --quality 90  # Lossy WebP")
     print("  chessboard-image generate 'FEN' -p black  # Black's perspective")
     print("  chessboard-image generate 'FEN' -c  # Show coordinates")
     print("  chessboard-image generate 'FEN' --player-pov black --coordinates -s 500")
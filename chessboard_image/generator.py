@@ -9,10 +9,13 @@ import json
 import base64
 import io
 import os
-from PIL import Image, ImageDraw
-from pathlib import Path
-import tempfile
-import pkg_resources
+import sys
+import threading
+from . import timing
+from .board import EMPTY, as_board
+from .cache import LRUCache, ResultCache
+from .themeindex import load_index, read_theme
+from .themepack import PackedPiece, ThemePack, is_theme_pack
 
 __version__ = "1.1.5"
 __author__ = "Anand Joshi"
@@ -43,45 +46,299 @@ class InvalidFENError(ChessImageGeneratorError):
 def get_default_theme_path():
     """Get path to default theme file."""
     try:
-        return pkg_resources.resource_filename(__name__, 'theme.json')
-    except:
-        # Fallback for development
-        return Path(__file__).parent / 'theme.json'
+        from importlib.resources import files
+    except ImportError:
+        # Python < 3.9
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'theme.json')
+    return str(files(__package__).joinpath('theme.json'))
+
+
+class _FrozenDict(dict):
+    """Read-only dict used for the nested parts of a cached theme."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class _FrozenList(list):
+    """Read-only list used for the nested parts of a cached theme."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = reverse = sort = clear = _readonly
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+def _freeze(value):
+    """Recursively convert dicts and lists into their read-only counterparts."""
+    if isinstance(value, dict):
+        return _FrozenDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    return value
+
+
+class Theme(_FrozenDict):
+    """
+    Immutable theme handed out by the theme registry.
+
+    Behaves like the plain ``dict`` previously returned by :func:`load_theme`
+    (``theme['pieces']``, ``theme['board']``) but cannot be modified, so a
+    single instance can safely be shared between renders and threads.
+
+    Attributes:
+        name (str): Theme name within its theme file
+        path (str): Resolved path of the theme file the theme was loaded from
+        key (tuple): Hashable identity of this theme version, suitable for
+            use in cache keys. Changes whenever the theme file is edited.
+    """
+
+    def __init__(self, data, name, path, stamp):
+        super().__init__((k, _freeze(v)) for k, v in data.items())
+        self.name = name
+        self.path = path
+        self.key = (path, stamp, name)
+
+    def __reduce__(self):
+        return (Theme, (dict(self), self.name, self.path, self.key[1]))
+
+
+class _JsonThemeSource:
+    """
+    Theme file in the JSON format with base64 encoded pieces.
+
+    Only the byte-offset index is read up front; each theme is parsed from its
+    own byte range the first time it is requested.
+    """
+
+    def __init__(self, path, stamp):
+        try:
+            self._index = load_index(path, stamp)
+        except json.JSONDecodeError as e:
+            raise ThemeNotFoundError(f"Invalid JSON in theme file: {e}")
+        except OSError as e:
+            raise ThemeNotFoundError(f"Theme file not readable: {e}")
+        self._path = path
+        self._stamp = stamp
+        self._themes = {}
+
+    def names(self):
+        return list(self._index)
+
+    def info(self, name):
+        entry = self._index[name]
+        return list(entry['board']), list(entry['pieces'])
+
+    def theme(self, name):
+        theme = self._themes.get(name)
+        if theme is None:
+            entry = self._index[name]
+            try:
+                data = read_theme(self._path, entry)
+            except (OSError, ValueError) as e:
+                raise ThemeNotFoundError(f"Theme file changed while reading '{name}': {e}")
+            theme = Theme(data, name, self._path, self._stamp)
+            self._themes[name] = theme
+        return theme
+
+
+class _PackThemeSource:
+    """Memory-mapped binary theme pack, see :mod:`chessboard_image.themepack`."""
+
+    def __init__(self, path, stamp):
+        try:
+            self._pack = ThemePack(path)
+        except (ValueError, OSError) as e:
+            raise ThemeNotFoundError(str(e))
+        self._path = path
+        self._stamp = stamp
+        self._themes = {}
+
+    def names(self):
+        return self._pack.names()
+
+    def info(self, name):
+        return self._pack.board_colors(name), self._pack.piece_keys(name)
+
+    def theme(self, name):
+        theme = self._themes.get(name)
+        if theme is None:
+            theme = Theme(self._pack.theme_data(name), name, self._path, self._stamp)
+            self._themes[name] = theme
+        return theme
+
+
+class ThemeRegistry:
+    """
+    Process-wide cache of parsed theme files.
+
+    Each theme file is opened once and kept in memory together with the
+    ``(st_mtime_ns, st_size)`` stamp it was read with. Subsequent lookups
+    only ``stat`` the file, so edited custom theme files are picked up
+    automatically while unchanged ones are never re-parsed.
+
+    Theme files are either JSON files with base64 encoded pieces or binary
+    theme packs (see :mod:`chessboard_image.themepack`), detected by content.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @staticmethod
+    def _resolve(theme_file):
+        if theme_file is None:
+            theme_file = get_default_theme_path()
+        return os.path.realpath(os.fspath(theme_file))
+
+    def _source(self, theme_file):
+        path = self._resolve(theme_file)
+        try:
+            st = os.stat(path)
+        except OSError:
+            raise ThemeNotFoundError(f"Theme file not found: {theme_file}")
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        # Replaced sources are not closed: themes handed out earlier keep
+        # working and release their file when they are garbage collected.
+        source_type = _PackThemeSource if is_theme_pack(path) else _JsonThemeSource
+        source = source_type(path, stamp)
+        with self._lock:
+            self._entries[path] = (stamp, source)
+        return source
+
+    def names(self, theme_file=None):
+        """
+        Get the names of the themes defined in a theme file.
+
+        Args:
+            theme_file (str, optional): Path to theme file. If None, uses default.
+
+        Returns:
+            list: Theme names in file order
+
+        Raises:
+            ThemeNotFoundError: If the theme file is missing or invalid
+        """
+        return self._source(theme_file).names()
+
+    def themes(self, theme_file=None):
+        """
+        Get all themes defined in a theme file.
+
+        Args:
+            theme_file (str, optional): Path to theme file. If None, uses default.
+
+        Returns:
+            dict: Mapping of theme name to :class:`Theme`
+
+        Raises:
+            ThemeNotFoundError: If the theme file is missing or invalid
+        """
+        source = self._source(theme_file)
+        return _FrozenDict((name, source.theme(name)) for name in source.names())
+
+    def get(self, theme_file=None, theme_name="wikipedia"):
+        """
+        Get a single theme from a theme file.
+
+        Args:
+            theme_file (str, optional): Path to theme file. If None, uses default.
+            theme_name (str): Theme name to use (default: "wikipedia")
+
+        Returns:
+            Theme: Immutable theme with pieces and board colors
+
+        Raises:
+            ThemeNotFoundError: If theme file or theme name not found
+        """
+        source = self._source(theme_file)
+        try:
+            return source.theme(theme_name)
+        except KeyError:
+            available = source.names()
+            raise ThemeNotFoundError(f"Theme '{theme_name}' not found. Available themes: {available}")
+
+    def info(self, theme_file=None, theme_name="wikipedia"):
+        """
+        Get the board colors and piece codes of a theme without loading it.
+
+        Args:
+            theme_file (str, optional): Path to theme file. If None, uses default.
+            theme_name (str): Theme name (default: "wikipedia")
+
+        Returns:
+            tuple: (board colors, piece codes)
+
+        Raises:
+            ThemeNotFoundError: If theme file or theme name not found
+        """
+        source = self._source(theme_file)
+        try:
+            return source.info(theme_name)
+        except KeyError:
+            available = source.names()
+            raise ThemeNotFoundError(f"Theme '{theme_name}' not found. Available themes: {available}")
+
+    def invalidate(self, theme_file=None):
+        """
+        Drop the cached copy of one theme file so it is re-read on next use.
+
+        Args:
+            theme_file (str, optional): Path to theme file. If None, uses default.
+        """
+        path = self._resolve(theme_file)
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self):
+        """Drop all cached theme files."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+theme_registry = ThemeRegistry()
 
 
 def load_theme(theme_file=None, theme_name="wikipedia"):
     """
-    Load chess theme from JSON file.
+    Load chess theme from JSON file or binary theme pack.
+    
+    Themes are served from the process-wide :data:`theme_registry`, so the
+    theme file is only parsed again when it changes on disk.
     
     Args:
-        theme_file (str, optional): Path to theme JSON file. If None, uses default.
+        theme_file (str, optional): Path to theme JSON file or theme pack. If
+            None, uses default.
         theme_name (str): Theme name to use (default: "wikipedia")
     
     Returns:
-        dict: Theme data with pieces and board colors
+        Theme: Immutable theme data with pieces and board colors
         
     Raises:
         ThemeNotFoundError: If theme file or theme name not found
     """
-    if theme_file is None:
-        theme_file = get_default_theme_path()
-    
-    theme_path = Path(theme_file)
-    
-    if not theme_path.exists():
-        raise ThemeNotFoundError(f"Theme file not found: {theme_file}")
-    
-    try:
-        with open(theme_path, 'r') as f:
-            themes = json.load(f)
-    except json.JSONDecodeError as e:
-        raise ThemeNotFoundError(f"Invalid JSON in theme file: {e}")
-    
-    if theme_name not in themes:
-        available = list(themes.keys())
-        raise ThemeNotFoundError(f"Theme '{theme_name}' not found. Available themes: {available}")
-    
-    return themes[theme_name]
+    with timing.stage('theme'):
+        return theme_registry.get(theme_file, theme_name)
 
 
 def decode_base64_image(base64_data):
@@ -97,6 +354,8 @@ def decode_base64_image(base64_data):
     Raises:
         ChessImageGeneratorError: If image decoding fails
     """
+    from PIL import Image
+
     try:
         # Remove data URL prefix if present
         if base64_data.startswith('data:image'):
@@ -109,10 +368,429 @@ def decode_base64_image(base64_data):
         raise ChessImageGeneratorError(f"Failed to decode base64 image: {e}")
 
 
+def _image_nbytes(img):
+    """Approximate memory used by the pixel data of a PIL image."""
+    return img.width * img.height * len(img.getbands())
+
+
+# Decoded, resized RGBA piece sprites keyed by (theme key, piece, size, resample)
+sprite_cache = LRUCache(max_bytes=32 * 1024 * 1024)
+
+
+def _piece_image(theme, piece_key):
+    """Decode the source image of a piece from a JSON theme or theme pack."""
+    entry = theme['pieces'][piece_key]
+    if isinstance(entry, PackedPiece):
+        return entry.image()
+    return decode_base64_image(entry[0])  # Take first item from array
+
+
+def _make_sprite(theme, piece_key, square_size, resample):
+    """Decode and resize one piece image into a ready-to-paste RGBA sprite."""
+    with timing.stage('sprites'):
+        source = _piece_image(theme, piece_key)
+        # Close decoded sources right away; only the small sprite is cached
+        with source:
+            sprite = source.resize((square_size, square_size), resample)
+        if sprite.mode != 'RGBA':
+            rgba = sprite.convert('RGBA')
+            sprite.close()
+            sprite = rgba
+        return sprite
+
+
+def get_piece_sprite(theme, piece_key, square_size, resample=None):
+    """
+    Get a piece image decoded and resized to fit a square.
+    
+    Sprites are cached in :data:`sprite_cache`, so each piece of a theme is
+    only decoded and resized once per square size.
+    
+    Args:
+        theme (Theme): Theme returned by :func:`load_theme`
+        piece_key (str): Piece code such as "wK" or "bP"
+        square_size (int): Square size in pixels
+        resample (int, optional): PIL resampling filter (default: LANCZOS)
+    
+    Returns:
+        PIL.Image: RGBA sprite of size square_size x square_size. The image is
+        shared between callers and must not be modified.
+        
+    Raises:
+        ChessImageGeneratorError: If the piece image cannot be decoded
+    """
+    if resample is None:
+        from PIL import Image
+        resample = Image.Resampling.LANCZOS
+    theme_key = getattr(theme, 'key', None)
+    if theme_key is None:
+        return _make_sprite(theme, piece_key, square_size, resample)
+    
+    key = (theme_key, piece_key, square_size, int(resample))
+    return sprite_cache.get_or_create(
+        key,
+        lambda: _make_sprite(theme, piece_key, square_size, resample),
+        _image_nbytes
+    )
+
+
+# Width of the margin holding file/rank labels when coordinates are shown
+COORD_MARGIN = 20
+
+# Size of the coordinate label font
+COORD_FONT_SIZE = 14
+
+# Fonts tried in order for coordinate labels when no font path is given
+DEFAULT_FONTS = (
+    "arial.ttf",
+    "/System/Library/Fonts/Arial.ttf",  # macOS
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
+)
+
+# Empty boards (squares, margin and labels) keyed by
+# (theme key, size, show_coordinates, player_pov, font)
+background_cache = LRUCache(max_bytes=64 * 1024 * 1024, max_entries=32)
+
+# Theme-independent coordinate label strips keyed by (size, player_pov, font)
+label_cache = LRUCache(max_bytes=8 * 1024 * 1024, max_entries=32)
+
+# Resolved coordinate fonts keyed by requested font path
+_fonts = {}
+_fonts_lock = threading.Lock()
+
+
+def _resolve_font(font_path=None):
+    """
+    Load the coordinate label font, once per process and font path.
+    
+    Args:
+        font_path (str, optional): TrueType font file. If None, the first
+            available of :data:`DEFAULT_FONTS` is used, falling back to
+            Pillow's built-in font.
+    
+    Returns:
+        tuple: (font key, PIL font); the key identifies the font in cache keys
+    
+    Raises:
+        ChessImageGeneratorError: If ``font_path`` cannot be loaded
+    """
+    with _fonts_lock:
+        resolved = _fonts.get(font_path)
+    if resolved is not None:
+        return resolved
+    
+    from PIL import ImageFont
+    
+    with timing.stage('font'):
+        candidates = DEFAULT_FONTS if font_path is None else (os.fspath(font_path),)
+        for candidate in candidates:
+            try:
+                resolved = (candidate, ImageFont.truetype(candidate, COORD_FONT_SIZE))
+                break
+            except (OSError, ImportError):
+                # Missing font file, or Pillow built without FreeType
+                continue
+        else:
+            if font_path is not None:
+                raise ChessImageGeneratorError(f"Cannot load font: {font_path}")
+            resolved = ('default', ImageFont.load_default())
+    
+    with _fonts_lock:
+        return _fonts.setdefault(font_path, resolved)
+
+
+def _draw_labels(size, player_pov, font):
+    """Rasterize the file and rank labels into left and bottom margin strips."""
+    from PIL import Image, ImageDraw
+    
+    total_size = size + 2 * COORD_MARGIN
+    board_end = COORD_MARGIN + size
+    img = Image.new('RGB', (total_size, total_size), 'white')
+    draw = ImageDraw.Draw(img)
+    square_size = size // 8
+    
+    # Define coordinates based on player perspective
+    if player_pov == "white":
+        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        ranks = ['8', '7', '6', '5', '4', '3', '2', '1']  # 8 at top, 1 at bottom
+    else:  # black perspective
+        files = ['h', 'g', 'f', 'e', 'd', 'c', 'b', 'a']
+        ranks = ['1', '2', '3', '4', '5', '6', '7', '8']  # 1 at top, 8 at bottom
+    
+    # Draw file labels (a-h or h-a) - BOTTOM ONLY
+    for i, file_label in enumerate(files):
+        x = COORD_MARGIN + (i * square_size) + (square_size // 2)
+        draw.text((x, board_end + 5), file_label, fill='black', font=font, anchor='mt')
+    
+    # Draw rank labels (1-8 or 8-1) - LEFT ONLY
+    for i, rank_label in enumerate(ranks):
+        y = COORD_MARGIN + (i * square_size) + (square_size // 2)
+        draw.text((5, y), rank_label, fill='black', font=font, anchor='mm')
+    
+    # Labels only touch the left and bottom margins, so two strips cover them
+    return (
+        img.crop((0, 0, COORD_MARGIN, board_end)),
+        img.crop((0, board_end, total_size, total_size)),
+    )
+
+
+def _get_label_strips(size, player_pov, font):
+    """Get the cached label strips for a board size, perspective and font."""
+    return label_cache.get_or_create(
+        (size, player_pov, font[0]),
+        lambda: _draw_labels(size, player_pov, font[1]),
+        lambda strips: sum(_image_nbytes(strip) for strip in strips)
+    )
+
+
+def _draw_background(theme, size, show_coordinates, player_pov, font):
+    """Draw the empty board with squares and optional coordinate labels."""
+    from PIL import Image, ImageDraw
+
+    # Calculate dimensions with optional coordinate labels
+    coord_margin = COORD_MARGIN if show_coordinates else 0
+    total_size = size + (2 * coord_margin)
+    board_offset = coord_margin
+    
+    # Create board image with margin for coordinates
+    img = Image.new('RGB', (total_size, total_size), 'white')
+    
+    # Paste pre-rasterized coordinate labels into the margin
+    if show_coordinates:
+        left, bottom = _get_label_strips(size, player_pov, font)
+        img.paste(left, (0, 0))
+        img.paste(bottom, (0, board_offset + size))
+    
+    draw = ImageDraw.Draw(img)
+    square_size = size // 8
+    
+    # Get board colors from theme
+    light_color, dark_color = theme['board']
+    
+    # Draw squares
+    for row in range(8):
+        for col in range(8):
+            x1 = board_offset + (col * square_size)
+            y1 = board_offset + (row * square_size)
+            x2 = x1 + square_size
+            y2 = y1 + square_size
+            
+            color = light_color if (row + col) % 2 == 0 else dark_color
+            draw.rectangle([x1, y1, x2, y2], fill=color)
+    
+    return img
+
+
+def _background_key(theme_key, size, show_coordinates, player_pov, font):
+    return (theme_key, size, bool(show_coordinates), player_pov, font[0] if font else None)
+
+
+def get_board_background(theme, size=400, show_coordinates=False, player_pov="white", font_path=None,
+                         palette=False):
+    """
+    Get the empty board image for a theme, size and perspective.
+    
+    Backgrounds are cached in :data:`background_cache`, which is bounded both
+    in bytes and in number of entries so unusual sizes cannot grow it without
+    limit.
+    
+    Args:
+        theme (Theme): Theme returned by :func:`load_theme`
+        size (int): Board size in pixels (default: 400)
+        show_coordinates (bool): Include file/rank labels (default: False)
+        player_pov (str): Player perspective - "white" or "black" (default: "white")
+        font_path (str, optional): TrueType font for the labels. If None, a
+            system font is looked up once per process.
+        palette (bool): Get the board in "P" mode using the theme palette
+            from :func:`get_theme_palette` (default: False)
+    
+    Returns:
+        PIL.Image: RGB (or "P") board image. The image is shared between
+        callers and must be copied before drawing on it.
+    
+    Raises:
+        ChessImageGeneratorError: If ``font_path`` cannot be loaded
+    """
+    font = _resolve_font(font_path) if show_coordinates else None
+    theme_key = getattr(theme, 'key', None)
+    if palette:
+        def make_palette_background():
+            background = get_board_background(theme, size, show_coordinates, player_pov, font_path)
+            return _to_palette(background, get_theme_palette(theme))
+        
+        if theme_key is None:
+            return make_palette_background()
+        return background_cache.get_or_create(
+            _background_key(theme_key, size, show_coordinates, player_pov, font) + ('palette',),
+            make_palette_background,
+            _image_nbytes
+        )
+    
+    if theme_key is None:
+        return _draw_background(theme, size, show_coordinates, player_pov, font)
+    
+    return background_cache.get_or_create(
+        _background_key(theme_key, size, show_coordinates, player_pov, font),
+        lambda: _draw_background(theme, size, show_coordinates, player_pov, font),
+        _image_nbytes
+    )
+
+
+# Pre-composited opaque square tiles keyed by (theme key, square size)
+tile_cache = LRUCache(max_bytes=64 * 1024 * 1024, max_entries=32)
+
+
+def _make_tile_atlas(theme, square_size):
+    """Composite every piece onto both square colors."""
+    from PIL import Image
+
+    atlas = {}
+    for color_index, color in enumerate(theme['board']):
+        empty = Image.new('RGB', (square_size, square_size), color)
+        atlas[(color_index, '')] = empty
+        for piece, piece_key in PIECE_MAP.items():
+            if piece_key not in theme['pieces']:
+                atlas[(color_index, piece)] = empty
+                continue
+            sprite = get_piece_sprite(theme, piece_key, square_size)
+            tile = empty.copy()
+            tile.paste(sprite, (0, 0), sprite)
+            atlas[(color_index, piece)] = tile
+    return atlas
+
+
+def _atlas_nbytes(atlas):
+    # Pieces missing from a theme share the empty tile
+    return sum(_image_nbytes(tile) for tile in {id(t): t for t in atlas.values()}.values())
+
+
+def get_tile_atlas(theme, square_size, palette=False):
+    """
+    Get the pre-composited square tiles of a theme.
+    
+    The atlas holds one opaque RGB tile for each of the 13 square contents
+    (12 pieces and empty) on each of the 2 square colors, so a board is drawn
+    with plain pastes and no alpha blending. Atlases are cached in
+    :data:`tile_cache`.
+    
+    Args:
+        theme (Theme): Theme returned by :func:`load_theme`
+        square_size (int): Square size in pixels
+        palette (bool): Get "P" mode tiles using the theme palette from
+            :func:`get_theme_palette` (default: False)
+    
+    Returns:
+        dict: Tiles keyed by ``(color_index, piece)`` where ``color_index`` is
+        0 for light and 1 for dark squares and ``piece`` is a FEN piece letter
+        or '' for an empty square. The tiles must not be modified.
+    """
+    make_atlas = _make_palette_atlas if palette else _make_tile_atlas
+    theme_key = getattr(theme, 'key', None)
+    if theme_key is None:
+        return make_atlas(theme, square_size)
+    
+    return tile_cache.get_or_create(
+        (theme_key, square_size, 'palette') if palette else (theme_key, square_size),
+        lambda: make_atlas(theme, square_size),
+        _atlas_nbytes
+    )
+
+
+# Square size of the tiles the theme palettes are built from
+PALETTE_SQUARE_SIZE = 64
+
+# Colors always present in theme palettes: coordinate label text and margin
+LABEL_COLORS = ((255, 255, 255), (0, 0, 0))
+
+# Point table turning a zero channel difference into an opaque mask
+_EXACT_MATCH = [255] + [0] * 255
+
+
+def _make_theme_palette(theme):
+    """Build a palette from the exact board and label colors plus quantized tile colors."""
+    from PIL import Image, ImageColor
+    
+    reserved = [ImageColor.getrgb(color)[:3] for color in theme['board']] + list(LABEL_COLORS)
+    atlas = get_tile_atlas(theme, PALETTE_SQUARE_SIZE)
+    sheet = Image.new('RGB', (PALETTE_SQUARE_SIZE * len(TILE_INDEX), PALETTE_SQUARE_SIZE * 2))
+    for (color_index, piece), tile in atlas.items():
+        sheet.paste(tile, (TILE_INDEX[piece] * PALETTE_SQUARE_SIZE, color_index * PALETTE_SQUARE_SIZE))
+    quantized = sheet.quantize(colors=256 - len(reserved), method=Image.Quantize.MEDIANCUT)
+    
+    colors = [channel for rgb in reserved for channel in rgb]
+    colors += quantized.getpalette()[:3 * (256 - len(reserved))]
+    palette = Image.new('P', (1, 1))
+    palette.putpalette(colors)
+    return palette
+
+
+def get_theme_palette(theme):
+    """
+    Get the 256-color palette used to render a theme in palette mode.
+    
+    The palette is built once per theme: it holds the exact board colors, the
+    coordinate label colors and up to 252 colors quantized from the piece
+    tiles. It is cached in :data:`tile_cache`.
+    
+    Args:
+        theme (Theme): Theme returned by :func:`load_theme`
+    
+    Returns:
+        PIL.Image: 1x1 "P" mode image carrying the palette, as accepted by
+        ``Image.quantize(palette=...)``
+    """
+    theme_key = getattr(theme, 'key', None)
+    if theme_key is None:
+        return _make_theme_palette(theme)
+    
+    return tile_cache.get_or_create(
+        (theme_key, 'palette'),
+        lambda: _make_theme_palette(theme),
+        lambda palette: 768
+    )
+
+
+def _to_palette(img, palette):
+    """Map an RGB image onto a theme palette without dithering."""
+    from PIL import Image, ImageChops
+    
+    mapped = img.quantize(palette=palette, dither=Image.Dither.NONE)
+    
+    # Pillow's palette lookup is approximate, so pixels of the reserved board
+    # and label colors are set to their exact palette entries afterwards
+    colors = palette.getpalette()
+    for index in range(2 + len(LABEL_COLORS)):
+        color = tuple(colors[3 * index:3 * index + 3])
+        red, green, blue = ImageChops.difference(img, Image.new('RGB', img.size, color)).split()
+        exact = ImageChops.lighter(ImageChops.lighter(red, green), blue).point(_EXACT_MATCH)
+        mapped.paste(index, mask=exact)
+    return mapped
+
+
+def _make_palette_atlas(theme, square_size):
+    """Map the RGB tile atlas of a theme onto its palette."""
+    palette = get_theme_palette(theme)
+    tiles = {}
+    atlas = {}
+    for key, tile in get_tile_atlas(theme, square_size).items():
+        # Keep missing pieces sharing the empty tile
+        if id(tile) not in tiles:
+            tiles[id(tile)] = _to_palette(tile, palette)
+        atlas[key] = tiles[id(tile)]
+    return atlas
+
+
+# Position of each square content in the palette sample sheet
+TILE_INDEX = {'': 0}
+TILE_INDEX.update((piece, index) for index, piece in enumerate(PIECE_MAP, 1))
+
+
 def parse_fen(fen):
     """
     Parse FEN notation into 8x8 board array.
     
+    See :meth:`Board.from_fen` for a compact representation.
+    
     Args:
         fen (str): FEN notation string
         
@@ -157,26 +835,15 @@ def parse_fen(fen):
         raise InvalidFENError(f"Failed to parse FEN: {e}")
 
 
-def generate_image(fen, output_path=None, size=400, theme_file=None, theme_name="wikipedia", player_pov="white", show_coordinates=False):
+def _render(fen, size, theme_file, theme_name, player_pov, show_coordinates, font_path=None, palette=False):
     """
-    Generate chess board image from FEN notation.
+    Render a chess board in memory.
     
-    Args:
-        fen (str): FEN notation string
-        output_path (str, optional): Output file path. If None, uses temp file.
-        size (int): Board size in pixels (default: 400)
-        theme_file (str, optional): Path to theme JSON file. If None, uses default.
-        theme_name (str): Theme name to use (default: "wikipedia")
-        player_pov (str): Player perspective - "white" or "black" (default: "white")
-        show_coordinates (bool): Show file/rank labels (default: False)
+    This is the core renderer shared by all public ``generate_*`` functions.
+    In palette mode the board is composited from "P" mode tiles.
     
     Returns:
-        str: Path to generated image file
-        
-    Raises:
-        InvalidFENError: If FEN notation is invalid
-        ThemeNotFoundError: If theme not found
-        ChessImageGeneratorError: If image generation fails
+        PIL.Image: Newly created RGB (or "P") image owned by the caller
     """
     # Validate player_pov
     if player_pov not in ["white", "black"]:
@@ -185,157 +852,262 @@ def generate_image(fen, output_path=None, size=400, theme_file=None, theme_name=
     # Load theme
     theme = load_theme(theme_file, theme_name)
     
-    # Set output path
-    if output_path is None:
-        output_path = tempfile.mktemp(suffix='.png')
-    
-    # Parse FEN
-    board = parse_fen(fen)
-    
-    # Reverse board perspective for black's view (flip board vertically)
-    if player_pov == "black":
-        board = board[::-1]  # Flip ranks (rows)
-        board = [row[::-1] for row in board]  # Flip files (columns) within each rank
+    # Parse FEN (or take the board as given)
+    with timing.stage('parse'):
+        board = as_board(fen)
+        
+        # Reverse board perspective for black's view (rotate by 180 degrees)
+        if player_pov == "black":
+            board = board.flipped()
     
     try:
-        # Calculate dimensions with optional coordinate labels
-        coord_margin = 20 if show_coordinates else 0
-        total_size = size + (2 * coord_margin)
+        coord_margin = COORD_MARGIN if show_coordinates else 0
         board_offset = coord_margin
-        
-        # Create board image with margin for coordinates
-        img = Image.new('RGB', (total_size, total_size), 'white')
-        draw = ImageDraw.Draw(img)
-        
         square_size = size // 8
         
-        # Get board colors from theme
-        light_color, dark_color = theme['board']
+        # Start from a copy of the cached empty board
+        with timing.stage('background'):
+            img = get_board_background(theme, size, show_coordinates, player_pov, font_path, palette).copy()
         
-        # Draw squares
-        for row in range(8):
-            for col in range(8):
-                x1 = board_offset + (col * square_size)
-                y1 = board_offset + (row * square_size)
-                x2 = x1 + square_size
-                y2 = y1 + square_size
-                
-                color = light_color if (row + col) % 2 == 0 else dark_color
-                draw.rectangle([x1, y1, x2, y2], fill=color)
+        with timing.stage('tiles'):
+            atlas = get_tile_atlas(theme, square_size, palette)
         
-        # Place pieces
-        for row in range(8):
-            for col in range(8):
-                piece = board[row][col]
-                if piece and piece in PIECE_MAP:
-                    piece_key = PIECE_MAP[piece]
-                    
-                    if piece_key in theme['pieces']:
-                        # Decode base64 piece image
-                        base64_data = theme['pieces'][piece_key][0]  # Take first item from array
-                        piece_img = decode_base64_image(base64_data)
-                        
-                        # Resize piece to fit square
-                        piece_img = piece_img.resize((square_size, square_size), Image.Resampling.LANCZOS)
-                        
-                        x = board_offset + (col * square_size)
-                        y = board_offset + (row * square_size)
-
-                        # Paste with transparency if available
-                        if piece_img.mode in ('RGBA', 'LA', 'PA') or 'A' in piece_img.mode:
-                            img.paste(piece_img, (x, y), piece_img)
-                        else:
-                            img.paste(piece_img, (x, y))
-        
-        # Draw coordinates if requested
-        if show_coordinates:
-            try:
-                from PIL import ImageFont
-                # Try to use a system font, fall back to default if not available
-                try:
-                    font = ImageFont.truetype("arial.ttf", 14)
-                except:
-                    try:
-                        font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 14)  # macOS
-                    except:
-                        try:
-                            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 14)  # Linux
-                        except:
-                            font = ImageFont.load_default()
-            except ImportError:
-                font = ImageFont.load_default()
-            
-            # Define coordinates based on player perspective
-            if player_pov == "white":
-                files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
-                ranks = ['8', '7', '6', '5', '4', '3', '2', '1']  # 8 at top, 1 at bottom
-            else:  # black perspective
-                files = ['h', 'g', 'f', 'e', 'd', 'c', 'b', 'a']
-                ranks = ['1', '2', '3', '4', '5', '6', '7', '8']  # 1 at top, 8 at bottom
-            
-            # Draw file labels (a-h or h-a) - BOTTOM ONLY
-            for i, file_label in enumerate(files):
-                x = board_offset + (i * square_size) + (square_size // 2)
-                y_bottom = board_offset + size + 5
-                draw.text((x, y_bottom), file_label, fill='black', font=font, anchor='mt')
-            
-            # Draw rank labels (1-8 or 8-1) - LEFT ONLY
-            for i, rank_label in enumerate(ranks):
-                y = board_offset + (i * square_size) + (square_size // 2)
-                x_left = 5
-                draw.text((x_left, y), rank_label, fill='black', font=font, anchor='mm')
+        # Paste pre-composited tiles onto the occupied squares
+        with timing.stage('compose'):
+            for index, piece in board.occupied():
+                row, col = divmod(index, 8)
+                x = board_offset + (col * square_size)
+                y = board_offset + (row * square_size)
+                img.paste(atlas[((row + col) % 2, piece)], (x, y))
         
-        # Save image
-        img.save(output_path, 'PNG')
-        return output_path
+        return img
         
     except Exception as e:
         raise ChessImageGeneratorError(f"Failed to generate image: {e}")
 
 
-def generate_bytes(fen, size=400, theme_file=None, theme_name="wikipedia", player_pov="white", show_coordinates=False):
+# Output formats accepted by generate_image/generate_bytes, mapped to PIL formats
+OUTPUT_FORMATS = {
+    'png': 'PNG',
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+    'jpg': 'JPEG',
+}
+
+# Encoder options accepted per PIL format
+ENCODER_OPTIONS = {
+    'PNG': ('compress_level', 'optimize'),
+    'WEBP': ('lossless', 'quality', 'method'),
+    'JPEG': ('quality', 'optimize', 'progressive', 'subsampling'),
+}
+
+
+def _encoder(format, encoder_options):
+    """Validate an output format and its options, returning (PIL format, options)."""
+    pil_format = OUTPUT_FORMATS.get(str(format).lower())
+    if pil_format is None:
+        raise ChessImageGeneratorError(
+            f"Unsupported output format '{format}'. Supported formats: {sorted(OUTPUT_FORMATS)}"
+        )
+    options = dict(encoder_options or {})
+    unknown = set(options) - set(ENCODER_OPTIONS[pil_format])
+    if unknown:
+        raise ChessImageGeneratorError(
+            f"Unsupported {pil_format} encoder options: {sorted(unknown)}. "
+            f"Supported options: {list(ENCODER_OPTIONS[pil_format])}"
+        )
+    return pil_format, options
+
+
+# Encoded boards served by generate_bytes(cache=True)
+result_cache = ResultCache(max_bytes=64 * 1024 * 1024)
+
+# malloc_trim() of the C library, False where there is none
+_malloc_trim = None
+
+
+def release_memory(clear_caches=False):
+    """
+    Return memory freed by past renders to the operating system.
+    
+    Pillow allocates pixel data with ``malloc``. After rendering boards of
+    many different sizes, glibc keeps the freed blocks of the large canvases
+    on the heap, so a long-running process stays near its peak RSS. On glibc
+    this calls ``malloc_trim(0)``; elsewhere it only clears the caches (if
+    asked to).
+    
+    Args:
+        clear_caches (bool): Empty the sprite, background, label and tile
+            caches first (default: False)
+    
+    Returns:
+        bool: True if freed memory was handed back to the operating system
+    """
+    global _malloc_trim
+    if clear_caches:
+        for cache in (sprite_cache, background_cache, label_cache, tile_cache):
+            cache.clear()
+    if _malloc_trim is None:
+        _malloc_trim = False
+        # malloc_trim() is a glibc extension; CDLL(None) only works on POSIX
+        if sys.platform.startswith('linux'):
+            try:
+                import ctypes
+                _malloc_trim = ctypes.CDLL(None).malloc_trim
+            except (ImportError, OSError, AttributeError, TypeError):
+                pass
+    if not _malloc_trim:
+        return False
+    _malloc_trim(0)
+    return True
+
+
+def _result_key(fen, size, theme_file, theme_name, player_pov, show_coordinates, font_path, pil_format,
+                options, palette):
+    """
+    Build the cache key of an encoded board.
+    
+    Only the piece placement of the FEN is used, as the 64 squares of its
+    :class:`Board`, so FENs that differ in move counters or side to move and
+    equal boards given in other forms share one entry. The theme is
+    identified by its file version, and the package version keeps on-disk
+    caches from serving images of an older renderer.
+    """
+    board = as_board(fen)
+    theme = load_theme(theme_file, theme_name)
+    font = _resolve_font(font_path)[0] if show_coordinates else None
+    return (__version__, board.squares, theme.key, size, player_pov, bool(show_coordinates), font, pil_format,
+            tuple(sorted(options.items())), bool(palette))
+
+
+def generate_image(fen, output_path=None, size=400, theme_file=None, theme_name="wikipedia", player_pov="white", show_coordinates=False, font_path=None, format="png", encoder_options=None, palette=False):
+    """
+    Generate chess board image from FEN notation.
+    
+    Args:
+        fen (str or Board): FEN notation string, or a :class:`Board`,
+            python-chess board or 64-square sequence (see :func:`as_board`)
+        output_path (str or file object, optional): Output file path or writable
+            binary file object. If None, uses temp file.
+        size (int): Board size in pixels (default: 400)
+        theme_file (str, optional): Path to theme JSON file. If None, uses default.
+        theme_name (str): Theme name to use (default: "wikipedia")
+        player_pov (str): Player perspective - "white" or "black" (default: "white")
+        show_coordinates (bool): Show file/rank labels (default: False)
+        font_path (str, optional): TrueType font for the coordinate labels.
+            If None, a system font is looked up once per process.
+        format (str): Output format - "png", "webp" or "jpeg" (default: "png")
+        encoder_options (dict, optional): Options for the encoder, see
+            :data:`ENCODER_OPTIONS`: ``compress_level`` (0-9) and ``optimize``
+            for PNG, ``lossless``, ``quality`` and ``method`` for WebP,
+            ``quality``, ``optimize``, ``progressive`` and ``subsampling`` for
+            JPEG. Pillow's defaults are used for options not given.
+        palette (bool): Render in indexed-color ("P") mode with a per-theme
+            256-color palette and write 8-bit images (default: False). Board
+            colors are exact; antialiased piece edges are mapped to the
+            nearest palette color.
+    
+    Returns:
+        str or file object: Path to generated image file, or the file object
+        that was written to
+        
+    Raises:
+        InvalidFENError: If FEN notation is invalid
+        ThemeNotFoundError: If theme not found
+        ChessImageGeneratorError: If image generation fails, or the format or
+            encoder options are not supported
+    """
+    with timing.render():
+        pil_format, options = _encoder(format, encoder_options)
+        img = _render(fen, size, theme_file, theme_name, player_pov, show_coordinates, font_path, palette)
+        
+        # Set output path
+        if output_path is None:
+            import tempfile
+            output_path = tempfile.mktemp(suffix='.' + str(format).lower())
+        
+        try:
+            with timing.stage('encode'):
+                # JPEG has no indexed-color mode
+                if pil_format == 'JPEG' and img.mode == 'P':
+                    rgb = img.convert('RGB')
+                    img.close()
+                    img = rgb
+                img.save(output_path, pil_format, **options)
+            return output_path
+        except Exception as e:
+            raise ChessImageGeneratorError(f"Failed to generate image: {e}")
+        finally:
+            # Free the canvas now rather than whenever the traceback or
+            # frame holding it goes away
+            img.close()
+
+
+def generate_bytes(fen, size=400, theme_file=None, theme_name="wikipedia", player_pov="white", show_coordinates=False, font_path=None, format="png", encoder_options=None, palette=False, cache=None):
     """
     Generate chess board image as bytes.
     
+    The image is encoded in memory; no temporary files are created.
+    
     Args:
-        fen (str): FEN notation string
+        fen (str or Board): FEN notation string, or a :class:`Board`,
+            python-chess board or 64-square sequence (see :func:`as_board`)
         size (int): Board size in pixels (default: 400)
         theme_file (str, optional): Path to theme JSON file
         theme_name (str): Theme name to use (default: "wikipedia")
         player_pov (str): Player perspective - "white" or "black" (default: "white")
         show_coordinates (bool): Show file/rank labels (default: False)
+        font_path (str, optional): TrueType font for the coordinate labels
+        format (str): Output format - "png", "webp" or "jpeg" (default: "png")
+        encoder_options (dict, optional): Encoder options, see :func:`generate_image`
+        palette (bool): Render in indexed-color mode, see :func:`generate_image`
+        cache (ResultCache or bool, optional): Cache of encoded boards to
+            serve repeated positions from. True uses the process-wide
+            :data:`result_cache`; None or False always renders.
     
     Returns:
-        bytes: PNG image data
+        bytes: Encoded image data
     """
-    image_path = generate_image(fen, size=size, theme_file=theme_file, theme_name=theme_name, player_pov=player_pov, show_coordinates=show_coordinates)
-    try:
-        with open(image_path, 'rb') as f:
-            return f.read()
-    finally:
-        os.unlink(image_path)
+    if cache:
+        if cache is True:
+            cache = result_cache
+        with timing.render(), timing.stage('cache'):
+            pil_format, options = _encoder(format, encoder_options)
+            key = _result_key(fen, size, theme_file, theme_name, player_pov, show_coordinates, font_path,
+                              pil_format, options, palette)
+            return cache.get_or_create(key, lambda: generate_bytes(
+                fen, size=size, theme_file=theme_file, theme_name=theme_name, player_pov=player_pov,
+                show_coordinates=show_coordinates, font_path=font_path, format=format,
+                encoder_options=encoder_options, palette=palette))
+    
+    buffer = io.BytesIO()
+    generate_image(fen, buffer, size=size, theme_file=theme_file, theme_name=theme_name, player_pov=player_pov, show_coordinates=show_coordinates, font_path=font_path, format=format, encoder_options=encoder_options, palette=palette)
+    return buffer.getvalue()
 
 
-def generate_pil(fen, size=400, theme_file=None, theme_name="wikipedia", player_pov="white", show_coordinates=False):
+def generate_pil(fen, size=400, theme_file=None, theme_name="wikipedia", player_pov="white", show_coordinates=False, font_path=None, palette=False):
     """
     Generate chess board as PIL Image object.
     
+    The board is rendered directly in memory without an encode/decode round trip.
+    
     Args:
-        fen (str): FEN notation string
+        fen (str or Board): FEN notation string, or a :class:`Board`,
+            python-chess board or 64-square sequence (see :func:`as_board`)
         size (int): Board size in pixels (default: 400)
         theme_file (str, optional): Path to theme JSON file
         theme_name (str): Theme name to use (default: "wikipedia")
         player_pov (str): Player perspective - "white" or "black" (default: "white")
         show_coordinates (bool): Show file/rank labels (default: False)
+        font_path (str, optional): TrueType font for the coordinate labels
+        palette (bool): Render in indexed-color ("P") mode, see
+            :func:`generate_image` (default: False)
     
     Returns:
         PIL.Image: Image object
     """
-    image_path = generate_image(fen, size=size, theme_file=theme_file, theme_name=theme_name, player_pov=player_pov, show_coordinates=show_coordinates)
-    try:
-        return Image.open(image_path)
-    finally:
-        os.unlink(image_path)
+    with timing.render():
+        return _render(fen, size, theme_file, theme_name, player_pov, show_coordinates, font_path, palette)
 
 
 def list_themes(theme_file=None):
@@ -348,19 +1120,9 @@ def list_themes(theme_file=None):
     Returns:
         list: Available theme names
     """
-    if theme_file is None:
-        theme_file = get_default_theme_path()
-    
-    theme_path = Path(theme_file)
-    
-    if not theme_path.exists():
-        return []
-    
     try:
-        with open(theme_path, 'r') as f:
-            themes = json.load(f)
-        return list(themes.keys())
-    except:
+        return theme_registry.names(theme_file)
+    except ThemeNotFoundError:
         return []
 
 
@@ -375,11 +1137,11 @@ def get_theme_info(theme_name="wikipedia", theme_file=None):
     Returns:
         dict: Theme information including colors and available pieces
     """
-    theme = load_theme(theme_file, theme_name)
+    board_colors, pieces = theme_registry.info(theme_file, theme_name)
     
     return {
         'name': theme_name,
-        'board_colors': theme['board'],
-        'pieces': list(theme['pieces'].keys()),
-        'piece_count': len(theme['pieces'])
+        'board_colors': board_colors,
+        'pieces': pieces,
+        'piece_count': len(pieces)
     }
\ No newline at end of file
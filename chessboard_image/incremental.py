@@ -0,0 +1,201 @@
+"""
+Incremental re-rendering of a board from one position to the next.
+
+Consecutive positions of a game differ in a handful of squares. A
+:class:`RenderedBoard` keeps the rendered image together with the parsed
+position, so moving to a new FEN only repaints the squares that changed and
+can report them as dirty rectangles with pixel patches.
+"""
+
+from collections import namedtuple
+
+from .board import as_board
+from .generator import (
+    COORD_MARGIN,
+    ChessImageGeneratorError,
+    _render,
+    get_tile_atlas,
+    load_theme,
+)
+
+
+class DirtyRect(namedtuple('DirtyRect', ['x', 'y', 'width', 'height', 'patch'])):
+    """
+    Region of a rendered board that changed.
+
+    Attributes:
+        x (int): Left edge in pixels
+        y (int): Top edge in pixels
+        width (int): Width in pixels
+        height (int): Height in pixels
+        patch (PIL.Image): New pixels of the region, or None if patches were
+            not requested
+    """
+
+    __slots__ = ()
+
+    @property
+    def box(self):
+        """tuple: (left, upper, right, lower) box as used by PIL."""
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+
+def diff_boards(old, new):
+    """
+    Find the squares whose contents differ between two boards.
+
+    Boards are compared rank by rank on their 64-byte ``squares``, so only
+    ranks that changed are looked at square by square.
+
+    Args:
+        old (Board or list): Previous position, as a :class:`Board` or any
+            position accepted by :func:`as_board` (such as the 8x8 array
+            returned by :func:`parse_fen`)
+        new (Board or list): New position, in the same forms as ``old``
+
+    Returns:
+        list: (row, col) tuples of changed squares, row 0 being rank 8
+    """
+    old = as_board(old).squares
+    new = as_board(new).squares
+    if old == new:
+        return []
+    changed = []
+    for start in range(0, 64, 8):
+        old_rank = old[start:start + 8]
+        new_rank = new[start:start + 8]
+        if old_rank != new_rank:
+            row = start // 8
+            changed.extend((row, col) for col in range(8) if old_rank[col] != new_rank[col])
+    return changed
+
+
+class RenderedBoard:
+    """
+    Rendered board that can be updated in place to a new position.
+
+    Args:
+        fen (str or Board): FEN notation string, or any position accepted by
+            :func:`~chessboard_image.board.as_board`
+        size (int): Board size in pixels (default: 400)
+        theme_file (str, optional): Path to theme JSON file
+        theme_name (str): Theme name to use (default: "wikipedia")
+        player_pov (str): Player perspective - "white" or "black" (default: "white")
+        show_coordinates (bool): Show file/rank labels (default: False)
+        font_path (str, optional): TrueType font for the coordinate labels
+
+    Attributes:
+        image (PIL.Image): Current rendered image
+        board (Board): Current position
+        fen (str): FEN of the current position (the board field only if
+            the position was not given as a FEN)
+    """
+
+    def __init__(self, fen, size=400, theme_file=None, theme_name="wikipedia",
+                 player_pov="white", show_coordinates=False, font_path=None):
+        board = as_board(fen)
+        self.image = _render(board, size, theme_file, theme_name, player_pov, show_coordinates,
+                             font_path=font_path)
+        self.board = board
+        self.fen = fen if isinstance(fen, str) else board.fen()
+        self.theme = load_theme(theme_file, theme_name)
+        self.size = size
+        self.player_pov = player_pov
+        self.show_coordinates = show_coordinates
+
+    def square_box(self, row, col):
+        """
+        Get the pixel box of a square.
+
+        Args:
+            row (int): Board row, 0 being rank 8
+            col (int): Board column, 0 being file a
+
+        Returns:
+            tuple: (left, upper, right, lower) box in image coordinates
+        """
+        if self.player_pov == "black":
+            row, col = 7 - row, 7 - col
+        square_size = self.size // 8
+        offset = COORD_MARGIN if self.show_coordinates else 0
+        x = offset + col * square_size
+        y = offset + row * square_size
+        return (x, y, x + square_size, y + square_size)
+
+    def _repaint(self, board, row, col):
+        box = self.square_box(row, col)
+        atlas = get_tile_atlas(self.theme, self.size // 8)
+        self.image.paste(atlas[((row + col) % 2, board[row, col])], box[:2])
+        return box
+
+    def update(self, fen, patches=False):
+        """
+        Move the board to a new position, repainting only changed squares.
+
+        The resulting image is identical to a full render of ``fen``.
+
+        Args:
+            fen (str or Board): FEN notation (or board) of the new position
+            patches (bool): Include the new pixels of every changed square in
+                the returned rectangles (default: False)
+
+        Returns:
+            list: :class:`DirtyRect` for every repainted square
+
+        Raises:
+            InvalidFENError: If FEN notation is invalid
+            ChessImageGeneratorError: If repainting fails
+        """
+        board = as_board(fen)
+        changed = diff_boards(self.board, board)
+
+        rects = []
+        try:
+            for row, col in changed:
+                box = self._repaint(board, row, col)
+                patch = self.image.crop(box) if patches else None
+                rects.append(DirtyRect(box[0], box[1], box[2] - box[0], box[3] - box[1], patch))
+        except Exception as e:
+            # Put back the squares already repainted, so the image still
+            # shows the position later updates are diffed against
+            for row, col in changed[:len(rects) + 1]:
+                try:
+                    self._repaint(self.board, row, col)
+                except Exception:
+                    break
+            raise ChessImageGeneratorError(f"Failed to update image: {e}")
+        # Only move to the new position once the image shows it
+        self.board = board
+        self.fen = fen if isinstance(fen, str) else board.fen()
+        return rects
+
+    def copy(self):
+        """
+        Get an independent copy of this rendered board.
+
+        Returns:
+            RenderedBoard: Copy whose image can be updated separately
+        """
+        clone = object.__new__(RenderedBoard)
+        clone.__dict__.update(self.__dict__)
+        clone.image = self.image.copy()
+        return clone
+
+
+def render_update(previous, fen, patches=True):
+    """
+    Compute the changes needed to go from a rendered board to a new position.
+
+    Unlike :meth:`RenderedBoard.update` this leaves ``previous`` untouched.
+
+    Args:
+        previous (RenderedBoard): Board rendered for the previous position
+        fen (str or Board): FEN notation (or board) of the new position
+        patches (bool): Include pixel patches in the rectangles (default: True)
+
+    Returns:
+        tuple: (RenderedBoard for ``fen``, list of :class:`DirtyRect`)
+    """
+    board = previous.copy()
+    rects = board.update(fen, patches=patches)
+    return board, rects
@@ -0,0 +1,465 @@
+"""
+HTTP server rendering boards on request (``chessboard-image serve``).
+
+``GET /board.png?fen=...&size=...&theme=...&pov=...&coords=...`` returns the
+rendered board (``/board.webp`` and ``/board.jpg`` select other formats).
+Responses carry a strong ETag derived from the render parameters, so a
+conditional request for a board the client already has is answered with
+``304 Not Modified`` without rendering. Encoded boards are kept in a
+:class:`~chessboard_image.ResultCache` and cache misses are rendered in a
+process pool. ``GET /metrics`` reports request, render and cache counters in
+the Prometheus text format.
+
+The server is built on :mod:`http.server` and meant to run behind a reverse
+proxy that handles TLS and connection limits.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .batch import _init_worker
+from .cache import DiskCache, ResultCache
+from .generator import (
+    OUTPUT_FORMATS,
+    ChessImageGeneratorError,
+    InvalidFENError,
+    ThemeNotFoundError,
+    _encoder,
+    __version__,
+    _result_key,
+    generate_bytes,
+)
+
+# Content types of the PIL formats the server can produce
+CONTENT_TYPES = {
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+}
+
+# Query string values accepted for ``coords``
+_TRUE = ('1', 'true', 'yes', 'on')
+_FALSE = ('', '0', 'false', 'no', 'off')
+
+
+class BadRequest(Exception):
+    """Request rejected with a client error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ServerMetrics:
+    """
+    Thread-safe request and render counters of a :class:`BoardServer`.
+
+    Attributes:
+        requests (dict): Request count keyed by (route, status)
+        renders (int): Number of boards rendered (cache misses)
+        render_seconds (float): Total time spent rendering
+        not_modified (int): Number of 304 responses
+        rejected (int): Requests refused because too many renders were pending
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.request_seconds = 0.0
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.not_modified = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    def record_request(self, route, status, seconds):
+        with self._lock:
+            key = (route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.request_seconds += seconds
+            if status == 304:
+                self.not_modified += 1
+            elif status == 503:
+                self.rejected += 1
+
+    def record_render(self, seconds):
+        with self._lock:
+            self.renders += 1
+            self.render_seconds += seconds
+
+    def render_text(self, cache):
+        """
+        Format the metrics in the Prometheus text exposition format.
+
+        Args:
+            cache (ResultCache): Cache whose statistics are included
+
+        Returns:
+            str: Metrics text
+        """
+        with self._lock:
+            requests = sorted(self.requests.items())
+            lines = [
+                '# HELP chessboard_requests_total HTTP requests by route and status.',
+                '# TYPE chessboard_requests_total counter',
+            ]
+            lines += [
+                f'chessboard_requests_total{{route="{route}",status="{status}"}} {count}'
+                for (route, status), count in requests
+            ]
+            total = sum(count for _, count in requests)
+            lines += [
+                '# HELP chessboard_request_seconds Time spent handling requests.',
+                '# TYPE chessboard_request_seconds summary',
+                f'chessboard_request_seconds_count {total}',
+                f'chessboard_request_seconds_sum {self.request_seconds:.6f}',
+                '# HELP chessboard_render_seconds Time spent rendering boards on cache misses.',
+                '# TYPE chessboard_render_seconds summary',
+                f'chessboard_render_seconds_count {self.renders}',
+                f'chessboard_render_seconds_sum {self.render_seconds:.6f}',
+                '# HELP chessboard_renders_in_flight Renders currently running or queued.',
+                '# TYPE chessboard_renders_in_flight gauge',
+                f'chessboard_renders_in_flight {self.in_flight}',
+                '# HELP chessboard_not_modified_total Conditional requests answered with 304.',
+                '# TYPE chessboard_not_modified_total counter',
+                f'chessboard_not_modified_total {self.not_modified}',
+                '# HELP chessboard_rejected_total Requests refused because too many renders were pending.',
+                '# TYPE chessboard_rejected_total counter',
+                f'chessboard_rejected_total {self.rejected}',
+            ]
+
+        stats = cache.stats()
+        lines += [
+            '# HELP chessboard_cache_hits_total Result cache hits.',
+            '# TYPE chessboard_cache_hits_total counter',
+            f'chessboard_cache_hits_total {stats["hits"]}',
+            '# HELP chessboard_cache_misses_total Result cache misses.',
+            '# TYPE chessboard_cache_misses_total counter',
+            f'chessboard_cache_misses_total {stats["misses"]}',
+            '# HELP chessboard_cache_bytes Size of the cached boards per tier.',
+            '# TYPE chessboard_cache_bytes gauge',
+            f'chessboard_cache_bytes{{tier="memory"}} {stats["memory"]["bytes"]}',
+        ]
+        if stats['disk'] is not None:
+            lines.append(f'chessboard_cache_bytes{{tier="disk"}} {stats["disk"]["bytes"]}')
+        lines += [
+            '# HELP chessboard_cache_evictions_total Result cache evictions per tier.',
+            '# TYPE chessboard_cache_evictions_total counter',
+            f'chessboard_cache_evictions_total{{tier="memory"}} {stats["memory"]["evictions"]}',
+        ]
+        if stats['disk'] is not None:
+            lines.append(f'chessboard_cache_evictions_total{{tier="disk"}} {stats["disk"]["evictions"]}')
+        return '\n'.join(lines) + '\n'
+
+
+class BoardRequestHandler(BaseHTTPRequestHandler):
+    """Request handler of :class:`BoardServer`."""
+
+    server_version = f'chessboard-image/{__version__}'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _handle(self, send_body):
+        start = time.perf_counter()
+        route = 'other'
+        try:
+            if len(self.path) > self.server.max_url_length:
+                raise BadRequest(414, 'Request URL too long')
+            if (self.headers.get('Content-Length', '0').strip() != '0'
+                    or self.headers.get('Transfer-Encoding') is not None):
+                # The body is never read, so the connection cannot be reused
+                self.close_connection = True
+                raise BadRequest(413, 'Request body not allowed')
+
+            url = urlsplit(self.path)
+            if url.path == '/metrics':
+                route = 'metrics'
+                body = self.server.metrics.render_text(self.server.cache).encode('utf-8')
+                status = self._send(200, body, 'text/plain; version=0.0.4; charset=utf-8', send_body)
+            elif url.path == '/healthz':
+                route = 'healthz'
+                status = self._send(200, b'ok\n', 'text/plain; charset=utf-8', send_body)
+            elif url.path.startswith('/board.') and url.path[7:] in OUTPUT_FORMATS:
+                route = 'board'
+                status = self._board(url.path[7:], parse_qs(url.query, keep_blank_values=True), send_body)
+            else:
+                raise BadRequest(404, 'Not found')
+        except BadRequest as e:
+            headers = {'Retry-After': '1'} if e.status == 503 else None
+            status = self._send(e.status, f'{e}\n'.encode('utf-8'), 'text/plain; charset=utf-8',
+                                send_body, headers)
+        except Exception as e:
+            status = self._send(500, f'Failed to render board: {e}\n'.encode('utf-8'),
+                                'text/plain; charset=utf-8', send_body)
+        self.server.metrics.record_request(route, status, time.perf_counter() - start)
+
+    def _send(self, status, body, content_type, send_body, headers=None):
+        self.send_response(status)
+        if content_type is not None:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+        return status
+
+    def _board(self, format, query, send_body):
+        server = self.server
+        options = server.parse_query(query)
+        pil_format, encoder_options = _encoder(format, None)
+        try:
+            key = _result_key(options['fen'], options['size'], server.theme_file, options['theme_name'],
+                              options['player_pov'], options['show_coordinates'], None, pil_format,
+                              encoder_options, False)
+        except InvalidFENError as e:
+            raise BadRequest(400, f'Invalid FEN: {e}')
+        except ThemeNotFoundError as e:
+            raise BadRequest(404, f'Theme error: {e}')
+
+        etag = '"' + DiskCache.digest(key)[:32] + '"'
+        headers = {'ETag': etag, 'Cache-Control': server.cache_control}
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            # If-None-Match uses weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            tags = [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+            if etag in tags or '*' in tags:
+                return self._send(304, b'', None, False, headers)
+
+        data = server.cache.get(key)
+        if data is None:
+            try:
+                data = server.render(key, dict(options, format=format))
+            except FutureTimeoutError:
+                # The render keeps its slot until it finishes; ask the client to retry
+                raise BadRequest(503, 'Render timed out')
+        return self._send(200, data, CONTENT_TYPES[pil_format], send_body, headers)
+
+
+class BoardServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server rendering chess boards.
+
+    Args:
+        address (tuple): (host, port) to listen on; port 0 picks a free port
+        workers (int, optional): Number of render processes. Defaults to the
+            CPU count; 0 renders in the request threads.
+        theme_file (str, optional): Theme file or theme pack served. Clients
+            choose a theme within it with ``theme=``.
+        theme_name (str): Theme used when a request has no ``theme=``
+            (default: "wikipedia")
+        cache (ResultCache, optional): Cache of encoded boards. Defaults to a
+            64 MB memory-only cache.
+        max_age (int): ``Cache-Control`` max-age in seconds (default: 86400)
+        max_size (int): Largest board size accepted in pixels (default: 2048)
+        max_url_length (int): Longest request URL accepted (default: 2048)
+        max_pending (int): Renders allowed to run or queue at once; further
+            cache misses get ``503 Service Unavailable`` (default: 64)
+        render_timeout (float): Seconds to wait for a render (default: 30)
+        quiet (bool): Do not log requests to stderr (default: False)
+    """
+
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self, address, workers=None, theme_file=None, theme_name="wikipedia", cache=None,
+                 max_age=86400, max_size=2048, max_url_length=2048, max_pending=64, render_timeout=30,
+                 quiet=False):
+        self.theme_file = theme_file
+        self.theme_name = theme_name
+        self.cache = cache if cache is not None else ResultCache()
+        self.cache_control = f'public, max-age={max_age}'
+        self.max_size = max_size
+        self.max_url_length = max_url_length
+        self.max_pending = max_pending
+        self.render_timeout = render_timeout
+        self.quiet = quiet
+        self.metrics = ServerMetrics()
+        self._pending_lock = threading.Lock()
+        self._renders = {}
+        # Pool tasks not yet done, including renders that timed out
+        self._tasks = set()
+        super().__init__(address, BoardRequestHandler)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.pool = None
+        if workers > 0:
+            warm = {
+                'theme_file': theme_file,
+                'theme_name': theme_name,
+                'size': 400,
+                'show_coordinates': False,
+                'player_pov': 'white',
+                'font_path': None,
+                'palette': False,
+            }
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(warm,))
+            # Start the workers before any request thread exists
+            self.pool.submit(os.getpid).result()
+
+    @property
+    def url(self):
+        """str: Base URL the server listens on."""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def parse_query(self, query):
+        """
+        Turn the query string of a board request into render options.
+
+        Args:
+            query (dict): Parsed query string as returned by ``parse_qs``
+
+        Returns:
+            dict: ``fen``, ``size``, ``theme_name``, ``player_pov`` and
+            ``show_coordinates``
+
+        Raises:
+            BadRequest: If a parameter is missing or invalid
+        """
+        def param(name, default=None):
+            values = query.get(name)
+            return values[-1] if values else default
+
+        fen = param('fen')
+        if not fen:
+            raise BadRequest(400, 'Missing fen parameter')
+        try:
+            size = int(param('size', 400))
+        except ValueError:
+            raise BadRequest(400, 'size must be an integer')
+        if not 8 <= size <= self.max_size:
+            raise BadRequest(400, f'size must be between 8 and {self.max_size}')
+        pov = param('pov', 'white')
+        if pov not in ('white', 'black'):
+            raise BadRequest(400, "pov must be 'white' or 'black'")
+        coords = param('coords', '').lower()
+        if coords not in _TRUE + _FALSE:
+            raise BadRequest(400, 'coords must be a boolean')
+        return {
+            'fen': fen,
+            'size': size,
+            'theme_name': param('theme', self.theme_name),
+            'player_pov': pov,
+            'show_coordinates': coords in _TRUE,
+        }
+
+    def render(self, key, options):
+        """
+        Render a board and store it in the cache.
+
+        Boards are rendered in the worker pool (or the calling thread without
+        one). Concurrent requests for the same key share a single render.
+
+        Args:
+            key (tuple): Result cache key of the board
+            options (dict): ``fen`` plus keyword arguments of
+                :func:`~chessboard_image.generate_bytes`
+
+        Returns:
+            bytes: Encoded image data
+
+        Raises:
+            BadRequest: With status 503 if ``max_pending`` renders are pending
+            concurrent.futures.TimeoutError: If the render takes longer than
+                ``render_timeout``
+            ChessImageGeneratorError: If rendering fails
+        """
+        with self._pending_lock:
+            future = self._renders.get(key)
+            if future is not None:
+                owner = False
+            elif self.metrics.in_flight >= self.max_pending:
+                raise BadRequest(503, 'Too many pending renders')
+            else:
+                owner = True
+                future = self._renders[key] = Future()
+                self.metrics.in_flight += 1
+        if not owner:
+            return future.result(timeout=self.render_timeout)
+
+        start = time.perf_counter()
+        task = None
+        try:
+            options = dict(options, theme_file=self.theme_file)
+            fen = options.pop('fen')
+            if self.pool is None:
+                data = generate_bytes(fen, **options)
+            else:
+                task = self.pool.submit(generate_bytes, fen, **options)
+                with self._pending_lock:
+                    self._tasks.add(task)
+                # A render that times out keeps running in the pool, so its
+                # slot is only released when the task is done
+                task.add_done_callback(self._task_done)
+                data = task.result(timeout=self.render_timeout)
+            self.cache.put(key, data)
+            future.set_result(data)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._pending_lock:
+                del self._renders[key]
+                if task is None:
+                    self.metrics.in_flight -= 1
+        self.metrics.record_render(time.perf_counter() - start)
+        return data
+
+    def _task_done(self, task):
+        with self._pending_lock:
+            self._tasks.discard(task)
+            self.metrics.in_flight -= 1
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            # Drop queued renders; shutdown(cancel_futures=True) needs Python 3.9
+            with self._pending_lock:
+                tasks = list(self._tasks)
+            for task in tasks:
+                task.cancel()
+            self.pool.shutdown(wait=True)
+
+
+def serve(host='127.0.0.1', port=8000, **options):
+    """
+    Run a :class:`BoardServer` until interrupted.
+
+    Args:
+        host (str): Interface to listen on (default: "127.0.0.1")
+        port (int): Port to listen on (default: 8000)
+        **options: Keyword arguments of :class:`BoardServer`
+
+    Raises:
+        ChessImageGeneratorError: If the server cannot listen on the address
+    """
+    try:
+        server = BoardServer((host, port), **options)
+    except OSError as e:
+        raise ChessImageGeneratorError(f"Cannot listen on {host}:{port}: {e}")
+    print(f"Serving chess boards on {server.url}/board.png?fen=...", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,223 @@
+"""
+Contact sheets: many boards laid out in a grid on one image.
+
+Sheets are rendered one grid row at a time and written with a small streaming
+PNG encoder. Each row of boards is compressed and flushed to the output as
+its own ``IDAT`` chunk as soon as it is drawn, so memory stays proportional to
+one row of boards however many diagrams the sheet holds. Only the list of positions is kept
+for the whole sheet, because the PNG header needs the number of rows.
+"""
+
+import math
+import os
+import struct
+import zlib
+
+from .batch import _split_item
+from .generator import COORD_MARGIN, _resolve_font, generate_pil
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Render options that may be overridden per item; size and coordinates are
+# shared by all boards because they set the grid geometry
+ITEM_OPTIONS = ('theme_file', 'theme_name', 'player_pov', 'palette')
+
+# Space below each board holding its caption, in pixels
+CAPTION_HEIGHT = 24
+
+
+class _PNGWriter:
+    """Write an RGB PNG scanline by scanline."""
+
+    def __init__(self, f, width, height, compress_level):
+        self.f = f
+        self.stride = width * 3
+        self.rows_left = height
+        self.compressor = zlib.compressobj(compress_level)
+        f.write(PNG_SIGNATURE)
+        # 8 bits per channel, color type 2 (RGB), no interlacing
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self.f.write(struct.pack('>I', len(data)))
+        self.f.write(kind)
+        self.f.write(data)
+        self.f.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_pixels(self, pixels):
+        """Compress raw RGB rows, each prefixed with filter type 0."""
+        stride = self.stride
+        rows = len(pixels) // stride
+        self.rows_left -= rows
+        data = b''.join(b'\x00' + pixels[i:i + stride] for i in range(0, rows * stride, stride))
+        compressed = self.compressor.compress(data)
+        if compressed:
+            self._chunk(b'IDAT', compressed)
+
+    def flush(self):
+        """Emit everything compressed so far, so readers of a pipe or socket get whole rows."""
+        self._chunk(b'IDAT', self.compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    def write_blank(self, rows, color):
+        """Write rows of a single color."""
+        if rows > 0:
+            self.write_pixels(bytes(color) * (self.stride // 3 * rows))
+
+    def close(self):
+        if self.rows_left != 0:
+            raise RuntimeError(f"PNG is {self.rows_left} rows short")
+        self._chunk(b'IDAT', self.compressor.flush())
+        self._chunk(b'IEND', b'')
+
+
+def sheet_layout(count, cols=4, rows=None, size=200, show_coordinates=False, spacing=16, margin=None,
+                 captions=False):
+    """
+    Compute the geometry of a contact sheet.
+
+    Args:
+        count (int): Number of boards
+        cols (int): Boards per row (default: 4)
+        rows (int, optional): Rows of the grid. Defaults to as many as the
+            boards need.
+        size (int): Board size in pixels (default: 200)
+        show_coordinates (bool): Boards have a coordinate margin (default: False)
+        spacing (int): Space between boards in pixels (default: 16)
+        margin (int, optional): Space around the grid. Defaults to ``spacing``.
+        captions (bool): Reserve space for a caption below every board
+
+    Returns:
+        dict: ``cols``, ``rows``, ``cell_width``, ``cell_height``,
+        ``board_size``, ``margin``, ``spacing``, ``width`` and ``height``
+
+    Raises:
+        ValueError: If the grid is empty or too small for the boards
+    """
+    if cols < 1:
+        raise ValueError(f"cols must be at least 1, got {cols}")
+    if rows is None:
+        rows = max(1, math.ceil(count / cols))
+    if rows < 1 or count > rows * cols:
+        raise ValueError(f"{count} boards do not fit in {rows} rows of {cols}")
+    if margin is None:
+        margin = spacing
+    board_size = size + (2 * COORD_MARGIN if show_coordinates else 0)
+    cell_height = board_size + (CAPTION_HEIGHT if captions else 0)
+    return {
+        'cols': cols,
+        'rows': rows,
+        'cell_width': board_size,
+        'cell_height': cell_height,
+        'board_size': board_size,
+        'margin': margin,
+        'spacing': spacing,
+        'width': 2 * margin + cols * board_size + (cols - 1) * spacing,
+        'height': 2 * margin + rows * cell_height + (rows - 1) * spacing,
+    }
+
+
+def _draw_row(row_items, layout, render_options, font, background, text_color):
+    """Render one grid row of boards and their captions into a band image."""
+    from PIL import Image, ImageDraw
+
+    band = Image.new('RGB', (layout['width'], layout['cell_height']), background)
+    draw = None
+    for col, (position, caption, options) in enumerate(row_items):
+        x = layout['margin'] + col * (layout['cell_width'] + layout['spacing'])
+        with generate_pil(position, **dict(render_options, **options) if options else render_options) as board:
+            band.paste(board, (x, 0))
+        if caption:
+            if draw is None:
+                draw = ImageDraw.Draw(band)
+            draw.text((x + layout['cell_width'] // 2, layout['board_size'] + CAPTION_HEIGHT // 2),
+                      str(caption), fill=text_color, font=font, anchor='mm')
+    return band
+
+
+def generate_sheet(fens, output_path, cols=4, rows=None, size=200, spacing=16, margin=None,
+                   background="white", text_color="black", theme_file=None, theme_name="wikipedia",
+                   player_pov="white", show_coordinates=False, font_path=None, palette=False,
+                   compress_level=6):
+    """
+    Render many positions into one PNG contact sheet.
+
+    Boards fill the grid row by row. Each grid row is rendered, compressed
+    and written before the next one starts, so memory use is bounded by one
+    row of boards regardless of the number of positions.
+
+    Args:
+        fens (iterable): Positions (FEN strings, :class:`~chessboard_image.Board`,
+            python-chess boards or 64-square sequences), or ``(fen, caption)`` /
+            ``(fen, caption, options)`` tuples. ``caption`` is drawn below
+            the board and ``options`` overrides :data:`ITEM_OPTIONS` (theme
+            and perspective) for that board.
+        output_path (str or file object): Output file path or writable binary
+            file object
+        cols (int): Boards per row (default: 4)
+        rows (int, optional): Rows of the grid (default: as many as needed)
+        size (int): Board size in pixels (default: 200)
+        spacing (int): Space between boards in pixels (default: 16)
+        margin (int, optional): Space around the grid (default: ``spacing``)
+        background: Sheet color, any PIL color (default: "white")
+        text_color: Caption color, any PIL color (default: "black")
+        theme_file (str, optional): Path to theme JSON file
+        theme_name (str): Theme name to use (default: "wikipedia")
+        player_pov (str): Player perspective - "white" or "black" (default: "white")
+        show_coordinates (bool): Show file/rank labels (default: False)
+        font_path (str, optional): TrueType font for coordinates and captions
+        palette (bool): Render boards in indexed-color mode (default: False)
+        compress_level (int): zlib compression level, 0-9 (default: 6)
+
+    Returns:
+        str or file object: ``output_path``
+
+    Raises:
+        ValueError: If the boards do not fit in the grid or an item has
+            unsupported options
+        InvalidFENError: If a FEN is invalid
+        ThemeNotFoundError: If a theme is not found
+        ChessImageGeneratorError: If a board cannot be rendered
+    """
+    from PIL import ImageColor
+
+    items = [_split_item(index, item, ITEM_OPTIONS) for index, item in enumerate(fens)]
+    captions = any(caption for _, caption, _ in items)
+    layout = sheet_layout(len(items), cols, rows, size, show_coordinates, spacing, margin, captions)
+    render_options = {
+        'size': size,
+        'theme_file': theme_file,
+        'theme_name': theme_name,
+        'player_pov': player_pov,
+        'show_coordinates': show_coordinates,
+        'font_path': font_path,
+        'palette': palette,
+    }
+    font = _resolve_font(font_path)[1] if captions else None
+    background_rgb = tuple(ImageColor.getrgb(background) if isinstance(background, str) else background)[:3]
+
+    f = output_path if hasattr(output_path, 'write') else open(output_path, 'wb')
+    try:
+        writer = _PNGWriter(f, layout['width'], layout['height'], compress_level)
+        writer.write_blank(layout['margin'], background_rgb)
+        for row in range(layout['rows']):
+            if row:
+                writer.write_blank(layout['spacing'], background_rgb)
+            row_items = items[row * cols:(row + 1) * cols]
+            if row_items:
+                band = _draw_row(row_items, layout, render_options, font, background, text_color)
+                writer.write_pixels(band.tobytes())
+                band.close()
+                writer.flush()
+            else:
+                writer.write_blank(layout['cell_height'], background_rgb)
+        writer.write_blank(layout['margin'], background_rgb)
+        writer.close()
+    except BaseException:
+        if f is not output_path:
+            # Do not leave a truncated sheet behind
+            f.close()
+            os.unlink(output_path)
+        raise
+    if f is not output_path:
+        f.close()
+    return output_path
@@ -0,0 +1,188 @@
+"""
+Byte-offset index of JSON theme files.
+
+Theme files hold every piece of every theme as a base64 PNG string, so parsing
+the whole file to use one theme does a lot of wasted work. The index records
+where each theme starts and ends in the file, together with its board colors
+and piece codes, so listing themes needs no JSON parsing at all and loading a
+theme only decodes that theme's own bytes. Piece images themselves are decoded
+on first use by the sprite cache.
+
+The index is built in one pass over the file and cached next to it as
+``<theme file>.idx`` when that directory is writable. A cached index is only
+used while the theme file's modification time and size are unchanged.
+"""
+
+import json
+import os
+import re
+from json.decoder import scanstring
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.idx'
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def _skip(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _members(text, raw, pos, parse_value):
+    """
+    Walk the members of the JSON object starting at ``pos``.
+
+    ``parse_value(key, start)`` is called for every member with the position
+    of its value and returns the position just after it.
+
+    Returns:
+        int: Position just after the closing brace
+    """
+    pos = _skip(text, pos)
+    if text[pos:pos + 1] != '{':
+        raise json.JSONDecodeError("Expecting object", text, pos)
+    pos = _skip(text, pos + 1)
+    if text[pos:pos + 1] == '}':
+        return pos + 1
+    while True:
+        if text[pos:pos + 1] != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+        _, end = scanstring(text, pos + 1)
+        # The text is decoded as latin-1 to keep byte offsets, so decode names from the raw bytes
+        key = json.loads(raw[pos:end].decode('utf-8'))
+        pos = _skip(text, end)
+        if text[pos:pos + 1] != ':':
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = _skip(text, parse_value(key, _skip(text, pos + 1)))
+        delimiter = text[pos:pos + 1]
+        if delimiter == '}':
+            return pos + 1
+        if delimiter != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _skip(text, pos + 1)
+
+
+def build_index(raw):
+    """
+    Index the themes of a JSON theme file.
+
+    Args:
+        raw (bytes): Contents of the theme file
+
+    Returns:
+        dict: ``{name: {'span': [start, end], 'board': [...], 'pieces':
+        [key, ...]}}`` with byte offsets into ``raw``
+
+    Raises:
+        json.JSONDecodeError: If the file is not a valid theme file
+    """
+    text = raw.decode('latin-1')
+    themes = {}
+
+    def skip_value(key, pos):
+        return _decoder.raw_decode(text, pos)[1]
+
+    def index_theme(name, start):
+        entry = {'span': [start, None], 'board': [], 'pieces': []}
+
+        def index_piece(key, pos):
+            entry['pieces'].append(key)
+            return skip_value(key, pos)
+
+        def index_member(key, pos):
+            if key == 'pieces':
+                return _members(text, raw, pos, index_piece)
+            end = skip_value(key, pos)
+            if key == 'board':
+                entry['board'] = json.loads(raw[pos:end].decode('utf-8'))
+            return end
+
+        end = _members(text, raw, start, index_member)
+        entry['span'][1] = end
+        themes[name] = entry
+        return end
+
+    end = _skip(text, _members(text, raw, 0, index_theme))
+    if end != len(text):
+        raise json.JSONDecodeError("Extra data", text, end)
+    return themes
+
+
+def _read_cached(index_path, stamp):
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict):
+        return None
+    if cached.get('version') != INDEX_VERSION or cached.get('stamp') != list(stamp):
+        return None
+    return cached.get('themes')
+
+
+def _write_cached(index_path, stamp, themes):
+    import tempfile
+
+    directory = os.path.dirname(index_path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.themeindex-')
+    except OSError:
+        # Read-only install location: keep the index in memory only
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'stamp': list(stamp), 'themes': themes}, f,
+                      separators=(',', ':'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def load_index(path, stamp):
+    """
+    Get the index of a theme file, using the cached copy when it is current.
+
+    Args:
+        path (str): Path of the JSON theme file
+        stamp (tuple): ``(st_mtime_ns, st_size)`` of the theme file
+
+    Returns:
+        dict: Theme index as returned by :func:`build_index`
+
+    Raises:
+        OSError: If the theme file cannot be read
+        json.JSONDecodeError: If the theme file is not valid JSON
+    """
+    index_path = path + INDEX_SUFFIX
+    themes = _read_cached(index_path, stamp)
+    if themes is None:
+        with open(path, 'rb') as f:
+            themes = build_index(f.read())
+        _write_cached(index_path, stamp, themes)
+    return themes
+
+
+def read_theme(path, entry):
+    """
+    Parse a single theme using its index entry.
+
+    Args:
+        path (str): Path of the JSON theme file
+        entry (dict): Index entry of the theme
+
+    Returns:
+        dict: Theme data with ``pieces`` and ``board``
+
+    Raises:
+        OSError: If the theme file cannot be read
+        json.JSONDecodeError: If the indexed bytes are not a JSON object
+    """
+    start, end = entry['span']
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return json.loads(data.decode('utf-8'))
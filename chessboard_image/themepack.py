@@ -0,0 +1,259 @@
+"""
+Binary theme pack format.
+
+A theme pack stores the pieces of one or more themes as ready-to-use RGBA
+pixel planes, so loading a theme needs no JSON parsing of image data, no
+base64 decoding and no PNG decompression. Packs are opened with ``mmap``:
+only the pages of the pieces actually used are read, and worker processes
+forked from one parent share the mapped pages.
+
+Layout (all integers little-endian)::
+
+    header   8s magic "CBTPACK\\0", H version, H reserved, I index length
+    index    UTF-8 JSON: {"themes": {name: {"board": [light, dark],
+             "pieces": {key: [offset, length, width, height, codec]}}}}
+    data     piece planes; offsets in the index are relative to the start
+             of this section, which directly follows the index
+
+``codec`` is "raw" (uncompressed RGBA, mapped without copying) or "zlib".
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b'CBTPACK\0'
+VERSION = 1
+HEADER = struct.Struct('<8sHHI')
+
+# Supported piece plane encodings
+CODECS = ('raw', 'zlib')
+
+
+def is_theme_pack(path):
+    """
+    Check whether a file is a binary theme pack.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        bool: True if the file starts with the theme pack magic bytes
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class PackedPiece:
+    """
+    Piece image stored in a theme pack.
+
+    Used in place of the list of base64 data URLs that JSON themes hold for
+    each piece.
+    """
+
+    __slots__ = ('_buffer', 'offset', 'length', 'width', 'height', 'codec')
+
+    def __init__(self, buffer, offset, length, width, height, codec):
+        self._buffer = buffer
+        self.offset = offset
+        self.length = length
+        self.width = width
+        self.height = height
+        self.codec = codec
+
+    def image(self):
+        """
+        Get the piece as a PIL image.
+
+        Raw planes are wrapped around the mapped file without copying.
+
+        Returns:
+            PIL.Image: RGBA image, read-only for raw planes
+        """
+        from PIL import Image
+
+        data = memoryview(self._buffer)[self.offset:self.offset + self.length]
+        size = (self.width, self.height)
+        if self.codec == 'zlib':
+            return Image.frombytes('RGBA', size, zlib.decompress(data))
+        return Image.frombuffer('RGBA', size, data, 'raw', 'RGBA', 0, 1)
+
+    def __repr__(self):
+        return f"PackedPiece({self.width}x{self.height}, {self.codec}, {self.length} bytes)"
+
+
+class ThemePack:
+    """
+    Read-only view of a memory-mapped theme pack.
+
+    Args:
+        path (str): Path of the theme pack file
+
+    Raises:
+        ValueError: If the file is not a valid theme pack
+        OSError: If the file cannot be opened
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mmap) < HEADER.size:
+                raise ValueError("file too short")
+            magic, version, _, index_length = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError("bad magic bytes")
+            if version != VERSION:
+                raise ValueError(f"unsupported version {version}")
+            self._data_start = HEADER.size + index_length
+            self._index = json.loads(self._mmap[HEADER.size:self._data_start].decode('utf-8'))['themes']
+        except Exception as e:
+            self._mmap.close()
+            raise ValueError(f"Invalid theme pack {path}: {e}")
+
+    def names(self):
+        """
+        Get the names of the themes in the pack.
+
+        Returns:
+            list: Theme names in file order
+        """
+        return list(self._index)
+
+    def board_colors(self, name):
+        """
+        Get the board colors of a theme without touching its pieces.
+
+        Returns:
+            list: Light and dark square colors
+        """
+        return list(self._index[name]['board'])
+
+    def piece_keys(self, name):
+        """
+        Get the piece codes available in a theme.
+
+        Returns:
+            list: Piece codes such as "wK"
+        """
+        return list(self._index[name]['pieces'])
+
+    def theme_data(self, name):
+        """
+        Get a theme in the structure used by JSON themes.
+
+        Args:
+            name (str): Theme name
+
+        Returns:
+            dict: ``{'board': [...], 'pieces': {key: PackedPiece}}``
+
+        Raises:
+            KeyError: If the theme is not in the pack
+        """
+        entry = self._index[name]
+        pieces = {
+            key: PackedPiece(self._mmap, self._data_start + offset, length, width, height, codec)
+            for key, (offset, length, width, height, codec) in entry['pieces'].items()
+        }
+        return {'board': list(entry['board']), 'pieces': pieces}
+
+    def close(self):
+        """Unmap the file unless piece images still reference it."""
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Live raw images still use the mapping; it is released with them
+            pass
+
+
+def write_theme_pack(themes, pack_path, codec='raw'):
+    """
+    Write decoded themes to a theme pack.
+
+    The file is written to a temporary name and renamed into place, so readers
+    never see a partially written pack.
+
+    Args:
+        themes (dict): Mapping of theme name to ``{'board': [...], 'pieces':
+            {key: PIL.Image}}``
+        pack_path (str): Output path
+        codec (str): Piece plane encoding - "raw" or "zlib" (default: "raw")
+    """
+    if codec not in CODECS:
+        raise ValueError(f"codec must be one of {list(CODECS)}, got '{codec}'")
+
+    planes = []
+    index = {}
+    for name, theme in themes.items():
+        pieces = {}
+        for key, image in theme['pieces'].items():
+            image = image.convert('RGBA')
+            data = image.tobytes()
+            if codec == 'zlib':
+                data = zlib.compress(data, 6)
+            pieces[key] = [len(data), image.width, image.height, codec]
+            planes.append((name, key, data))
+        index[name] = {'board': list(theme['board']), 'pieces': pieces}
+
+    offset = 0
+    for name, key, data in planes:
+        index[name]['pieces'][key].insert(0, offset)
+        offset += len(data)
+    encoded = json.dumps({'themes': index}, separators=(',', ':')).encode('utf-8')
+
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(pack_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.themepack-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(encoded)))
+            f.write(encoded)
+            for _, _, data in planes:
+                f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, pack_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def convert_theme_file(theme_file, pack_path, codec='raw', theme_names=None):
+    """
+    Convert a JSON theme file into a binary theme pack.
+
+    Args:
+        theme_file (str, optional): Path to theme JSON file. If None, uses default.
+        pack_path (str): Output path of the theme pack
+        codec (str): Piece plane encoding - "raw" or "zlib" (default: "raw")
+        theme_names (list, optional): Themes to include. If None, all themes.
+
+    Returns:
+        str: ``pack_path``
+
+    Raises:
+        ThemeNotFoundError: If the theme file or a requested theme is not found
+        ChessImageGeneratorError: If a piece image cannot be decoded
+    """
+    from .generator import _piece_image, list_themes, load_theme
+
+    if theme_names is None:
+        theme_names = list_themes(theme_file)
+    themes = {}
+    for name in theme_names:
+        theme = load_theme(theme_file, name)
+        themes[name] = {
+            'board': theme['board'],
+            'pieces': {key: _piece_image(theme, key) for key in theme['pieces']},
+        }
+    write_theme_pack(themes, pack_path, codec=codec)
+    return pack_path
@@ -0,0 +1,310 @@
+"""
+Per-stage timing of renders.
+
+The renderer marks its stages (theme loading, FEN parsing, font loading,
+background, sprite decoding, tile atlas, compositing, encoding and result
+cache lookups) with :func:`stage`. Timings are only taken while someone is
+listening:
+
+* :func:`record_stages` collects the renders of the current thread or asyncio
+  task for the duration of a ``with`` block
+* :func:`add_stage_hook` registers a callback that receives every render of
+  the process
+
+Each render is reported as a :class:`RenderStages` mapping of stage name to
+seconds spent in that stage alone (time in nested stages is not counted
+twice, so the values add up to the render time), together with the
+``perf_counter_ns`` spans it was built from. When nothing is listening a stage
+costs one global lookup and an empty ``with`` block.
+
+Renders in worker processes (:func:`~chessboard_image.generate_many` with
+workers) are not reported to the parent process.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Stage names, in the order they usually run
+STAGES = ('cache', 'theme', 'parse', 'font', 'background', 'sprites', 'tiles', 'compose', 'encode')
+
+# Self time of the render outside any stage (argument checks, copies, ...)
+OTHER = 'other'
+
+# Offset turning perf_counter_ns() values into nanoseconds since the epoch
+EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+# Callbacks receiving every finished render
+_hooks = []
+_lock = threading.Lock()
+
+# Renders are traced while a hook is registered or a recorder is active in
+# some thread; this flag keeps the disabled path to one global lookup
+_enabled = False
+_active_recorders = 0
+
+# Trace of the render in progress and recorders of the current context
+_trace = ContextVar('chessboard_image_trace', default=None)
+_recorders = ContextVar('chessboard_image_recorders', default=())
+
+
+class Span(namedtuple('Span', ['name', 'start_ns', 'end_ns', 'parent'])):
+    """
+    One timed stage of a render.
+
+    Attributes:
+        name (str): Stage name, or ``"render"`` for the whole render
+        start_ns (int): Start time from :func:`time.perf_counter_ns`
+        end_ns (int): End time from :func:`time.perf_counter_ns`
+        parent (int): Index of the enclosing span in
+            :attr:`RenderStages.spans`, or None for the render itself
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration_ns(self):
+        """int: Duration of the span in nanoseconds."""
+        return self.end_ns - self.start_ns
+
+    def unix_ns(self):
+        """
+        Get the span times in nanoseconds since the epoch.
+
+        This is the time base of OpenTelemetry (``start_time`` / ``end_time``
+        of spans) and most other tracing exporters.
+
+        Returns:
+            tuple: (start, end) in nanoseconds since the epoch
+        """
+        return self.start_ns + EPOCH_OFFSET_NS, self.end_ns + EPOCH_OFFSET_NS
+
+
+class RenderStages(dict):
+    """
+    Stage timings of one render.
+
+    Maps stage names to the seconds spent in each stage, excluding nested
+    stages. Only stages that ran are present; time outside any stage is
+    reported as ``"other"``.
+
+    Attributes:
+        spans (list): :class:`Span` objects in start order; the first is the
+            whole render
+        total (float): Wall time of the render in seconds
+    """
+
+    def __init__(self, spans, self_ns):
+        super().__init__((name, ns / 1e9) for name, ns in self_ns.items())
+        self.spans = spans
+        self.total = spans[0].duration_ns / 1e9
+
+    def __repr__(self):
+        stages = ', '.join(f"{name}={seconds * 1000:.3f}ms" for name, seconds in self.items())
+        return f"RenderStages(total={self.total * 1000:.3f}ms, {stages})"
+
+
+class StageRecorder(list):
+    """
+    Renders collected by :func:`record_stages`, as :class:`RenderStages`.
+    """
+
+    def totals(self):
+        """
+        Sum the stage timings of all recorded renders.
+
+        Returns:
+            dict: Stage name to total seconds
+        """
+        totals = {}
+        for render in self:
+            for name, seconds in render.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+
+class _Trace:
+    """Spans of the render in progress."""
+
+    __slots__ = ('spans', 'stack', 'self_ns')
+
+    def __init__(self):
+        self.spans = []
+        # [span index, name, start, nanoseconds spent in nested stages]
+        self.stack = []
+        self.self_ns = {}
+
+    def enter(self, name):
+        self.stack.append([len(self.spans), name, time.perf_counter_ns(), 0])
+        self.spans.append(None)
+
+    def exit(self):
+        end = time.perf_counter_ns()
+        index, name, start, nested = self.stack.pop()
+        duration = end - start
+        parent = self.stack[-1] if self.stack else None
+        self.spans[index] = Span(name, start, end, parent[0] if parent else None)
+        if parent is not None:
+            parent[3] += duration
+            self.self_ns[name] = self.self_ns.get(name, 0) + duration - nested
+        else:
+            self.self_ns[OTHER] = duration - nested
+
+
+class _NullStage:
+    """Stage used when nothing is listening."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, traceback):
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('name', 'trace')
+
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self):
+        self.trace.enter(self.name)
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.trace.exit()
+
+
+class _Render:
+    __slots__ = ('trace', 'token', 'recorders')
+
+    def __init__(self, recorders):
+        self.recorders = recorders
+
+    def __enter__(self):
+        self.trace = _Trace()
+        self.token = _trace.set(self.trace)
+        self.trace.enter('render')
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.trace.exit()
+        _trace.reset(self.token)
+        stages = RenderStages(self.trace.spans, self.trace.self_ns)
+        for recorder in self.recorders:
+            recorder.append(stages)
+        for hook in list(_hooks):
+            hook(stages)
+
+
+def stage(name):
+    """
+    Time a stage of the render in progress.
+
+    Args:
+        name (str): Stage name, one of :data:`STAGES`
+
+    Returns:
+        Context manager timing its block, or doing nothing when no render is
+        being traced
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    trace = _trace.get()
+    if trace is None:
+        return _NULL_STAGE
+    return _Stage(name, trace)
+
+
+def render():
+    """
+    Trace one render, unless nothing is listening or a render is already traced.
+
+    Used by the public ``generate_*`` functions; nested calls (such as
+    :func:`~chessboard_image.generate_bytes` calling
+    :func:`~chessboard_image.generate_image`) add their stages to the
+    outermost render.
+
+    Returns:
+        Context manager tracing its block
+    """
+    if not _enabled or _trace.get() is not None:
+        return _NULL_STAGE
+    recorders = _recorders.get()
+    if not recorders and not _hooks:
+        return _NULL_STAGE
+    return _Render(recorders)
+
+
+def _update_enabled():
+    global _enabled
+    _enabled = bool(_hooks) or _active_recorders > 0
+
+
+@contextmanager
+def record_stages():
+    """
+    Record the stage timings of the renders in a ``with`` block.
+
+    Only renders of the current thread or asyncio task are recorded.
+    Recorders can be nested; every active recorder receives each render.
+
+    Example:
+        >>> with record_stages() as renders:
+        ...     generate_bytes(fen)
+        >>> renders[0]
+        RenderStages(total=14.213ms, theme=0.021ms, parse=0.005ms, ..., other=0.012ms)
+
+    Yields:
+        StageRecorder: List of :class:`RenderStages`, one per render
+    """
+    global _active_recorders
+    recorder = StageRecorder()
+    token = _recorders.set(_recorders.get() + (recorder,))
+    with _lock:
+        _active_recorders += 1
+        _update_enabled()
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+        with _lock:
+            _active_recorders -= 1
+            _update_enabled()
+
+
+def add_stage_hook(callback):
+    """
+    Register a callback receiving the stage timings of every render.
+
+    Callbacks run synchronously in the rendering thread when a render
+    finishes, so they should be quick (e.g. update a histogram or hand the
+    spans to an exporter). Exceptions propagate to the caller of the render.
+
+    Args:
+        callback (callable): Called with one :class:`RenderStages` per render
+    """
+    with _lock:
+        _hooks.append(callback)
+        _update_enabled()
+
+
+def remove_stage_hook(callback):
+    """
+    Unregister a callback added with :func:`add_stage_hook`.
+
+    Args:
+        callback (callable): Callback to remove
+
+    Raises:
+        ValueError: If the callback is not registered
+    """
+    with _lock:
+        _hooks.remove(callback)
+        _update_enabled()
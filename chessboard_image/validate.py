@@ -0,0 +1,329 @@
+"""
+Bulk validation and normalization of FEN strings.
+
+:func:`parse_fen` checks only the board field, one character at a time.
+:func:`validate_fen` checks all six FEN fields and returns the canonical FEN,
+without per-square Python loops. The syntax of the last five fields is
+checked by one regular expression. The board field is expanded with a few
+``str.replace`` calls (every digit becomes that many ``1`` characters) and
+matched against another, and its piece counts are ``str.count`` calls whose
+verdict is cached per material. Boards already seen are found in a lookup
+table. The detailed error messages of :func:`parse_fen` are only computed for
+boards that fail the fast check.
+
+:func:`iter_validate` streams large inputs in chunks, optionally spread over a
+process pool.
+
+Checked:
+
+* board: 8 ranks of 8 squares, exactly one king per side, at most 8 pawns and
+  16 pieces per side, no more promoted pieces than missing pawns, no pawns on
+  the first or last rank
+* side to move: ``w`` or ``b``
+* castling: ``-`` or a subset of ``KQkq`` whose king and rook are on their
+  starting squares
+* en passant: ``-`` or a square on the third (black to move) or sixth (white
+  to move) rank behind a pawn that just advanced two squares
+* halfmove clock and fullmove number: non-negative and positive integers
+
+Attacks (such as the side not to move being in check) are not examined.
+"""
+
+import os
+import re
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .generator import InvalidFENError, parse_fen
+
+# Values used for fields missing from a board-only FEN
+DEFAULT_FIELDS = ('w', '-', '-', '0', '1')
+
+# Maximum entries of each lookup table before it is cleared
+TABLE_SIZE = 65536
+
+# Replacements expanding every digit of a board field into that many '1's
+_EXPANSIONS = tuple((str(n), '1' * n) for n in range(8, 1, -1))
+_BOARD = re.compile(r'(?:[pnbrqkPNBRQK1]{8}/){7}[pnbrqkPNBRQK1]{8}')
+_ADJACENT_DIGITS = re.compile(r'[1-8]{2}')
+_EMPTY_RUN = re.compile(r'1+')
+_EN_PASSANT = re.compile(r'[a-h][36]')
+_CASTLING_ORDER = 'KQkq'
+
+# Six fields separated by single spaces, with castling rights in canonical
+# order and counters without leading zeros
+_SIX_FIELDS = re.compile(r'(\S+) ([wb]) (-|KQ?k?q?|Qk?q?|kq?|q) (-|[a-h][36]) (0|[1-9][0-9]*) ([1-9][0-9]*)')
+
+# Order of the piece counts used as material keys
+_PIECES = 'PNBRQKpnbrqk'
+
+# Valid board fields seen so far mapped to (expanded board, canonical board field)
+_boards = {}
+
+# Piece counts of a board mapped to its error message ('' if valid)
+_materials = {}
+
+# Castling right -> (king index, king, rook index, rook) in the expanded board,
+# which has 9 characters per rank (including the slash) starting from rank 8
+_CASTLING_SQUARES = {
+    'K': (67, 'K', 70, 'R'),
+    'Q': (67, 'K', 63, 'R'),
+    'k': (4, 'k', 7, 'r'),
+    'q': (4, 'k', 0, 'r'),
+}
+
+# Side, pawn, and (piece, number in the starting position) of each color
+_SIDES = (
+    ('White', 'P', (('N', 2), ('B', 2), ('R', 2), ('Q', 1))),
+    ('Black', 'p', (('n', 2), ('b', 2), ('r', 2), ('q', 1))),
+)
+
+
+class FENResult(namedtuple('FENResult', ['line', 'fen', 'canonical', 'error'])):
+    """
+    Outcome of validating one input line.
+
+    Attributes:
+        line (int): 1-based line number in the input
+        fen (str): FEN as read from the input, stripped of whitespace
+        canonical (str): Canonical six-field FEN, or None if invalid
+        error (InvalidFENError): Validation error, or None if valid
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """bool: True if the FEN is valid."""
+        return self.error is None
+
+
+def _run_length(match):
+    return str(len(match.group()))
+
+
+def _check_material(counts):
+    """Check the piece counts of a board, returning an error message or ''."""
+    counts = dict(zip(_PIECES, counts))
+    if counts['K'] != 1 or counts['k'] != 1:
+        return f"Board must have exactly one king per side, got {counts['K']} white and {counts['k']} black"
+    for side, pawn, pieces in _SIDES:
+        pawns = counts[pawn]
+        if pawns > 8:
+            return f"{side} has {pawns} pawns, at most 8 allowed"
+        total = pawns + 1 + sum(counts[piece] for piece, _ in pieces)
+        if total > 16:
+            return f"{side} has {total} pieces, at most 16 allowed"
+        promoted = sum(max(0, counts[piece] - initial) for piece, initial in pieces)
+        if promoted > 8 - pawns:
+            return f"{side} has {promoted} promoted pieces but only {8 - pawns} missing pawns"
+    return ''
+
+
+def _check_board(placement):
+    """Validate a board field not in the board table, returning (expanded board, canonical board field)."""
+    expanded = placement
+    for digit, ones in _EXPANSIONS:
+        expanded = expanded.replace(digit, ones)
+    if not _BOARD.fullmatch(expanded):
+        # Slow path, only for invalid input: let parse_fen explain what is wrong
+        parse_fen(placement)
+        raise InvalidFENError(f"Invalid board field: '{placement}'")
+
+    counts = tuple(map(expanded.count, _PIECES))
+    error = _materials.get(counts)
+    if error is None:
+        error = _check_material(counts)
+        if len(_materials) >= TABLE_SIZE:
+            _materials.clear()
+        _materials[counts] = error
+    if error:
+        raise InvalidFENError(error)
+    back_ranks = expanded[:8] + expanded[63:]
+    if 'P' in back_ranks or 'p' in back_ranks:
+        raise InvalidFENError("Pawns cannot be on the first or last rank")
+
+    canonical = placement
+    if _ADJACENT_DIGITS.search(placement):
+        canonical = _EMPTY_RUN.sub(_run_length, expanded)
+    if len(_boards) >= TABLE_SIZE:
+        _boards.clear()
+    board = _boards[placement] = (expanded, canonical)
+    return board
+
+
+def _check_counter(value, name, minimum):
+    if not value.isdigit() or not value.isascii():
+        raise InvalidFENError(f"Invalid {name}: '{value}'")
+    number = int(value)
+    if number < minimum:
+        raise InvalidFENError(f"Invalid {name}: '{value}'")
+    return str(number)
+
+
+def _check_castling(expanded, castling):
+    """Check castling rights against the board, returning them in canonical order."""
+    if len(set(castling)) != len(castling) or not set(castling) <= set(_CASTLING_ORDER):
+        raise InvalidFENError(f"Invalid castling field: '{castling}'")
+    for right in castling:
+        king_index, king, rook_index, rook = _CASTLING_SQUARES[right]
+        if expanded[king_index] != king or expanded[rook_index] != rook:
+            raise InvalidFENError(f"Castling right '{right}' without king and rook on their starting squares")
+    if castling in _CASTLING_ORDER:
+        return castling
+    return ''.join(right for right in _CASTLING_ORDER if right in castling)
+
+
+def _check_en_passant(expanded, active, en_passant):
+    """Check that an en passant square follows a two-square pawn move."""
+    if not _EN_PASSANT.fullmatch(en_passant):
+        raise InvalidFENError(f"Invalid en passant square: '{en_passant}'")
+    if en_passant[1] != ('6' if active == 'w' else '3'):
+        raise InvalidFENError(f"En passant square '{en_passant}' is on the wrong rank for side to move '{active}'")
+    col = ord(en_passant[0]) - ord('a')
+    # Rows counted from rank 8: the square itself, the pawn's origin and where it stands now
+    if active == 'w':
+        square, origin, pawn_row, pawn = 2, 1, 3, 'p'
+    else:
+        square, origin, pawn_row, pawn = 5, 6, 4, 'P'
+    if (expanded[pawn_row * 9 + col] != pawn or expanded[square * 9 + col] != '1'
+            or expanded[origin * 9 + col] != '1'):
+        raise InvalidFENError(f"En passant square '{en_passant}' does not follow a two-square pawn move")
+
+
+def _validate_fields(fen, strict):
+    """General path of validate_fen for FENs that are not already canonical."""
+    fields = fen.split()
+    if not fields:
+        raise InvalidFENError("Empty FEN")
+    if len(fields) > 6:
+        raise InvalidFENError(f"FEN has {len(fields)} fields, expected 6")
+    if len(fields) < 6:
+        if strict:
+            raise InvalidFENError(f"FEN has {len(fields)} fields, expected 6")
+        fields += DEFAULT_FIELDS[len(fields) - 1:]
+    placement, active, castling, en_passant, halfmove, fullmove = fields
+
+    expanded, placement = _boards.get(placement) or _check_board(placement)
+    if active != 'w' and active != 'b':
+        raise InvalidFENError(f"Side to move must be 'w' or 'b', got '{active}'")
+    if castling != '-':
+        castling = _check_castling(expanded, castling)
+    if en_passant != '-':
+        _check_en_passant(expanded, active, en_passant)
+    halfmove = _check_counter(halfmove, 'halfmove clock', 0)
+    fullmove = _check_counter(fullmove, 'fullmove number', 1)
+    return f"{placement} {active} {castling} {en_passant} {halfmove} {fullmove}"
+
+
+def validate_fen(fen, strict=False):
+    """
+    Validate a FEN and get its canonical form.
+
+    The canonical form has all six fields separated by single spaces, runs of
+    empty squares merged ("44" becomes "8"), castling rights in ``KQkq``
+    order and counters without leading zeros.
+
+    Args:
+        fen (str): FEN notation string
+        strict (bool): Require all six fields. If False, missing trailing
+            fields get the defaults ``w - - 0 1`` (default: False)
+
+    Returns:
+        str: Canonical FEN
+
+    Raises:
+        InvalidFENError: If the FEN is invalid
+    """
+    # Fast path: the syntax of the last five fields is checked by one regex
+    match = _SIX_FIELDS.fullmatch(fen)
+    if match is None:
+        return _validate_fields(fen, strict)
+    placement, active, castling, en_passant = match.group(1, 2, 3, 4)
+    expanded, canonical = _boards.get(placement) or _check_board(placement)
+    if castling != '-':
+        _check_castling(expanded, castling)
+    if en_passant != '-':
+        _check_en_passant(expanded, active, en_passant)
+    if canonical == placement:
+        return fen
+    return canonical + fen[len(placement):]
+
+
+def _validate_lines(first_line, lines, strict):
+    """
+    Validate a chunk of raw input lines.
+
+    Runs in worker processes, so stripping and skipping lines happens there
+    and results are plain tuples, which are cheaper to send back than
+    :class:`FENResult` instances.
+    """
+    results = []
+    for line, fen in enumerate(lines, first_line):
+        fen = fen.strip()
+        if not fen or fen[0] == '#':
+            continue
+        try:
+            results.append((line, fen, validate_fen(fen, strict), None))
+        except InvalidFENError as e:
+            results.append((line, fen, None, e))
+    return results
+
+
+def _line_chunks(lines, chunksize):
+    """Split lines into (first line number, list of lines) chunks."""
+    lines = iter(lines)
+    first_line = 1
+    while True:
+        chunk = list(islice(lines, chunksize))
+        if not chunk:
+            return
+        yield first_line, chunk
+        first_line += len(chunk)
+
+
+def iter_validate(lines, strict=False, workers=0, chunksize=4096):
+    """
+    Validate a stream of FENs, one per line, yielding results in input order.
+
+    The input is consumed lazily, so arbitrarily large files can be streamed.
+    Blank lines and lines starting with ``#`` are skipped.
+
+    Args:
+        lines (iterable): Lines of text, e.g. an open file
+        strict (bool): Require all six FEN fields (default: False)
+        workers (int, optional): Number of worker processes. None uses the
+            CPU count; 0 validates in the current process (default: 0).
+        chunksize (int): Lines sent to a worker per task (default: 4096)
+
+    Yields:
+        FENResult: One result per non-blank line
+
+    Raises:
+        ValueError: If ``chunksize`` is less than 1
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+    chunks = _line_chunks(lines, chunksize)
+    make = FENResult._make
+
+    if workers == 0:
+        for first_line, chunk in chunks:
+            yield from map(make, _validate_lines(first_line, chunk, strict))
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            for first_line, chunk in chunks:
+                pending.append(executor.submit(_validate_lines, first_line, chunk, strict))
+                if len(pending) >= workers * 4:
+                    yield from map(make, pending.popleft().result())
+            while pending:
+                yield from map(make, pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio rendering API.
+"""
+
+import asyncio
+import threading
+import pytest
+from chessboard_image import (
+    AsyncRenderer,
+    agenerate_bytes,
+    agenerate_many,
+    generate_bytes,
+    InvalidFENError,
+)
+
+FEN = "8/8/8/8/8/8/8/4K2k w - - 0 1"
+
+
+class TestAsyncAPI:
+    """Test cases for agenerate_bytes, agenerate_many and AsyncRenderer."""
+
+    def test_agenerate_bytes_matches_sync(self):
+        """Async rendering returns the same bytes as generate_bytes."""
+        data = asyncio.run(agenerate_bytes(FEN, size=100, player_pov="black"))
+        assert data == generate_bytes(FEN, size=100, player_pov="black")
+
+    def test_agenerate_bytes_raises_render_errors(self):
+        """Render errors propagate to the awaiting coroutine."""
+        with pytest.raises(InvalidFENError):
+            asyncio.run(agenerate_bytes("invalid", size=100))
+
+    def test_agenerate_many(self):
+        """Batches keep input order and report errors per item."""
+        results = asyncio.run(agenerate_many([FEN, "invalid", FEN], size=80))
+
+        assert [r.index for r in results] == [0, 1, 2]
+        assert [r.ok for r in results] == [True, False, True]
+        assert results[0].output == generate_bytes(FEN, size=80)
+
+    def test_malformed_items_fail_per_item(self):
+        """Misspelled options and malformed items fail only their own item."""
+        items = [FEN, (FEN, None, {'sise': 100}), None, 42, FEN]
+        results = asyncio.run(agenerate_many(items, size=80))
+
+        assert [r.index for r in results] == [0, 1, 2, 3, 4]
+        assert [r.ok for r in results] == [True, False, False, False, True]
+        assert isinstance(results[1].error, ValueError)
+        assert all(r.output is None for r in results[1:4])
+
+    def test_bounded_concurrency_and_queue_depth(self):
+        """Calls beyond max_concurrency wait in the queue."""
+        release = threading.Event()
+
+        async def scenario(renderer):
+            tasks = [asyncio.ensure_future(renderer.run(release.wait)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            depth, in_flight = renderer.queue_depth, renderer.in_flight
+            release.set()
+            await asyncio.gather(*tasks)
+            return depth, in_flight
+
+        renderer = AsyncRenderer(max_workers=2, max_concurrency=1)
+        try:
+            assert asyncio.run(scenario(renderer)) == (2, 1)
+            assert renderer.stats()['completed'] == 3
+        finally:
+            renderer.close()
+
+    def test_timeout_frees_slot(self):
+        """A timed out call raises and does not block later renders."""
+        release = threading.Event()
+
+        async def scenario(renderer):
+            with pytest.raises(asyncio.TimeoutError):
+                await renderer.run(release.wait, timeout=0.05)
+            release.set()
+            return await renderer.generate_bytes(FEN, size=80, timeout=10)
+
+        renderer = AsyncRenderer(max_workers=2, max_concurrency=1)
+        try:
+            assert asyncio.run(scenario(renderer)).startswith(b'\x89PNG')
+            assert renderer.queue_depth == 0
+        finally:
+            renderer.close()
+
+    def test_timed_out_render_keeps_its_slot(self):
+        """A timed out render counts as in flight until its thread finishes."""
+        release = threading.Event()
+
+        async def scenario(renderer):
+            with pytest.raises(asyncio.TimeoutError):
+                await renderer.run(release.wait, timeout=0.05)
+            in_flight = renderer.in_flight
+            waiting = asyncio.ensure_future(renderer.run(lambda: 'next'))
+            await asyncio.sleep(0.05)
+            depth = renderer.queue_depth
+            release.set()
+            return in_flight, depth, await waiting, renderer.in_flight
+
+        renderer = AsyncRenderer(max_workers=2, max_concurrency=1)
+        try:
+            assert asyncio.run(scenario(renderer)) == (1, 1, 'next', 0)
+        finally:
+            renderer.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for animated exports.
+"""
+
+import io
+import pytest
+from PIL import Image
+from chessboard_image import (
+    generate_animation,
+    generate_pil,
+    ChessImageGeneratorError,
+)
+from chessboard_image.animation import game_positions
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2",
+]
+
+
+class FakeBoard:
+    """Minimal stand-in for chess.Board."""
+
+    def __init__(self):
+        self.index = 0
+
+    def fen(self):
+        return FENS[self.index]
+
+    def push(self, move):
+        self.index += 1
+
+
+class FakeGame:
+    """Minimal stand-in for chess.pgn.Game."""
+
+    def board(self):
+        return FakeBoard()
+
+    def mainline_moves(self):
+        return ['e2e4', 'e7e5']
+
+
+class TestAnimation:
+    """Test cases for generate_animation."""
+
+    def test_gif_frames(self):
+        """Every position becomes one GIF frame."""
+        output = io.BytesIO()
+        generate_animation(FENS, output, format='gif', size=160)
+
+        image = Image.open(io.BytesIO(output.getvalue()))
+        assert image.format == 'GIF'
+        assert image.n_frames == 3
+        assert image.size == (160, 160)
+
+    def test_gif_square_colors_exact(self):
+        """GIF frames keep the exact square colors of the theme."""
+        output = io.BytesIO()
+        generate_animation(FENS, output, format='gif', size=160, show_coordinates=True)
+
+        image = Image.open(io.BytesIO(output.getvalue()))
+        for index, fen in enumerate(FENS):
+            image.seek(index)
+            frame = image.convert('RGB')
+            expected = generate_pil(fen, size=160, show_coordinates=True)
+            # Empty squares a3 and b3, and a coordinate label pixel
+            for point in ((30, 130), (50, 130), (0, 0)):
+                assert frame.getpixel(point) == expected.getpixel(point)
+
+    def test_apng_frames_are_lossless(self):
+        """APNG frames are identical to single renders."""
+        output = io.BytesIO()
+        generate_animation(FENS, output, format='apng', size=160)
+
+        image = Image.open(io.BytesIO(output.getvalue()))
+        assert image.n_frames == 3
+        for index, fen in enumerate(FENS):
+            image.seek(index)
+            expected = generate_pil(fen, size=160)
+            assert image.convert('RGB').tobytes() == expected.tobytes()
+
+    def test_format_from_extension(self, tmp_path):
+        """The output format is inferred from the file extension."""
+        path = tmp_path / "game.webp"
+        generate_animation(FENS, str(path), size=80)
+        assert Image.open(path).format == 'WEBP'
+
+    def test_game_input(self):
+        """Games following the python-chess API are expanded into positions."""
+        assert list(game_positions(FakeGame())) == FENS
+
+        output = io.BytesIO()
+        generate_animation(FakeGame(), output, format='gif', size=80)
+        assert Image.open(io.BytesIO(output.getvalue())).n_frames == 3
+
+    def test_invalid_arguments(self):
+        """Unknown formats and empty inputs are rejected."""
+        with pytest.raises(ChessImageGeneratorError):
+            generate_animation(FENS, io.BytesIO(), format='avi')
+        with pytest.raises(ChessImageGeneratorError):
+            generate_animation([], io.BytesIO(), format='gif')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
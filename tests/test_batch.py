@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for parallel batch rendering.
+"""
+
+import os
+import tempfile
+import pytest
+from chessboard_image import (
+    Board,
+    generate_bytes,
+    generate_many,
+    iter_generate_many,
+    InvalidFENError,
+)
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+ENDGAME_FEN = "8/8/8/8/8/8/8/4K2k w - - 0 1"
+
+
+class TestGenerateMany:
+    """Test cases for generate_many and iter_generate_many."""
+
+    def test_bytes_match_single_render(self):
+        """Pool results are identical to rendering one board at a time."""
+        results = generate_many([START_FEN, ENDGAME_FEN], workers=2, chunksize=1, size=100)
+
+        assert [r.index for r in results] == [0, 1]
+        assert all(r.ok for r in results)
+        assert results[0].output == generate_bytes(START_FEN, size=100)
+        assert results[1].output == generate_bytes(ENDGAME_FEN, size=100)
+
+    def test_bad_fen_does_not_abort_batch(self):
+        """Invalid positions are reported per item."""
+        fens = [START_FEN, "not a fen", ENDGAME_FEN]
+        results = generate_many(fens, workers=2, chunksize=2, size=80)
+
+        assert [r.ok for r in results] == [True, False, True]
+        assert isinstance(results[1].error, InvalidFENError)
+        assert results[1].output is None
+
+    def test_unordered_yields_every_item(self):
+        """Unordered iteration yields each input exactly once."""
+        fens = [START_FEN, ENDGAME_FEN] * 5
+        results = list(iter_generate_many(fens, workers=2, chunksize=3, ordered=False, size=80))
+
+        assert sorted(r.index for r in results) == list(range(10))
+
+    def test_output_directory_and_item_options(self):
+        """Items can carry their own output name and render options."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            items = [
+                (START_FEN, "start"),
+                (ENDGAME_FEN, None, {'player_pov': 'black', 'size': 120}),
+            ]
+            results = generate_many(items, output_dir=output_dir, workers=0, size=80)
+
+            assert results[0].output == os.path.join(output_dir, "start.png")
+            assert results[1].output == os.path.join(output_dir, "board_000001.png")
+            with open(results[1].output, 'rb') as f:
+                assert f.read() == generate_bytes(ENDGAME_FEN, size=120, player_pov='black')
+
+    def test_names_stay_in_output_directory(self, tmp_path):
+        """Names with path components fail their item instead of escaping the directory."""
+        output_dir = tmp_path / "boards"
+        names = ["ok", "../escaped", "/tmp/absolute", "..", "sub/dir"]
+        items = [(START_FEN, name) for name in names]
+        results = generate_many(items, output_dir=str(output_dir), workers=0, size=80)
+
+        assert [r.ok for r in results] == [True, False, False, False, False]
+        assert all(isinstance(r.error, ValueError) for r in results[1:])
+        assert not (tmp_path / "escaped.png").exists()
+        assert os.listdir(output_dir) == ["ok.png"]
+
+    def test_square_sequence_positions(self):
+        """Square lists, bytes and 8x8 rows are positions, not (fen, name) items."""
+        board = Board.from_fen(START_FEN)
+        positions = [list(board), board.squares, board.rows(), (START_FEN, "start")]
+        results = generate_many(positions, workers=0, size=80)
+
+        assert all(r.ok for r in results)
+        assert len({r.output for r in results}) == 1
+        assert results[0].fen == board
+
+    @pytest.mark.parametrize('workers', [0, 2])
+    def test_unknown_item_option(self, workers):
+        """Misspelled options and malformed items fail only their own item."""
+        items = [START_FEN, (START_FEN, None, {'sise': 100}), None, 42, ENDGAME_FEN]
+        results = generate_many(items, workers=workers, chunksize=2, size=80)
+
+        assert [r.index for r in results] == [0, 1, 2, 3, 4]
+        assert [r.ok for r in results] == [True, False, False, False, True]
+        assert isinstance(results[1].error, ValueError)
+        assert all(r.output is None for r in results[1:4])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact Board type.
+"""
+
+import pickle
+from collections import namedtuple
+
+import pytest
+from chessboard_image import (
+    Board,
+    InvalidFENError,
+    as_board,
+    generate_bytes,
+    generate_many,
+    generate_pil,
+    RenderedBoard,
+)
+from chessboard_image.generator import parse_fen
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+ITALIAN_FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+
+
+class FakePiece(namedtuple('FakePiece', ['letter'])):
+    def symbol(self):
+        return self.letter
+
+
+class FakeChessBoard:
+    """Minimal stand-in for ``chess.Board``: squares numbered from a1 = 0."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    def piece_map(self):
+        return {square: FakePiece(letter) for square, letter in self.pieces.items()}
+
+
+class TestBoard:
+    """Test cases for building and reading boards."""
+
+    def test_from_fen_matches_parse_fen(self):
+        """Boards hold the same squares parse_fen returns."""
+        board = Board.from_fen(ITALIAN_FEN)
+        assert board.rows() == parse_fen(ITALIAN_FEN)
+        assert list(board) == [piece for row in parse_fen(ITALIAN_FEN) for piece in row]
+        assert len(board.squares) == 64
+
+    def test_square_access(self):
+        """Squares are read by index or (row, col)."""
+        board = Board.from_fen(START_FEN)
+        assert board[0] == 'r'
+        assert board[63] == 'R'
+        assert board[7, 4] == 'K'
+        assert board[4, 4] == ''
+        with pytest.raises(IndexError):
+            board[8, 0]
+
+    def test_fen_round_trip(self):
+        """fen() gives back the board field."""
+        assert Board.from_fen(ITALIAN_FEN).fen() == ITALIAN_FEN.split()[0]
+        assert repr(Board.from_fen("8/8/8/8/8/8/8/K6k")) == "Board('8/8/8/8/8/8/8/K6k')"
+
+    def test_flipped(self):
+        """Flipping rotates the board by 180 degrees like the black POV."""
+        board = Board.from_fen(ITALIAN_FEN)
+        expected = [row[::-1] for row in parse_fen(ITALIAN_FEN)[::-1]]
+        assert board.flipped().rows() == expected
+        assert board.flipped().flipped() == board
+
+    def test_occupied(self):
+        """Only occupied squares are listed."""
+        board = Board.from_fen("8/8/8/8/8/8/8/K6k")
+        assert list(board.occupied()) == [(56, 'K'), (63, 'k')]
+
+    def test_from_sequence(self):
+        """Flat sequences, nested rows and byte strings build the same board."""
+        board = Board.from_fen(ITALIAN_FEN)
+        assert Board.from_sequence(list(board)) == board
+        assert Board.from_sequence(parse_fen(ITALIAN_FEN)) == board
+        assert Board.from_sequence(board.squares.replace(b'.', b' ')) == board
+        assert Board.from_sequence([None] * 63 + ['K']).fen() == "8/8/8/8/8/8/8/7K"
+
+    def test_from_chess(self):
+        """Duck-typed python-chess boards are read from their piece map."""
+        board = Board.from_chess(FakeChessBoard({4: 'K', 60: 'k', 12: 'P'}))
+        assert board.fen() == "4k3/8/8/8/8/8/4P3/4K3"
+
+    @pytest.mark.parametrize("position", [
+        "invalid",
+        "8/8/8/8/8/8/8/K6.",
+        ['K'] * 63,
+        ['X'] * 64,
+        b'x' * 64,
+        42,
+    ])
+    def test_invalid(self, position):
+        """Invalid input raises InvalidFENError."""
+        with pytest.raises(InvalidFENError):
+            as_board(position)
+
+    def test_immutable_hashable_picklable(self):
+        """Boards cannot be modified, hash by value and survive pickling."""
+        board = Board.from_fen(START_FEN)
+        with pytest.raises(AttributeError):
+            board.squares = b''
+        assert {board: 1}[Board.from_fen(START_FEN)] == 1
+        assert pickle.loads(pickle.dumps(board)) == board
+
+
+class TestBoardRendering:
+    """Test cases for rendering from Board and other non-FEN inputs."""
+
+    @pytest.mark.parametrize("pov", ["white", "black"])
+    def test_same_image_as_fen(self, pov):
+        """Every input form renders the same image as the FEN."""
+        expected = generate_bytes(ITALIAN_FEN, size=160, player_pov=pov)
+        board = Board.from_fen(ITALIAN_FEN)
+        for position in (board, board.rows(), list(board), board.squares):
+            assert generate_bytes(position, size=160, player_pov=pov) == expected
+
+    def test_chess_board_input(self):
+        """Duck-typed python-chess boards render without building a FEN."""
+        chess_board = FakeChessBoard({4: 'K', 60: 'k', 12: 'P'})
+        assert (generate_pil(chess_board, size=80).tobytes()
+                == generate_pil("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1", size=80).tobytes())
+
+    def test_result_cache_shared_with_fen(self):
+        """A board and its FEN share one result cache entry."""
+        from chessboard_image import ResultCache
+
+        cache = ResultCache()
+        generate_bytes(START_FEN, size=80, cache=cache)
+        generate_bytes(Board.from_fen(START_FEN), size=80, cache=cache)
+        assert cache.stats()['hits'] == 1
+
+    def test_batch_and_incremental(self):
+        """Batch rendering and incremental updates accept boards."""
+        board = Board.from_fen(START_FEN)
+        results = generate_many([board, ITALIAN_FEN], workers=0, size=80)
+        assert results[0].output == generate_bytes(START_FEN, size=80)
+
+        rendered = RenderedBoard(board, size=80)
+        assert rendered.fen == START_FEN.split()[0]
+        rects = rendered.update(Board.from_fen(ITALIAN_FEN))
+        assert rects
+        assert rendered.image.tobytes() == generate_pil(ITALIAN_FEN, size=80).tobytes()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Tests for the render caches in chessboard image generator.
+"""
+
+import os
+
+import pytest
+from chessboard_image import (
+    ChessImageGeneratorError,
+    DiskCache,
+    LRUCache,
+    ResultCache,
+    background_cache,
+    generate_bytes,
+    generate_image,
+    get_board_background,
+    get_piece_sprite,
+    get_tile_atlas,
+    generate_many,
+    label_cache,
+    load_theme,
+    release_memory,
+    result_cache,
+    sprite_cache,
+    tile_cache,
+)
+from chessboard_image import generator
+from chessboard_image.generator import _resolve_font
+
+
+class TestLRUCache:
+    """Test cases for the byte-bounded LRU cache."""
+
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses."""
+        cache = LRUCache(max_bytes=100)
+        assert cache.get('a') is None
+        cache.put('a', 'value', 10)
+        assert cache.get('a') == 'value'
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['bytes'] == 10
+
+    def test_evicts_least_recently_used(self):
+        """Entries are evicted in least recently used order when over budget."""
+        cache = LRUCache(max_bytes=30)
+        cache.put('a', 1, 10)
+        cache.put('b', 2, 10)
+        cache.put('c', 3, 10)
+        cache.get('a')
+        cache.put('d', 4, 10)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['bytes'] == 30
+
+    def test_entry_limit_and_resize(self):
+        """Entry limits and shrinking the budget both evict entries."""
+        cache = LRUCache(max_bytes=1000, max_entries=2)
+        for key in 'abc':
+            cache.put(key, key, 1)
+        assert len(cache) == 2
+
+        cache.resize(max_bytes=1)
+        assert len(cache) == 1
+        assert 'c' in cache
+
+    def test_oversized_value_not_stored(self):
+        """Values larger than the budget are never cached."""
+        cache = LRUCache(max_bytes=10)
+        value = cache.get_or_create('big', lambda: 'x' * 100, len)
+        assert value == 'x' * 100
+        assert len(cache) == 0
+
+
+class TestSpriteCache:
+    """Test cases for the decoded piece sprite cache."""
+
+    def setup_method(self):
+        sprite_cache.clear()
+
+    def test_sprite_is_cached_rgba(self):
+        """Sprites are resized RGBA images shared between lookups."""
+        theme = load_theme(theme_name="uscf")
+        sprite = get_piece_sprite(theme, 'bQ', 50)
+
+        assert sprite.mode == 'RGBA'
+        assert sprite.size == (50, 50)
+        assert get_piece_sprite(theme, 'bQ', 50) is sprite
+        assert get_piece_sprite(theme, 'bQ', 25) is not sprite
+
+    def test_steady_state_render_has_no_misses(self):
+        """Repeated renders are served entirely from the sprite cache."""
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        generate_bytes(fen, size=200)
+        misses = sprite_cache.stats()['misses']
+        assert misses == 12
+
+        generate_bytes(fen, size=200)
+        assert sprite_cache.stats()['misses'] == misses
+
+
+class TestBackgroundCache:
+    """Test cases for the cached empty board backgrounds."""
+
+    def setup_method(self):
+        background_cache.clear()
+
+    def test_background_cached_per_parameters(self):
+        """Each parameter combination is drawn once and then reused."""
+        theme = load_theme(theme_name="wikipedia")
+        white = get_board_background(theme, 200, True, "white")
+
+        assert white.size == (240, 240)
+        assert get_board_background(theme, 200, True, "white") is white
+        assert get_board_background(theme, 200, True, "black") is not white
+        assert get_board_background(theme, 200, False, "white").size == (200, 200)
+        assert len(background_cache) == 3
+
+    def test_render_does_not_modify_background(self):
+        """Pieces are drawn on a copy of the cached background."""
+        theme = load_theme(theme_name="wikipedia")
+        background = get_board_background(theme, 200)
+        before = background.tobytes()
+
+        generate_bytes("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", size=200)
+        assert background.tobytes() == before
+
+    def test_entry_limit_bounds_odd_sizes(self):
+        """Many distinct sizes cannot grow the cache past its entry limit."""
+        theme = load_theme(theme_name="wikipedia")
+        limit = background_cache.max_entries
+        for size in range(64, 64 + 8 * (limit + 5), 8):
+            get_board_background(theme, size)
+        assert len(background_cache) == limit
+
+
+class TestCoordinateLabels:
+    """Test cases for cached coordinate fonts and label strips."""
+
+    def setup_method(self):
+        background_cache.clear()
+        label_cache.clear()
+
+    def test_font_resolved_once(self):
+        """The default font is looked up once per process."""
+        assert _resolve_font() is _resolve_font()
+
+    def test_label_strips_shared_between_themes(self):
+        """Label strips depend on size and perspective, not on the theme."""
+        for theme_name in ("wikipedia", "alpha"):
+            get_board_background(load_theme(theme_name=theme_name), 200, True, "white")
+        assert len(label_cache) == 1
+        get_board_background(load_theme(theme_name="alpha"), 200, True, "black")
+        assert len(label_cache) == 2
+
+    def test_custom_font_path(self):
+        """A configured font gets its own labels and backgrounds."""
+        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+        if not os.path.exists(font_path):
+            pytest.skip("DejaVu fonts not installed")
+        theme = load_theme(theme_name="wikipedia")
+        default = get_board_background(theme, 200, True, "white")
+        bold = get_board_background(theme, 200, True, "white", font_path=font_path)
+        assert bold is not default
+        assert bold.tobytes() != default.tobytes()
+        assert len(label_cache) == 2
+
+    def test_invalid_font_path(self):
+        """A font path that cannot be loaded is reported instead of ignored."""
+        with pytest.raises(ChessImageGeneratorError):
+            generate_bytes("8/8/8/8/8/8/8/K6k w - - 0 1", size=80, show_coordinates=True,
+                           font_path="/nonexistent/font.ttf")
+
+
+class TestTileAtlas:
+    """Test cases for the pre-composited square tile atlas."""
+
+    def setup_method(self):
+        tile_cache.clear()
+
+    def test_atlas_has_26_opaque_tiles(self):
+        """Each of the 13 square contents exists on both square colors."""
+        theme = load_theme(theme_name="maestro")
+        atlas = get_tile_atlas(theme, 40)
+
+        assert len(atlas) == 26
+        assert all(tile.mode == 'RGB' and tile.size == (40, 40) for tile in atlas.values())
+        assert atlas[(0, '')].getpixel((0, 0)) != atlas[(1, '')].getpixel((0, 0))
+        assert get_tile_atlas(theme, 40) is atlas
+
+    def test_tile_matches_sprite_composite(self):
+        """Tiles equal a sprite alpha-composited over the square color."""
+        theme = load_theme(theme_name="wikipedia")
+        sprite = get_piece_sprite(theme, 'bN', 50)
+        expected = get_tile_atlas(theme, 50)[(1, '')].copy()
+        expected.paste(sprite, (0, 0), sprite)
+
+        assert get_tile_atlas(theme, 50)[(1, 'n')].tobytes() == expected.tobytes()
+
+
+
+class TestResultCache:
+    """Test cases for the two-tier cache of encoded boards."""
+
+    FEN = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+    def setup_method(self):
+        result_cache.clear()
+
+    def test_cached_bytes_match_render(self):
+        """Cached results are identical to uncached renders and hit on repeat."""
+        first = generate_bytes(self.FEN, size=200, cache=True)
+        assert first == generate_bytes(self.FEN, size=200)
+        assert generate_bytes(self.FEN, size=200, cache=True) is first
+
+        stats = result_cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['disk'] is None
+
+    def test_key_uses_board_placement_only(self):
+        """FENs differing only after the placement field share one entry."""
+        cache = ResultCache()
+        generate_bytes(self.FEN, size=200, cache=cache)
+        generate_bytes("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR w - - 5 9", size=200, cache=cache)
+        assert cache.stats()['hits'] == 1
+
+        generate_bytes(self.FEN, size=200, player_pov="black", cache=cache)
+        generate_bytes(self.FEN, size=200, format="jpg", cache=cache)
+        generate_bytes(self.FEN, size=200, format="jpeg", cache=cache)
+        assert cache.stats()['misses'] == 3
+
+    def test_invalid_fen_not_cached(self):
+        """Invalid FENs raise instead of producing a cache entry."""
+        cache = ResultCache()
+        with pytest.raises(ChessImageGeneratorError):
+            generate_bytes("invalid", cache=cache)
+        assert len(cache.memory) == 0
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Entries written by one cache are read back from disk by another."""
+        data = generate_bytes(self.FEN, size=200, cache=ResultCache(directory=tmp_path))
+
+        cache = ResultCache(directory=tmp_path)
+        assert generate_bytes(self.FEN, size=200, cache=cache) == data
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['memory']['misses'] == 1
+        assert stats['disk']['hits'] == 1
+        assert stats['disk']['entries'] == 1
+
+    def test_key_includes_package_version(self, tmp_path, monkeypatch):
+        """Boards cached on disk by another release are rendered again."""
+        generate_bytes(self.FEN, size=200, cache=ResultCache(directory=tmp_path))
+        monkeypatch.setattr(generator, '__version__', generator.__version__ + '.post1')
+        cache = ResultCache(directory=tmp_path)
+        generate_bytes(self.FEN, size=200, cache=cache)
+        assert cache.stats()['misses'] == 1
+
+    def test_memory_tier_bounded_by_bytes(self):
+        """The memory tier evicts encoded boards beyond its byte budget."""
+        cache = ResultCache(max_bytes=100)
+        cache.put('a', b'x' * 60)
+        cache.put('b', b'y' * 60)
+        assert cache.get('a') is None
+        assert cache.stats()['memory']['evictions'] == 1
+
+    def test_shared_by_batch_workers(self, tmp_path):
+        """Worker processes share the disk tier through a cache directory."""
+        fens = [self.FEN, "8/8/8/8/8/8/8/K6k w - - 0 1"] * 2
+        first = generate_many(fens, workers=2, chunksize=1, size=100, cache_dir=str(tmp_path))
+        second = generate_many(fens, workers=2, chunksize=1, size=100, cache_dir=str(tmp_path))
+
+        assert [r.output for r in first] == [r.output for r in second]
+        assert first[0].output == generate_bytes(self.FEN, size=100)
+        assert DiskCache(tmp_path, 10 ** 9).stats()['entries'] == 2
+
+
+class TestDiskCache:
+    """Test cases for the on-disk result store."""
+
+    def test_round_trip_and_atomic_files(self, tmp_path):
+        """Values are stored under their key digest without leftover temp files."""
+        cache = DiskCache(tmp_path, max_bytes=1000)
+        cache.put(('key', 1), b'data')
+        assert cache.get(('key', 1)) == b'data'
+        assert cache.get(('key', 2)) is None
+
+        digest = DiskCache.digest(('key', 1))
+        assert os.listdir(tmp_path) == [digest[:2]]
+        assert os.listdir(tmp_path / digest[:2]) == [digest]
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Files not read recently are deleted once the size cap is exceeded."""
+        cache = DiskCache(tmp_path, max_bytes=100)
+        for age, key in enumerate(['a', 'b']):
+            cache.put(key, b'x' * 40)
+            path = tmp_path / DiskCache.digest(key)[:2] / DiskCache.digest(key)
+            os.utime(path, (1000 + age, 1000 + age))
+        # Reading 'a' makes 'b' the least recently used file
+        assert cache.get('a') == b'x' * 40
+        cache.put('c', b'x' * 40)
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        stats = cache.stats()
+        assert stats['evictions'] == 1
+        assert stats['bytes'] == 80
+
+    def test_overwrite_keeps_byte_count(self, tmp_path):
+        """Rewriting a key replaces its size instead of adding to it."""
+        cache = DiskCache(tmp_path, max_bytes=100)
+        cache.put('a', b'x' * 10)
+        for _ in range(5):
+            cache.put('a', b'x' * 40)
+        assert cache._bytes == 40
+        assert cache.get('a') == b'x' * 40
+        assert cache.stats()['evictions'] == 0
+
+    def test_cap_shared_between_writers(self, tmp_path):
+        """Writers re-read the store size, so other processes' files count towards the cap."""
+        first = DiskCache(tmp_path, max_bytes=100)
+        second = DiskCache(tmp_path, max_bytes=100)
+        first.put('a', b'x' * 40)
+        second.put('b', b'x' * 40)
+        first.RESCAN_INTERVAL = 0
+        first.put('c', b'x' * 40)
+
+        assert first.evictions == 1
+        assert first.stats()['bytes'] <= 100
+
+    def test_file_removed_by_other_process_is_miss(self, tmp_path):
+        """A value deleted behind the cache's back is reported as a miss."""
+        cache = DiskCache(tmp_path, max_bytes=1000)
+        cache.put('a', b'data')
+        DiskCache(tmp_path, max_bytes=1000).clear()
+        assert cache.get('a') is None
+        assert cache.stats()['misses'] == 1
+
+
+class TestReleaseMemory:
+    """Test cases for returning render memory."""
+
+    def test_clear_caches(self):
+        """release_memory(clear_caches=True) empties the render caches."""
+        generate_bytes("8/8/8/8/8/8/8/K6k w - - 0 1", size=80, show_coordinates=True)
+        assert isinstance(release_memory(), bool)
+        assert len(tile_cache) > 0
+        release_memory(clear_caches=True)
+        for cache in (sprite_cache, background_cache, label_cache, tile_cache):
+            assert cache.stats()['bytes'] == 0
+
+    def test_no_malloc_trim(self, monkeypatch):
+        """Platforms without a usable C library are detected once, not retried."""
+        import ctypes
+        calls = []
+
+        def broken_cdll(name, *args, **kwargs):
+            calls.append(name)
+            raise TypeError("argument of type 'NoneType' is not iterable")
+
+        monkeypatch.setattr(ctypes, 'CDLL', broken_cdll)
+        monkeypatch.setattr(generator, '_malloc_trim', None)
+        monkeypatch.setattr(generator.sys, 'platform', 'linux')
+        assert release_memory() is False
+        assert release_memory() is False
+        assert len(calls) == 1
+        assert generator._malloc_trim is False
+
+        monkeypatch.setattr(generator, '_malloc_trim', None)
+        monkeypatch.setattr(generator.sys, 'platform', 'win32')
+        assert release_memory() is False
+        assert len(calls) == 1
+
+    @pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason="needs /proc")
+    def test_no_leaked_files(self, tmp_path):
+        """Rendering to files and bytes leaves no file handles open."""
+        output = str(tmp_path / "board.png")
+        generate_bytes("8/8/8/8/8/8/8/K6k w - - 0 1", size=80)
+        before = len(os.listdir('/proc/self/fd'))
+        for size in range(80, 240, 8):
+            generate_image("8/8/8/8/8/8/8/K6k w - - 0 1", output, size=size, format='jpeg', palette=True)
+            generate_bytes("8/8/8/8/8/8/8/K6k w - - 0 1", size=size)
+        assert len(os.listdir('/proc/self/fd')) == before
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
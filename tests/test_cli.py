@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the command line interface.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import pytest
+from PIL import Image
+from chessboard_image import generate_bytes
+from chessboard_image.cli import main
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+ENDGAME_FEN = "8/8/8/8/8/8/8/4K2k w - - 0 1"
+
+
+def run_cli(monkeypatch, *argv, stdin=None):
+    monkeypatch.setattr(sys, 'argv', ['chessboard-image'] + list(argv))
+    if stdin is not None:
+        monkeypatch.setattr(sys, 'stdin', io.StringIO(stdin))
+    return main()
+
+
+class TestBatchCommand:
+    """Test cases for the batch subcommand."""
+
+    def test_batch_from_stdin(self, monkeypatch, capsys):
+        """FENs read from stdin are written using names and per-line options."""
+        lines = f"{START_FEN}\tstart\tsize=120 pov=black\n# comment\n\n{ENDGAME_FEN}\n"
+        with tempfile.TemporaryDirectory() as output_dir:
+            code = run_cli(monkeypatch, 'batch', '-o', output_dir, '-j', '2', '-s', '80', stdin=lines)
+
+            assert code == 0
+            assert sorted(os.listdir(output_dir)) == ['board_000001.png', 'start.png']
+            with open(os.path.join(output_dir, 'start.png'), 'rb') as f:
+                assert f.read() == generate_bytes(START_FEN, size=120, player_pov='black')
+        assert "Rendered 2 boards" in capsys.readouterr().out
+
+    def test_batch_reports_failures(self, monkeypatch, capsys):
+        """Bad lines are summarized and make the command fail."""
+        lines = f"{ENDGAME_FEN}\nnot/a/fen\n{ENDGAME_FEN}\tname\tcolour=red\n"
+        with tempfile.TemporaryDirectory() as output_dir:
+            code = run_cli(monkeypatch, 'batch', '-o', output_dir, '-j', '1', '-q', stdin=lines)
+
+            assert code == 1
+            assert os.listdir(output_dir) == ['board_000000.png']
+        err = capsys.readouterr().err
+        assert "2 failed" in err
+        assert "line 2:" in err
+        assert "line 3: unknown option 'colour'" in err
+
+    def test_batch_keeps_first_failures_only(self, monkeypatch, capsys):
+        """Only the first failures by line number are kept and listed."""
+        from chessboard_image.cli import FailureLog
+
+        log = FailureLog(limit=3)
+        for line_number in (9, 2, 7, 5, 1, 8):
+            log.append((line_number, 'fen', 'error'))
+        assert len(log) == 6
+        assert [failure[0] for failure in log.first()] == [1, 2, 5]
+
+        lines = "bad\n" * 30 + f"{ENDGAME_FEN}\n"
+        with tempfile.TemporaryDirectory() as output_dir:
+            code = run_cli(monkeypatch, 'batch', '-o', output_dir, '-j', '2', '--chunksize', '4', '-q',
+                           stdin=lines)
+        assert code == 1
+        err = capsys.readouterr().err
+        assert "30 failed" in err
+        assert "line 20:" in err and "line 21:" not in err
+        assert "... and 10 more" in err
+
+    def test_batch_output_format(self, monkeypatch):
+        """The output format sets the encoder and the default file extension."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            code = run_cli(monkeypatch, 'batch', '-o', output_dir, '-j', '0', '-q', '-s', '80',
+                           '-f', 'jpeg', '--quality', '50', stdin=f"{START_FEN}\tstart\n")
+
+            assert code == 0
+            assert os.listdir(output_dir) == ['start.jpeg']
+            assert Image.open(os.path.join(output_dir, 'start.jpeg')).format == 'JPEG'
+
+
+class TestGenerateCommand:
+    """Test cases for the generate subcommand."""
+
+    def test_format_from_extension(self, monkeypatch, tmp_path):
+        """The output format is inferred from the file extension."""
+        output_path = tmp_path / "board.webp"
+        code = run_cli(monkeypatch, 'generate', START_FEN, '-o', str(output_path), '-s', '80', '--lossless')
+
+        assert code == 0
+        assert Image.open(output_path).format == 'WEBP'
+
+    def test_timings(self, monkeypatch, tmp_path, capsys):
+        """--timings prints the time spent in each render stage."""
+        code = run_cli(monkeypatch, 'generate', START_FEN, '-o', str(tmp_path / "board.png"), '-s', '80',
+                       '--timings')
+        assert code == 0
+        out = capsys.readouterr().out
+        assert "Render time:" in out
+        assert "encode" in out and "compose" in out
+
+    def test_option_for_wrong_format(self, monkeypatch, tmp_path, capsys):
+        """Encoder options that do not apply to the format are reported."""
+        code = run_cli(monkeypatch, 'generate', START_FEN, '-o', str(tmp_path / "board.png"), '--lossless')
+
+        assert code == 1
+        assert "lossless" in capsys.readouterr().err
+
+
+class TestAnimateCommand:
+    """Test cases for the animate subcommand."""
+
+    def test_animate_from_file(self, monkeypatch, tmp_path):
+        """FENs from a file are written as an animation."""
+        input_path = tmp_path / "game.txt"
+        input_path.write_text(f"{START_FEN}\n{ENDGAME_FEN}\n")
+        output_path = tmp_path / "game.gif"
+
+        code = run_cli(monkeypatch, 'animate', str(input_path), '-o', str(output_path), '-s', '80')
+
+        assert code == 0
+        assert Image.open(output_path).n_frames == 2
+
+
+class TestSheetCommand:
+    """Test cases for the sheet subcommand."""
+
+    def test_sheet_from_stdin(self, monkeypatch, tmp_path, capsys):
+        """FENs with captions and per-line options are laid out in a grid."""
+        output_path = tmp_path / "sheet.png"
+        stdin = f"# puzzles\n{START_FEN}\tStart\n{ENDGAME_FEN}\tMate in 2\tpov=black\n"
+        code = run_cli(monkeypatch, 'sheet', '-o', str(output_path), '--cols', '2', '-s', '80',
+                       '--spacing', '0', stdin=stdin)
+        assert code == 0
+        assert "Boards: 2" in capsys.readouterr().out
+        assert Image.open(output_path).size == (160, 80 + 24)
+
+    def test_sheet_bad_lines(self, monkeypatch, tmp_path, capsys):
+        """Unknown per-line options and grids too small fail without writing."""
+        output_path = tmp_path / "sheet.png"
+        code = run_cli(monkeypatch, 'sheet', '-o', str(output_path), stdin=f"{START_FEN}\tx\tsize=80\n")
+        assert code == 1
+        assert "line 1" in capsys.readouterr().err
+        code = run_cli(monkeypatch, 'sheet', '-o', str(output_path), '--cols', '1', '--rows', '1',
+                       stdin=f"{START_FEN}\n{START_FEN}\n")
+        assert code == 1
+        assert not output_path.exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -4,8 +4,10 @@ Basic tests for chessboard image generator.
 """
 
 import pytest
+import io
 import tempfile
 import os
+from PIL import Image
 from chessboard_image import (
     generate_image,
     generate_bytes,
@@ -54,6 +56,27 @@ class TestChessboardImage:
         assert pil_image.mode in ['RGB', 'RGBA']
         assert pil_image.size == (100, 100)
     
+    def test_generate_image_file_object(self):
+        """Test writing the image to a file-like object."""
+        fen = "8/8/8/8/8/8/8/4K2k w - - 0 1"
+        buffer = io.BytesIO()
+        
+        result = generate_image(fen, buffer, size=100)
+        
+        assert result is buffer
+        assert buffer.getvalue() == generate_bytes(fen, size=100)
+    
+    def test_in_memory_outputs_skip_temp_files(self, monkeypatch):
+        """Test that bytes and PIL outputs never touch the filesystem."""
+        def fail(*args, **kwargs):
+            raise AssertionError("temporary file created")
+        
+        monkeypatch.setattr(tempfile, 'mktemp', fail)
+        fen = "8/8/8/8/8/8/8/4K2k w - - 0 1"
+        
+        assert generate_bytes(fen, size=100).startswith(b'\x89PNG')
+        assert generate_pil(fen, size=100).size == (100, 100)
+    
     def test_different_sizes(self):
         """Test different board sizes."""
         fen = "8/8/8/8/8/8/8/4K2k w - - 0 1"
@@ -187,5 +210,51 @@ class TestChessboardImage:
         assert len(image_bytes) > 0
 
 
+class TestOutputFormats:
+    """Test cases for output formats and encoder options."""
+
+    FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+
+    @pytest.mark.parametrize("fmt,pil_format", [("png", "PNG"), ("webp", "WEBP"), ("jpeg", "JPEG"), ("JPG", "JPEG")])
+    def test_formats(self, fmt, pil_format):
+        """Each output format produces a decodable image of that format."""
+        image = Image.open(io.BytesIO(generate_bytes(self.FEN, size=160, format=fmt)))
+        assert image.format == pil_format
+        assert image.size == (160, 160)
+
+    def test_png_compression_level(self):
+        """Lower PNG compression levels trade size for speed without changing pixels."""
+        fast = generate_bytes(self.FEN, size=200, encoder_options={'compress_level': 1})
+        small = generate_bytes(self.FEN, size=200, encoder_options={'compress_level': 9})
+        assert len(fast) > len(small)
+        assert Image.open(io.BytesIO(fast)).tobytes() == Image.open(io.BytesIO(small)).tobytes()
+
+    def test_lossless_webp(self):
+        """Lossless WebP keeps the exact pixels."""
+        data = generate_bytes(self.FEN, size=160, format="webp", encoder_options={'lossless': True})
+        assert Image.open(io.BytesIO(data)).convert('RGB').tobytes() == generate_pil(self.FEN, size=160).tobytes()
+
+    def test_jpeg_quality(self):
+        """JPEG quality controls the output size."""
+        low = generate_bytes(self.FEN, size=200, format="jpeg", encoder_options={'quality': 30})
+        high = generate_bytes(self.FEN, size=200, format="jpeg", encoder_options={'quality': 95})
+        assert len(low) < len(high)
+
+    def test_temp_file_extension(self):
+        """Temporary output files get the extension of the format."""
+        output_path = generate_image(self.FEN, size=80, format="webp")
+        try:
+            assert output_path.endswith('.webp')
+        finally:
+            os.unlink(output_path)
+
+    def test_invalid_format_and_options(self):
+        """Unknown formats and options for the chosen format are rejected."""
+        with pytest.raises(ChessImageGeneratorError):
+            generate_bytes(self.FEN, size=80, format="bmp")
+        with pytest.raises(ChessImageGeneratorError):
+            generate_bytes(self.FEN, size=80, encoder_options={'quality': 80})
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the import cost of the package.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Keep in sync with IMPORT_BUDGET_MS in benchmarks/bench_import.py
+IMPORT_BUDGET_MS = 100
+
+# Modules that must not be imported until they are actually needed
+DEFERRED_MODULES = ('PIL', 'pkg_resources', 'asyncio', 'concurrent', 'tempfile')
+
+
+def importtime(*args):
+    """Run the interpreter with ``-X importtime`` and return the imported modules' cumulative times."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + list(args),
+                            env=env, capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and 'self [us]' not in line:
+            _, cumulative_us, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = int(cumulative_us)
+    return modules
+
+
+def deferred(modules):
+    return sorted(name for name in modules if name.split('.')[0] in DEFERRED_MODULES)
+
+
+class TestImportTime:
+    """Test cases for fast package import."""
+
+    def test_import_defers_heavy_modules(self):
+        """Importing the package does not import Pillow, asyncio or process pools."""
+        modules = importtime('-c', 'import chessboard_image')
+        assert 'chessboard_image' in modules
+        assert deferred(modules) == []
+
+    def test_import_within_budget(self):
+        """Importing the package stays within the import time budget."""
+        fastest = min(importtime('-c', 'import chessboard_image')['chessboard_image'] for _ in range(3))
+        assert fastest / 1000 < IMPORT_BUDGET_MS
+
+    @pytest.mark.parametrize("argv", [['--version'], ['themes']])
+    def test_cli_without_pillow(self, argv):
+        """Quick CLI commands never import Pillow."""
+        modules = importtime('-m', 'chessboard_image.cli', *argv)
+        assert 'chessboard_image.generator' in modules
+        assert [name for name in modules if name.split('.')[0] == 'PIL'] == []
+
+    def test_lazy_attributes(self):
+        """Lazily imported names resolve on first access."""
+        import chessboard_image
+
+        for name in chessboard_image.__all__:
+            assert getattr(chessboard_image, name) is not None
+        assert 'generate_animation' in dir(chessboard_image)
+        with pytest.raises(AttributeError):
+            chessboard_image.does_not_exist
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental re-rendering.
+"""
+
+import pytest
+from chessboard_image import (
+    Board,
+    RenderedBoard,
+    diff_boards,
+    generate_pil,
+    render_update,
+    ChessImageGeneratorError,
+    InvalidFENError,
+)
+from chessboard_image.generator import parse_fen
+
+GAME = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2",
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2",
+    "rnbqk2r/pppp1ppp/5n2/2b1p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 4 4",
+    "rnbqk2r/pppp1ppp/5n2/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 5 5",
+]
+
+
+class TestIncremental:
+    """Test cases for RenderedBoard and dirty rectangles."""
+
+    def test_diff_boards(self):
+        """Only squares with different contents are reported."""
+        changed = diff_boards(parse_fen(GAME[0]), parse_fen(GAME[1]))
+        assert sorted(changed) == [(4, 4), (6, 4)]
+
+    def test_diff_board_objects(self):
+        """Boards are compared on their squares; the rendered board keeps a Board."""
+        old, new = Board.from_fen(GAME[4]), Board.from_fen(GAME[5])
+        assert diff_boards(old, new) == [(4, 2), (7, 4), (7, 5), (7, 6), (7, 7)]
+        assert diff_boards(old, old) == []
+
+        board = RenderedBoard(GAME[4], size=80)
+        board.update(new)
+        assert board.board == new
+
+    @pytest.mark.parametrize("player_pov", ["white", "black"])
+    @pytest.mark.parametrize("show_coordinates", [False, True])
+    def test_updates_match_full_render(self, player_pov, show_coordinates):
+        """Incremental updates are pixel-identical to full renders."""
+        options = dict(size=203, player_pov=player_pov, show_coordinates=show_coordinates)
+        board = RenderedBoard(GAME[0], **options)
+
+        for fen in GAME[1:]:
+            board.update(fen)
+            assert board.image.tobytes() == generate_pil(fen, **options).tobytes()
+
+    def test_dirty_rects_patch_canvas(self):
+        """Applying the returned patches to the old image yields the new one."""
+        previous = RenderedBoard(GAME[4], size=160, player_pov="black")
+        canvas = previous.image.copy()
+
+        board, rects = render_update(previous, GAME[5])
+
+        assert len(rects) == 5  # e1, f1, g1, h1 and c4
+        assert all(rect.width == rect.height == 20 for rect in rects)
+        for rect in rects:
+            canvas.paste(rect.patch, rect.box[:2])
+        assert canvas.tobytes() == board.image.tobytes()
+        assert previous.fen == GAME[4]
+
+    def test_failed_repaint_keeps_state(self, monkeypatch):
+        """A repaint error leaves position and image at the previous position."""
+        from chessboard_image import incremental
+
+        board = RenderedBoard(GAME[4], size=80)
+        before = board.image.tobytes()
+        get_tile_atlas = incremental.get_tile_atlas
+        calls = []
+
+        def failing_atlas(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise OSError("sprite missing")
+            return get_tile_atlas(*args)
+
+        monkeypatch.setattr(incremental, 'get_tile_atlas', failing_atlas)
+        with pytest.raises(ChessImageGeneratorError):
+            board.update(GAME[5])
+        assert board.fen == GAME[4]
+        assert board.board == Board.from_fen(GAME[4])
+        assert board.image.tobytes() == before
+
+        monkeypatch.setattr(incremental, 'get_tile_atlas', get_tile_atlas)
+        board.update(GAME[5])
+        assert board.image.tobytes() == generate_pil(GAME[5], size=80).tobytes()
+
+    def test_invalid_fen_keeps_state(self):
+        """A bad FEN leaves the rendered board unchanged."""
+        board = RenderedBoard(GAME[0], size=80)
+        before = board.image.tobytes()
+
+        with pytest.raises(InvalidFENError):
+            board.update("invalid")
+        assert board.fen == GAME[0]
+        assert board.image.tobytes() == before
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
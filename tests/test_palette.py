@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for indexed-color (palette) rendering.
+"""
+
+import io
+
+import pytest
+from PIL import Image, ImageChops, ImageStat
+
+from chessboard_image import (
+    generate_bytes,
+    generate_pil,
+    get_board_background,
+    get_theme_palette,
+    get_tile_atlas,
+    list_themes,
+    load_theme,
+)
+
+FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+EMPTY_FEN = "8/8/8/8/8/8/8/8 w - - 0 1"
+
+
+class TestPaletteMode:
+    """Test cases for palette mode."""
+
+    def test_palette_image_mode(self):
+        """Palette renders are "P" mode images and 8-bit PNGs."""
+        img = generate_pil(FEN, size=200, palette=True)
+        assert img.mode == 'P'
+        assert img.size == (200, 200)
+        assert Image.open(io.BytesIO(generate_bytes(FEN, size=200, palette=True))).mode == 'P'
+
+    @pytest.mark.parametrize("theme_name", list_themes())
+    def test_fidelity_against_rgb(self, theme_name):
+        """Palette output stays close to the RGB output for every bundled theme."""
+        rgb = generate_pil(FEN, size=400, theme_name=theme_name, show_coordinates=True)
+        indexed = generate_pil(FEN, size=400, theme_name=theme_name, show_coordinates=True, palette=True)
+        difference = ImageChops.difference(rgb, indexed.convert('RGB'))
+
+        assert max(ImageStat.Stat(difference).mean) < 1.0
+        assert max(high for _, high in difference.getextrema()) <= 48
+
+    def test_board_colors_exact(self):
+        """Squares and margins keep their exact colors."""
+        rgb = generate_pil(EMPTY_FEN, size=160, show_coordinates=True)
+        indexed = generate_pil(EMPTY_FEN, size=160, show_coordinates=True, palette=True).convert('RGB')
+        for point in ((2, 2), (30, 30), (50, 30), (170, 170), (190, 190)):
+            assert indexed.getpixel(point) == rgb.getpixel(point)
+
+    def test_smaller_png(self):
+        """Palette PNGs are much smaller than truecolor PNGs."""
+        assert len(generate_bytes(FEN, palette=True)) * 2 < len(generate_bytes(FEN))
+
+    def test_palette_built_once_per_theme(self):
+        """Palettes, tiles and backgrounds are cached and share one palette."""
+        theme = load_theme(theme_name="alpha")
+        palette = get_theme_palette(theme)
+        assert get_theme_palette(theme) is palette
+        atlas = get_tile_atlas(theme, 40, palette=True)
+        assert get_tile_atlas(theme, 40, palette=True) is atlas
+        assert atlas[(0, 'K')].mode == 'P'
+        assert atlas[(0, 'K')].getpalette() == palette.getpalette()
+        background = get_board_background(theme, 320, palette=True)
+        assert background.mode == 'P'
+        assert get_board_background(theme, 320, palette=True) is background
+
+    def test_jpeg_output(self):
+        """Palette renders are converted to RGB for JPEG output."""
+        data = generate_bytes(FEN, size=160, palette=True, format="jpeg")
+        assert Image.open(io.BytesIO(data)).mode == 'RGB'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
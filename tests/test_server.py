@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP rendering server.
+"""
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent import futures
+from urllib.parse import quote
+
+import pytest
+from chessboard_image import ResultCache, generate_bytes
+from chessboard_image.server import BadRequest, BoardServer
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+@pytest.fixture
+def server():
+    server = BoardServer(('127.0.0.1', 0), workers=0, cache=ResultCache(), max_size=800, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(server, path, method='GET', headers=None, data=None):
+    """Request a path, returning (status, headers, body) for errors too."""
+    request = urllib.request.Request(server.url + path, method=method, headers=headers or {}, data=data)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def board_path(fen=START_FEN, **params):
+    query = '&'.join(f'{name}={value}' for name, value in params.items())
+    return f'/board.png?fen={quote(fen)}' + ('&' + query if query else '')
+
+
+class TestBoardEndpoint:
+    """Test cases for board rendering requests."""
+
+    def test_renders_same_bytes_as_api(self, server):
+        """The response body is the board generate_bytes renders."""
+        status, headers, body = fetch(server, board_path(size=200, pov='black', coords='1'))
+        assert status == 200
+        assert headers['Content-Type'] == 'image/png'
+        assert headers['Cache-Control'] == 'public, max-age=86400'
+        assert body == generate_bytes(START_FEN, size=200, player_pov='black', show_coordinates=True)
+
+    def test_format_from_path(self, server):
+        """The path extension selects the output format."""
+        status, headers, body = fetch(server, board_path().replace('board.png', 'board.webp'))
+        assert status == 200
+        assert headers['Content-Type'] == 'image/webp'
+        assert body[8:12] == b'WEBP'
+
+    def test_etag_and_not_modified(self, server):
+        """Conditional requests with a matching ETag get 304 without rendering."""
+        _, headers, _ = fetch(server, board_path(size=100))
+        etag = headers['ETag']
+        assert etag.startswith('"') and not etag.startswith('W/')
+
+        status, headers, body = fetch(server, board_path(size=100), headers={'If-None-Match': etag})
+        assert status == 304
+        assert headers['ETag'] == etag
+        assert body == b''
+        assert server.metrics.renders == 1
+
+        # Weak tags, as produced by compressing proxies, match as well
+        weak = f'"other", W/{etag}'
+        assert fetch(server, board_path(size=100), headers={'If-None-Match': weak})[0] == 304
+
+        # Same placement with other move counters is the same resource
+        _, other, _ = fetch(server, board_path(START_FEN.replace('0 1', '3 7'), size=100))
+        assert other['ETag'] == etag
+        _, other, _ = fetch(server, board_path(size=120))
+        assert other['ETag'] != etag
+
+    def test_repeated_request_served_from_cache(self, server):
+        """A second request for a board is not rendered again."""
+        fetch(server, board_path(size=100))
+        fetch(server, board_path(size=100))
+        assert server.metrics.renders == 1
+        assert server.cache.stats()['hits'] == 1
+
+    def test_concurrent_misses_render_once(self, server):
+        """Simultaneous requests for one uncached board share a single render."""
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(fetch(server, board_path(size=300))))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [status for status, _, _ in results] == [200] * 8
+        assert len({body for _, _, body in results}) == 1
+        assert server.metrics.renders == 1
+
+    def test_head_request(self, server):
+        """HEAD returns the headers of the board without a body."""
+        status, headers, body = fetch(server, board_path(size=100), method='HEAD')
+        assert status == 200
+        assert int(headers['Content-Length']) > 0
+        assert body == b''
+
+    @pytest.mark.parametrize('path, status', [
+        ('/board.png', 400),
+        (board_path('invalid'), 400),
+        (board_path(size='abc'), 400),
+        (board_path(size=4000), 400),
+        (board_path(pov='left'), 400),
+        (board_path(coords='maybe'), 400),
+        (board_path(theme='nonexistent'), 404),
+        ('/board.gif?fen=8', 404),
+        ('/unknown', 404),
+        ('/board.png?fen=' + 'p' * 3000, 414),
+    ])
+    def test_client_errors(self, server, path, status):
+        """Invalid requests get a client error instead of a render."""
+        assert fetch(server, path)[0] == status
+        assert server.metrics.renders == 0
+
+    def test_request_body_rejected(self, server):
+        """Requests with a body are refused."""
+        assert fetch(server, board_path(), method='GET', data=b'x' * 10)[0] == 413
+
+    def test_chunked_body_rejected(self, server):
+        """Chunked bodies are refused and the connection is closed, not parsed as a request."""
+        import http.client
+
+        host, port = server.server_address[:2]
+        connection = http.client.HTTPConnection(host, port)
+        try:
+            connection.putrequest('GET', board_path(size=100))
+            connection.putheader('Transfer-Encoding', 'chunked')
+            connection.endheaders()
+            connection.send(b'1c\r\nGET /healthz HTTP/1.1\r\n\r\n\r\n0\r\n\r\n')
+            response = connection.getresponse()
+            assert response.status == 413
+            assert response.getheader('Connection') == 'close'
+            response.read()
+        finally:
+            connection.close()
+
+    def test_too_many_pending_renders(self, server):
+        """Cache misses beyond max_pending get 503 with Retry-After."""
+        server.max_pending = 0
+        status, headers, _ = fetch(server, board_path(size=100))
+        assert status == 503
+        assert headers['Retry-After'] == '1'
+
+
+class TestMetricsEndpoint:
+    """Test cases for the metrics and health endpoints."""
+
+    def test_metrics(self, server):
+        """Metrics count requests by route and status, renders and cache hits."""
+        fetch(server, board_path(size=100))
+        fetch(server, board_path(size=100))
+        fetch(server, '/unknown')
+        # Requests are counted after their response is sent, so give the
+        # handler threads a moment to finish
+        for _ in range(100):
+            status, headers, body = fetch(server, '/metrics')
+            text = body.decode('utf-8')
+            if 'status="200"} 2' in text and 'status="404"} 1' in text:
+                break
+            time.sleep(0.01)
+
+        assert status == 200
+        assert headers['Content-Type'].startswith('text/plain')
+        assert 'chessboard_requests_total{route="board",status="200"} 2' in text
+        assert 'chessboard_requests_total{route="other",status="404"} 1' in text
+        assert 'chessboard_render_seconds_count 1' in text
+        assert 'chessboard_cache_hits_total 1' in text
+
+    def test_healthz(self, server):
+        """The health endpoint answers without rendering."""
+        assert fetch(server, '/healthz')[:3:2] == (200, b'ok\n')
+
+
+class TestWorkerPool:
+    """Test cases for rendering in worker processes."""
+
+    def test_pool_render_matches_api(self):
+        """Boards rendered by worker processes match in-process renders."""
+        server = BoardServer(('127.0.0.1', 0), workers=1, quiet=True)
+        try:
+            data = server.render('start', {'fen': START_FEN, 'size': 100})
+            assert data == generate_bytes(START_FEN, size=100)
+            assert server.cache.get('start') is data
+        finally:
+            server.server_close()
+
+    def test_timed_out_render_keeps_its_slot(self):
+        """A render that timed out counts as pending until the worker finishes it."""
+        server = BoardServer(('127.0.0.1', 0), workers=1, max_pending=1, render_timeout=0.001, quiet=True)
+        try:
+            with pytest.raises(futures.TimeoutError):
+                server.render('slow', {'fen': START_FEN, 'size': 2000, 'show_coordinates': True})
+            assert server.metrics.in_flight == 1
+            with pytest.raises(BadRequest) as e:
+                server.render('other', {'fen': START_FEN, 'size': 100})
+            assert e.value.status == 503
+            for task in list(server._tasks):
+                task.result(timeout=30)
+            assert server.metrics.in_flight == 0
+        finally:
+            server.server_close()
+
+    def test_timeout_is_service_unavailable(self):
+        """Renders exceeding render_timeout get 503 with Retry-After."""
+        server = BoardServer(('127.0.0.1', 0), workers=1, render_timeout=0.001, quiet=True)
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+        thread.start()
+        try:
+            status, headers, body = fetch(server, board_path(size=2000, coords='true'))
+            assert status == 503
+            assert headers['Retry-After'] == '1'
+            assert body == b'Render timed out\n'
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for contact sheet rendering.
+"""
+
+import io
+import zlib
+
+import pytest
+from PIL import Image
+from chessboard_image import Board, InvalidFENError, generate_pil, generate_sheet
+from chessboard_image.sheet import CAPTION_HEIGHT, sheet_layout
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+ITALIAN_FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+ENDGAME_FEN = "8/8/8/8/8/3QK3/8/7k w - - 0 1"
+
+
+def open_sheet(data):
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def cell(sheet, layout, index):
+    row, col = divmod(index, layout['cols'])
+    x = layout['margin'] + col * (layout['cell_width'] + layout['spacing'])
+    y = layout['margin'] + row * (layout['cell_height'] + layout['spacing'])
+    return sheet.crop((x, y, x + layout['board_size'], y + layout['board_size']))
+
+
+class TestSheetLayout:
+    """Test cases for the grid geometry."""
+
+    def test_dimensions(self):
+        """Width and height follow from cells, spacing and margin."""
+        layout = sheet_layout(10, cols=4, size=100, spacing=10, margin=5)
+        assert layout['rows'] == 3
+        assert layout['width'] == 2 * 5 + 4 * 100 + 3 * 10
+        assert layout['height'] == 2 * 5 + 3 * 100 + 2 * 10
+
+    def test_coordinates_and_captions(self):
+        """Coordinates widen the cells and captions add height."""
+        layout = sheet_layout(1, cols=1, size=80, show_coordinates=True, spacing=0, captions=True)
+        assert layout['board_size'] == 80 + 40
+        assert layout['cell_height'] == 120 + CAPTION_HEIGHT
+
+    def test_too_many_boards(self):
+        """Boards that do not fit in the given rows raise ValueError."""
+        with pytest.raises(ValueError):
+            sheet_layout(5, cols=2, rows=2)
+        with pytest.raises(ValueError):
+            sheet_layout(1, cols=0)
+
+
+class TestGenerateSheet:
+    """Test cases for generate_sheet."""
+
+    def test_boards_match_single_renders(self):
+        """Every cell holds exactly the board generate_pil renders."""
+        fens = [START_FEN, ITALIAN_FEN, ENDGAME_FEN, (START_FEN, None, {'player_pov': 'black'}), Board.from_fen(ITALIAN_FEN)]
+        buffer = io.BytesIO()
+        assert generate_sheet(fens, buffer, cols=2, size=80, spacing=6, margin=3) is buffer
+        sheet = open_sheet(buffer.getvalue())
+        layout = sheet_layout(len(fens), cols=2, size=80, spacing=6, margin=3)
+        assert sheet.size == (layout['width'], layout['height'])
+        assert sheet.mode == 'RGB'
+
+        expected = [
+            generate_pil(START_FEN, size=80),
+            generate_pil(ITALIAN_FEN, size=80),
+            generate_pil(ENDGAME_FEN, size=80),
+            generate_pil(START_FEN, size=80, player_pov='black'),
+            generate_pil(ITALIAN_FEN, size=80),
+        ]
+        for index, board in enumerate(expected):
+            assert cell(sheet, layout, index).tobytes() == board.tobytes()
+        # The empty sixth cell is background
+        assert cell(sheet, layout, 5).getcolors() == [(80 * 80, (255, 255, 255))]
+
+    def test_square_sequence_positions(self):
+        """Square lists, bytes and 8x8 rows render like the FEN they hold."""
+        board = Board.from_fen(ITALIAN_FEN)
+        buffer = io.BytesIO()
+        generate_sheet([list(board), board.squares, board.rows()], buffer, cols=3, size=64)
+        sheet = open_sheet(buffer.getvalue())
+        layout = sheet_layout(3, cols=3, size=64)
+        expected = generate_pil(ITALIAN_FEN, size=64).tobytes()
+        for index in range(3):
+            assert cell(sheet, layout, index).tobytes() == expected
+
+    def test_captions_and_coordinates(self, tmp_path):
+        """Captions are drawn below boards with coordinates."""
+        output = str(tmp_path / "sheet.png")
+        generate_sheet([(ENDGAME_FEN, "Mate in 2"), (START_FEN, "")], output, cols=2, size=80,
+                       show_coordinates=True, background=(200, 200, 200))
+        sheet = Image.open(output)
+        layout = sheet_layout(2, cols=2, size=80, show_coordinates=True, captions=True)
+        assert sheet.size == (layout['width'], layout['height'])
+        assert cell(sheet, layout, 0).tobytes() == generate_pil(ENDGAME_FEN, size=80, show_coordinates=True).tobytes()
+
+        def caption_colors(index):
+            x = layout['margin'] + index * (layout['cell_width'] + layout['spacing'])
+            y = layout['margin'] + layout['board_size']
+            return sheet.crop((x, y, x + layout['cell_width'], y + CAPTION_HEIGHT)).getcolors()
+
+        assert len(caption_colors(0)) > 1
+        assert caption_colors(1) == [(layout['cell_width'] * CAPTION_HEIGHT, (200, 200, 200))]
+
+    def test_streams_one_chunk_per_row(self):
+        """Each grid row is compressed into its own IDAT chunk."""
+        buffer = io.BytesIO()
+        generate_sheet([START_FEN] * 12, buffer, cols=3, size=64, compress_level=1)
+        data = buffer.getvalue()
+        assert data.count(b'IDAT') >= 4
+        chunks = []
+        offset = 8
+        while offset < len(data):
+            length = int.from_bytes(data[offset:offset + 4], 'big')
+            kind = data[offset + 4:offset + 8]
+            payload = data[offset + 8:offset + 8 + length]
+            assert int.from_bytes(data[offset + 8 + length:offset + 12 + length], 'big') == zlib.crc32(kind + payload)
+            chunks.append(kind)
+            offset += 12 + length
+        assert chunks[0] == b'IHDR' and chunks[-1] == b'IEND'
+
+    def test_invalid_items(self, tmp_path):
+        """Bad FENs and unsupported item options raise, leaving no partial file."""
+        output = tmp_path / "sheet.png"
+        with pytest.raises(InvalidFENError):
+            generate_sheet([START_FEN, "invalid"], str(output), cols=1, size=64)
+        assert not output.exists()
+        with pytest.raises(ValueError):
+            generate_sheet([(START_FEN, None, {'size': 100})], io.BytesIO(), size=64)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary theme pack format.
+"""
+
+import os
+import tempfile
+
+import pytest
+from PIL import ImageChops
+
+from chessboard_image import (
+    ThemeNotFoundError,
+    ThemePack,
+    convert_theme_file,
+    generate_pil,
+    get_theme_info,
+    list_themes,
+    load_theme,
+)
+from chessboard_image.cli import main
+from chessboard_image.themepack import PackedPiece, is_theme_pack
+
+FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+
+
+@pytest.fixture(scope="module", params=["raw", "zlib"])
+def pack_path(request):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, f"themes-{request.param}.cbtpack")
+        convert_theme_file(None, path, codec=request.param)
+        yield path
+
+
+class TestThemePack:
+    """Test cases for theme packs."""
+
+    def test_pack_is_detected(self, pack_path):
+        """Packs are recognised by their magic bytes, JSON files are not."""
+        assert is_theme_pack(pack_path)
+        assert not is_theme_pack(os.path.join(os.path.dirname(__file__), '..', 'chessboard_image', 'theme.json'))
+
+    def test_pack_lists_same_themes(self, pack_path):
+        """A converted pack holds every theme of the source file."""
+        assert list_themes(pack_path) == list_themes()
+        info = get_theme_info("alpha", pack_path)
+        assert info['board_colors'] == get_theme_info("alpha")['board_colors']
+        assert info['piece_count'] == 12
+
+    def test_pack_pieces_are_packed(self, pack_path):
+        """Themes loaded from a pack reference piece planes instead of base64."""
+        theme = load_theme(pack_path, "wikipedia")
+        piece = theme['pieces']['wK']
+        assert isinstance(piece, PackedPiece)
+        assert piece.image().mode == 'RGBA'
+
+    @pytest.mark.parametrize("theme_name", ["wikipedia", "alpha"])
+    def test_pack_renders_identically(self, pack_path, theme_name):
+        """Boards rendered from a pack match boards rendered from JSON."""
+        expected = generate_pil(FEN, size=240, theme_name=theme_name, show_coordinates=True)
+        actual = generate_pil(FEN, size=240, theme_file=pack_path, theme_name=theme_name,
+                              show_coordinates=True)
+        assert ImageChops.difference(expected, actual).getbbox() is None
+
+    def test_subset_of_themes(self):
+        """Only the requested themes are written."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = convert_theme_file(None, os.path.join(tmpdir, "one.cbtpack"), theme_names=["alpha"])
+            pack = ThemePack(path)
+            try:
+                assert pack.names() == ["alpha"]
+                assert sorted(pack.piece_keys("alpha")) == sorted(load_theme(theme_name="alpha")['pieces'])
+            finally:
+                pack.close()
+            with pytest.raises(ThemeNotFoundError):
+                load_theme(path, "wikipedia")
+
+    def test_corrupt_pack(self):
+        """A truncated pack is reported as a theme error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "broken.cbtpack")
+            with open(path, 'wb') as f:
+                f.write(b'CBTPACK\0\x01')
+            with pytest.raises(ThemeNotFoundError):
+                load_theme(path)
+            assert list_themes(path) == []
+
+    def test_invalid_codec(self):
+        """Unknown codecs are rejected before anything is written."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "themes.cbtpack")
+            with pytest.raises(ValueError):
+                convert_theme_file(None, path, codec="lzma")
+            assert not os.path.exists(path)
+
+
+class TestPackCommand:
+    """Test cases for the pack subcommand."""
+
+    def test_pack_command(self, monkeypatch, capsys):
+        """The pack subcommand writes a pack usable with --theme-file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "themes.cbtpack")
+            monkeypatch.setattr('sys.argv', ['chessboard-image', 'pack', '-o', path,
+                                             '-t', 'alpha', '-t', 'wikipedia', '--codec', 'zlib'])
+            assert main() == 0
+            assert list_themes(path) == ['alpha', 'wikipedia']
+            assert "Theme pack saved" in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
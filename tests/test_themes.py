@@ -11,11 +11,14 @@ from pathlib import Path
 from chessboard_image import (
     load_theme,
     list_themes,
+    theme_registry,
     get_theme_info,
     generate_image,
     ThemeNotFoundError,
     ChessImageGeneratorError
 )
+from chessboard_image.generator import get_default_theme_path
+from chessboard_image.themeindex import build_index
 
 
 class TestThemes:
@@ -289,5 +292,143 @@ class TestThemes:
                     os.unlink(tmp.name)
 
 
+class TestThemeRegistry:
+    """Test cases for the process-wide theme registry."""
+
+    def _write_theme_file(self, board):
+        theme = {"custom": {"pieces": {"wK": ["data:image/png;base64,AAAA"]}, "board": board}}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(theme, f)
+            return f.name
+
+    def _remove_theme_file(self, theme_file):
+        for path in (theme_file, theme_file + '.idx'):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def test_theme_file_parsed_once(self):
+        """Repeated loads return the same cached theme object."""
+        assert load_theme(theme_name="wikipedia") is load_theme(theme_name="wikipedia")
+
+    def test_themes_are_immutable(self):
+        """Cached themes cannot be modified by callers."""
+        theme = load_theme(theme_name="wikipedia")
+
+        with pytest.raises(TypeError):
+            theme['board'] = ["#000000", "#FFFFFF"]
+        with pytest.raises(TypeError):
+            theme['board'][0] = "#000000"
+        with pytest.raises(TypeError):
+            theme['pieces'].pop('wK')
+
+    def test_edited_theme_file_is_reloaded(self):
+        """Changing a theme file on disk is picked up without invalidation."""
+        theme_file = self._write_theme_file(["#111111", "#222222"])
+        try:
+            first = load_theme(theme_file, "custom")
+            assert first['board'] == ["#111111", "#222222"]
+
+            with open(theme_file, 'w') as f:
+                json.dump({"custom": {"pieces": {}, "board": ["#333333", "#444444"]}}, f)
+            stat = os.stat(theme_file)
+            os.utime(theme_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            second = load_theme(theme_file, "custom")
+            assert second['board'] == ["#333333", "#444444"]
+            assert second.key != first.key
+        finally:
+            self._remove_theme_file(theme_file)
+
+    def test_invalidate_and_clear(self):
+        """Explicit invalidation forces the theme file to be parsed again."""
+        theme_file = self._write_theme_file(["#111111", "#222222"])
+        try:
+            first = load_theme(theme_file, "custom")
+            assert load_theme(theme_file, "custom") is first
+
+            theme_registry.invalidate(theme_file)
+            second = load_theme(theme_file, "custom")
+            assert second is not first
+            assert second == first
+
+            theme_registry.clear()
+            assert len(theme_registry) == 0
+            assert load_theme(theme_file, "custom") is not second
+        finally:
+            self._remove_theme_file(theme_file)
+
+
+class TestThemeIndex:
+    """Test cases for indexed loading of JSON theme files."""
+
+    def test_index_matches_full_parse(self):
+        """The index agrees with a full parse of the bundled theme file."""
+        with open(get_default_theme_path(), 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        index = build_index(raw)
+
+        assert list(index) == list(data)
+        for name, entry in index.items():
+            start, end = entry['span']
+            assert json.loads(raw[start:end]) == data[name]
+            assert entry['board'] == data[name]['board']
+            assert entry['pieces'] == list(data[name]['pieces'])
+
+    def test_index_handles_escapes_and_unicode(self):
+        """Theme names with escapes and non-ASCII characters keep correct offsets."""
+        data = {
+            "caf\u00e9 \"noir\"": {"board": ["#111111", "#222222"], "pieces": {}},
+            "sakura \u685c": {"pieces": {"wK": ["data:image/png;base64,AAAA"]}, "board": ["#333333", "#444444"]},
+        }
+        raw = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        index = build_index(raw)
+
+        assert list(index) == list(data)
+        for name, entry in index.items():
+            start, end = entry['span']
+            assert json.loads(raw[start:end].decode('utf-8')) == data[name]
+
+    def test_index_is_cached_next_to_file(self, monkeypatch):
+        """The index is written beside the theme file and reused while it is current."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            theme_file = os.path.join(tmpdir, 'themes.json')
+            with open(theme_file, 'w') as f:
+                json.dump({"custom": {"pieces": {}, "board": ["#111111", "#222222"]}}, f)
+            assert list_themes(theme_file) == ["custom"]
+            assert os.path.exists(theme_file + '.idx')
+
+            def fail(raw):
+                raise AssertionError("index rebuilt")
+
+            monkeypatch.setattr('chessboard_image.themeindex.build_index', fail)
+            theme_registry.invalidate(theme_file)
+            assert load_theme(theme_file, "custom")['board'] == ["#111111", "#222222"]
+
+    def test_listing_does_not_parse_themes(self, monkeypatch):
+        """Theme names and info are answered from the index alone."""
+        def fail(path, entry):
+            raise AssertionError("theme parsed")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            theme_file = os.path.join(tmpdir, 'themes.json')
+            with open(get_default_theme_path(), 'rb') as src, open(theme_file, 'wb') as dst:
+                dst.write(src.read())
+            monkeypatch.setattr('chessboard_image.generator.read_theme', fail)
+
+            assert list_themes(theme_file) == list_themes()
+            info = get_theme_info("alpha", theme_file)
+            assert info['piece_count'] == 12
+
+    def test_invalid_structure(self):
+        """Theme files whose themes are not objects are rejected."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            theme_file = os.path.join(tmpdir, 'themes.json')
+            with open(theme_file, 'w') as f:
+                json.dump({"custom": ["#111111", "#222222"]}, f)
+            with pytest.raises(ThemeNotFoundError):
+                load_theme(theme_file, "custom")
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
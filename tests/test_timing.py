@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-stage render timing hooks.
+"""
+
+import threading
+
+import pytest
+from chessboard_image import (
+    RenderStages,
+    ResultCache,
+    add_stage_hook,
+    generate_bytes,
+    generate_image,
+    generate_pil,
+    record_stages,
+    remove_stage_hook,
+    sprite_cache,
+    tile_cache,
+)
+from chessboard_image import timing
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class TestRecordStages:
+    """Test cases for recording stage timings."""
+
+    def test_one_entry_per_render(self):
+        """Each public render call is reported once, nested calls included."""
+        with record_stages() as renders:
+            generate_bytes(START_FEN, size=80)
+            generate_pil(START_FEN, size=80)
+        assert len(renders) == 2
+        assert all(isinstance(render, RenderStages) for render in renders)
+
+    def test_stages_add_up(self):
+        """Stage times exclude nested stages and add up to the render time."""
+        sprite_cache.clear()
+        tile_cache.clear()
+        with record_stages() as renders:
+            generate_bytes(START_FEN, size=88, show_coordinates=True)
+        render = renders[0]
+        for name in ('theme', 'parse', 'background', 'sprites', 'tiles', 'compose', 'encode'):
+            assert render[name] >= 0
+        assert set(render) <= set(timing.STAGES) | {timing.OTHER}
+        assert sum(render.values()) == pytest.approx(render.total)
+
+    def test_spans(self):
+        """Spans start with the whole render and point at their parents."""
+        sprite_cache.clear()
+        tile_cache.clear()
+        with record_stages() as renders:
+            generate_pil(START_FEN, size=96)
+        spans = renders[0].spans
+        assert spans[0].name == 'render' and spans[0].parent is None
+        assert spans[0].duration_ns == pytest.approx(renders[0].total * 1e9)
+        for span in spans[1:]:
+            parent = spans[span.parent]
+            assert parent.start_ns <= span.start_ns <= span.end_ns <= parent.end_ns
+        # Sprites are decoded while building the tile atlas
+        sprites = next(span for span in spans if span.name == 'sprites')
+        assert spans[sprites.parent].name == 'tiles'
+        start, end = spans[0].unix_ns()
+        assert end - start == spans[0].duration_ns
+
+    def test_cache_stage(self):
+        """Result cache lookups are a stage of their own."""
+        cache = ResultCache()
+        generate_bytes(START_FEN, size=80, cache=cache)
+        with record_stages() as renders:
+            generate_bytes(START_FEN, size=80, cache=cache)
+        assert 'cache' in renders[0]
+        assert 'encode' not in renders[0]
+
+    def test_failed_render_recorded(self, tmp_path):
+        """Renders that raise are still reported."""
+        with record_stages() as renders:
+            with pytest.raises(Exception):
+                generate_image("invalid", str(tmp_path / "board.png"))
+        assert len(renders) == 1
+
+    def test_totals(self):
+        """Totals sum every recorded render."""
+        with record_stages() as renders:
+            generate_bytes(START_FEN, size=80)
+            generate_bytes(START_FEN, size=80)
+        totals = renders.totals()
+        assert totals['encode'] == pytest.approx(renders[0]['encode'] + renders[1]['encode'])
+
+    def test_nested_recorders(self):
+        """Every active recorder receives the renders."""
+        with record_stages() as outer:
+            generate_bytes(START_FEN, size=80)
+            with record_stages() as inner:
+                generate_bytes(START_FEN, size=80)
+        assert len(outer) == 2
+        assert len(inner) == 1
+
+    def test_other_threads_not_recorded(self):
+        """Renders of other threads do not show up in a recorder."""
+        with record_stages() as renders:
+            thread = threading.Thread(target=generate_bytes, args=(START_FEN,), kwargs={'size': 80})
+            thread.start()
+            thread.join()
+        assert len(renders) == 0
+
+    def test_disabled_when_idle(self):
+        """Nothing is traced once recorders and hooks are gone."""
+        with record_stages():
+            assert timing._enabled
+        assert not timing._enabled
+        assert timing.stage('theme') is timing._NULL_STAGE
+        assert timing.render() is timing._NULL_STAGE
+
+
+class TestStageHooks:
+    """Test cases for process-wide stage hooks."""
+
+    def test_hook_receives_renders_of_all_threads(self):
+        """Hooks are called for renders in any thread until removed."""
+        received = []
+        add_stage_hook(received.append)
+        try:
+            generate_bytes(START_FEN, size=80)
+            thread = threading.Thread(target=generate_pil, args=(START_FEN,), kwargs={'size': 80})
+            thread.start()
+            thread.join()
+        finally:
+            remove_stage_hook(received.append)
+        generate_bytes(START_FEN, size=80)
+        assert len(received) == 2
+        assert not timing._enabled
+
+    def test_remove_unknown_hook(self):
+        """Removing a hook that was never added raises ValueError."""
+        with pytest.raises(ValueError):
+            remove_stage_hook(print)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk FEN validation and normalization.
+"""
+
+import io
+import sys
+
+import pytest
+from chessboard_image import FENResult, InvalidFENError, iter_validate, validate_fen
+from chessboard_image.cli import main
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+E4_FEN = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+
+class TestValidateFen:
+    """Test cases for single FEN validation."""
+
+    @pytest.mark.parametrize("fen", [
+        START_FEN,
+        E4_FEN,
+        "rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3",
+        "8/8/8/8/8/3QK3/8/7k w - - 0 1",
+        "QQQQQQQQ/QK6/8/8/8/8/8/7k b - - 12 80",
+    ])
+    def test_canonical_fens_unchanged(self, fen):
+        """Valid canonical FENs are returned as they are."""
+        assert validate_fen(fen) == fen
+
+    @pytest.mark.parametrize("fen, canonical", [
+        ("rnbqkbnr/pppppppp/44/8/8/8/PPPPPPPP/RNBQKBNR  w  qkQK - 00 01", START_FEN),
+        ("  8/8/8/8/8/8/8/K6k  ", "8/8/8/8/8/8/8/K6k w - - 0 1"),
+        ("8/8/8/8/8/8/8/K6k b", "8/8/8/8/8/8/8/K6k b - - 0 1"),
+        ("8/8/8/8/8/8/8/K3111k w - - 0 1", "8/8/8/8/8/8/8/K6k w - - 0 1"),
+    ])
+    def test_normalization(self, fen, canonical):
+        """Whitespace, empty-square runs, castling order and counters are normalized."""
+        assert validate_fen(fen) == canonical
+
+    @pytest.mark.parametrize("fen, message", [
+        ("", "Empty FEN"),
+        ("8/8/8/8/8/8/8/K6k w - - 0 1 extra", "7 fields"),
+        ("8/8/8/8/8/8/K6k w - - 0 1", "8 rows"),
+        ("8/8/8/8/8/8/8/K5k w - - 0 1", "Row 8 has 7 squares"),
+        ("8/8/8/8/8/8/8/K6x w - - 0 1", "Invalid character"),
+        ("8/8/8/8/8/8/8/K7 w - - 0 1", "exactly one king"),
+        ("8/8/8/8/8/8/8/KK5k w - - 0 1", "exactly one king"),
+        ("8/8/pppppppp/p7/8/8/8/K6k w - - 0 1", "9 pawns"),
+        ("QQQQQQQQ/8/8/8/8/NNNNNNNN/8/K6k w - - 0 1", "17 pieces"),
+        ("8/8/8/8/8/8/PPPPPPPP/KNNN3k w - - 0 1", "promoted pieces"),
+        ("P7/8/8/8/8/8/8/K6k w - - 0 1", "first or last rank"),
+        ("8/8/8/8/8/8/8/K6k x - - 0 1", "Side to move"),
+        ("8/8/8/8/8/8/8/K6k w KK - 0 1", "castling field"),
+        ("8/8/8/8/8/8/8/K6k w K - 0 1", "Castling right 'K'"),
+        ("8/8/8/8/8/8/8/K6k w - e9 0 1", "en passant square"),
+        ("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e3 0 1", "wrong rank"),
+        ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR b KQkq e3 0 1", "two-square pawn move"),
+        ("8/8/8/8/8/8/8/K6k w - - -1 1", "halfmove clock"),
+        ("8/8/8/8/8/8/8/K6k w - - 0 0", "fullmove number"),
+    ])
+    def test_invalid(self, fen, message):
+        """Every field is checked, with a message naming the problem."""
+        with pytest.raises(InvalidFENError, match=message):
+            validate_fen(fen)
+
+    def test_strict_requires_six_fields(self):
+        """Strict mode rejects FENs with missing fields."""
+        with pytest.raises(InvalidFENError, match="2 fields"):
+            validate_fen("8/8/8/8/8/8/8/K6k w", strict=True)
+
+    def test_repeated_board_uses_lookup_table(self):
+        """A board seen before is validated against the full FEN again."""
+        assert validate_fen(E4_FEN) == E4_FEN
+        with pytest.raises(InvalidFENError):
+            validate_fen(E4_FEN.replace(" b ", " w "))
+
+
+class TestIterValidate:
+    """Test cases for streaming validation."""
+
+    LINES = [f"{START_FEN}\n", "\n", "# comment\n", "invalid\n", "8/8/8/8/8/8/8/K6k\n"]
+
+    def test_results_in_order_with_line_numbers(self):
+        """Blank and comment lines are skipped and line numbers kept."""
+        results = list(iter_validate(self.LINES, chunksize=2))
+
+        assert [r.line for r in results] == [1, 4, 5]
+        assert all(isinstance(r, FENResult) for r in results)
+        assert [r.ok for r in results] == [True, False, True]
+        assert results[0].canonical == START_FEN
+        assert isinstance(results[1].error, InvalidFENError)
+        assert results[2].canonical == "8/8/8/8/8/8/8/K6k w - - 0 1"
+
+    def test_workers_match_in_process(self):
+        """Results from worker processes match in-process validation."""
+        lines = self.LINES * 20
+        expected = [(r.line, r.canonical) for r in iter_validate(lines)]
+        assert [(r.line, r.canonical) for r in iter_validate(lines, workers=2, chunksize=7)] == expected
+
+    def test_invalid_chunksize(self):
+        """Chunk sizes below 1 are rejected."""
+        with pytest.raises(ValueError):
+            list(iter_validate([], chunksize=0))
+
+
+class TestValidateCommand:
+    """Test cases for the validate subcommand."""
+
+    def test_validate_from_stdin(self, monkeypatch, capsys):
+        """Canonical FENs go to stdout, per-line errors and a summary to stderr."""
+        monkeypatch.setattr(sys, 'argv', ['chessboard-image', 'validate'])
+        monkeypatch.setattr(sys, 'stdin', io.StringIO(''.join(TestIterValidate.LINES)))
+
+        assert main() == 1
+        captured = capsys.readouterr()
+        assert captured.out == f"{START_FEN}\n8/8/8/8/8/8/8/K6k w - - 0 1\n"
+        assert "line 4:" in captured.err
+        assert "2 valid, 1 invalid" in captured.err
+
+    def test_validate_to_file(self, monkeypatch, tmp_path):
+        """All-valid input exits with status 0."""
+        input_path = tmp_path / "fens.txt"
+        input_path.write_text(f"{START_FEN}\n{E4_FEN}\n")
+        output_path = tmp_path / "clean.txt"
+        monkeypatch.setattr(sys, 'argv', ['chessboard-image', 'validate', str(input_path),
+                                          '-o', str(output_path), '--strict', '-q'])
+
+        assert main() == 0
+        assert output_path.read_text() == f"{START_FEN}\n{E4_FEN}\n"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])